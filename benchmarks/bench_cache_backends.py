@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compare FormatterCache storage backends as the cache grows.
+
+Fills a throwaway cache to each size with the file backend (one JSON
+file per entry) and the SQLite backend, then times put (including limit
+enforcement), get of a cold entry (fresh process state) and stats.
+
+Usage:
+    python benchmarks/bench_cache_backends.py [--sizes 1000,10000,50000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_backends import CacheEntry, FileCacheBackend, SQLiteCacheBackend
+
+SNIPPET = "def handler(event):\n    return {'status': 200, 'body': event}\n"
+
+
+def fill(backend, n: int) -> None:
+    """Insert n entries straight into the backend (fast path for setup)."""
+    now = time.time()
+    entries = [
+        CacheEntry(f"{i:064x}", "python", "black", True, SNIPPET, "formatted", now, 0)
+        for i in range(n)
+    ]
+    if isinstance(backend, SQLiteCacheBackend):
+        backend.store_many(entries)
+    else:
+        for entry in entries:
+            backend.store(entry)
+
+
+def bench(name: str, n: int, rounds: int = 20):
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SQLiteCacheBackend(Path(tmp) / "cache.db") if name == "sqlite" else FileCacheBackend(Path(tmp))
+        fill(backend, n)
+        backend.close()
+
+        start = time.perf_counter()
+        cache = FormatterCache(cache_dir=Path(tmp), backend=name, max_entries=n * 2, max_size_mb=1024)
+        open_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(rounds):
+            cache.put(f"x = {i}", "python", "black", True, f"x = {i}\n", "formatted")
+        put_ms = (time.perf_counter() - start) / rounds * 1000
+
+        cache.memory_cache.clear()
+        start = time.perf_counter()
+        for i in range(rounds):
+            cache.get(f"x = {i}", "python")
+        get_ms = (time.perf_counter() - start) / rounds * 1000
+
+        start = time.perf_counter()
+        cache.stats()
+        stats_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{n:>8} {name:>7} {open_s * 1000:>10.1f} {put_ms:>10.2f} {get_ms:>10.3f} {stats_ms:>10.1f}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare cache storage backends")
+    ap.add_argument("--sizes", default="1000,10000,50000", help="Comma-separated entry counts")
+    args = ap.parse_args(argv)
+
+    print(f"{'entries':>8} {'backend':>7} {'open (ms)':>10} {'put (ms)':>10} {'get (ms)':>10} {'stats (ms)':>10}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        for name in ("file", "sqlite"):
+            bench(name, n)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Cache bookkeeping for a multi-block clip: per-segment calls vs batches.
+
+A clip of N fenced blocks is looked up and stored once per block with
+get()/put(), and again with one get_many()/put_many(). Only the cache is
+timed (formatting is not run); the memory tier is disabled so every
+lookup reaches storage, as it does for a fresh process per hotkey press.
+
+Usage:
+    python benchmarks/bench_cache_batch.py [--blocks 20] [--clips 200]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+
+IDENTITY = "json.dumps bench"
+
+
+def clip(n: int, blocks: int):
+    return [f'{{"clip": {n}, "block": {b}, "items": [1, 2, 3]}}' for b in range(blocks)]
+
+
+def run_single(cache, clips):
+    start = time.perf_counter()
+    for blocks in clips:
+        misses = [code for code in blocks if cache.get(code, "json", IDENTITY) is None]
+        for code in misses:
+            cache.put(code, "json", "json.dumps", True, code + "\n", "formatted", IDENTITY)
+    return time.perf_counter() - start
+
+
+def run_batched(cache, clips):
+    start = time.perf_counter()
+    for blocks in clips:
+        results = cache.get_many([(code, "json", IDENTITY) for code in blocks])
+        cache.put_many([
+            (code, "json", "json.dumps", True, code + "\n", "formatted", IDENTITY, 0.0)
+            for code, result in zip(blocks, results) if result is None
+        ])
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare per-segment and batched cache calls")
+    ap.add_argument("--blocks", type=int, default=20, help="Blocks per clip")
+    ap.add_argument("--clips", type=int, default=200, help="Distinct clips")
+    args = ap.parse_args(argv)
+
+    clips = [clip(n, args.blocks) for n in range(args.clips)]
+    print(f"{args.clips} clips of {args.blocks} blocks, times per clip")
+    print(f"{'api':>8} {'cold':>10} {'warm':>10}")
+    for name, run in (("single", run_single), ("batched", run_batched)):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = FormatterCache(cache_dir=Path(tmp), max_entries=100_000, max_size_mb=1024, memory_entries=0)
+            cold = run(cache, clips)
+            warm = run(cache, clips)
+            cache.flush()
+        print(f"{name:>8} {cold / args.clips * 1000:>8.2f}ms {warm / args.clips * 1000:>8.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
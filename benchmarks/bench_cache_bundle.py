@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Export a cache to a bundle and import it on a "fresh machine".
+
+Fills a cache with this package's own functions (as formatted Python),
+exports it, imports the bundle into an empty cache with a different
+local formatter identity (another install path), and replays the same
+snippets against the imported cache. Reports bundle size against the
+cache database, export/import times and the warm hit rate.
+
+Usage:
+    python benchmarks/bench_cache_bundle.py
+"""
+
+import ast
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_bundle import identity_translator
+
+PACKAGE = Path(__file__).parent.parent / "python" / "clipfix"
+
+HERE = "ruff 0.4.1 /opt/bin/ruff 111 abc"
+THERE = "ruff 0.4.1 /usr/local/bin/ruff 222 abc"
+PORTABLE = "ruff 0.4.1 abc"
+
+
+def package_functions():
+    """Source of every function and method in the package."""
+    snippets = set()
+    for path in sorted(PACKAGE.rglob("*.py")):
+        source = path.read_text(encoding="utf-8")
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                snippet = ast.get_source_segment(source, node)
+                if snippet:
+                    snippets.add(snippet)
+    return sorted(snippets)
+
+
+def main():
+    snippets = package_functions()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = FormatterCache(cache_dir=tmp / "a", max_entries=100_000, max_size_mb=1024)
+        source.put_many([(code, "python", "ruff", True, code + "\n", "formatted", HERE, 0.05) for code in snippets])
+        source.flush()
+
+        bundle = tmp / "warm.eclb"
+        start = time.perf_counter()
+        exported = source.export_bundle(bundle, identity_translator({HERE: PORTABLE}))
+        export_time = time.perf_counter() - start
+
+        target = FormatterCache(cache_dir=tmp / "b", max_entries=100_000, max_size_mb=1024, memory_entries=0)
+        start = time.perf_counter()
+        imported, _ = target.import_bundle(bundle, identity_translator({PORTABLE: THERE}))
+        import_time = time.perf_counter() - start
+
+        hits = sum(target.get(code, "python", THERE) is not None for code in snippets)
+        db_size = sum(f.stat().st_size for f in (tmp / "a").glob("cache.db*"))
+
+        print(f"{len(snippets)} snippets, {exported} exported, {imported} imported")
+        print(f"bundle: {bundle.stat().st_size / 1024:.0f} KB (cache.db: {db_size / 1024:.0f} KB)")
+        print(f"export: {export_time * 1000:.0f} ms, import: {import_time * 1000:.0f} ms")
+        print(f"warm hit rate after import: {hits / len(snippets):.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
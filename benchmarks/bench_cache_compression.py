@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare cache payload encodings on real code snippets.
+
+Uses two stand-ins for cache outputs: the classifier training corpus
+(training/corpus/*.txt, short snippets in eight languages) and the
+functions of this repository's own Python sources (what a day of pasting
+from one project looks like). For each encoding, reports the stored bytes per entry,
+the compression ratio, how many such entries fit the default 50 MB cache
+budget, and the decode time per hit. The dictionary is trained on half
+of the snippets and measured on the other half.
+
+Usage:
+    python benchmarks/bench_cache_compression.py
+"""
+
+import json
+import re
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines import cache_codec
+from clipfix.engines.cache_codec import PayloadCodec
+
+ROOT = Path(__file__).parent.parent
+CORPUS = ROOT / "training" / "corpus"
+BUDGET = 50 * 1024 * 1024
+
+
+def load_snippets():
+    snippets = []
+    for path in sorted(CORPUS.glob("*.txt")):
+        snippets.extend(s.strip("\n") + "\n" for s in path.read_text().split("%%") if s.strip())
+    return snippets
+
+
+def load_functions():
+    """Top-level functions and methods of the package sources."""
+    snippets = []
+    for path in sorted((ROOT / "python" / "clipfix").rglob("*.py")):
+        text = path.read_text()
+        starts = [m.start() for m in re.finditer(r"^(?:    )?(?:def|class) ", text, re.MULTILINE)]
+        for a, b in zip(starts, starts[1:] + [len(text)]):
+            snippet = textwrap.dedent(text[a:b]).strip("\n") + "\n"
+            if len(snippet) > 40:
+                snippets.append(snippet)
+    return snippets
+
+
+def report(name, snippets, encode, decode):
+    payloads = [encode(s) for s in snippets]
+    stored = sum(len(p) for p in payloads)
+    raw = sum(len(s.encode("utf-8")) for s in snippets)
+    start = time.perf_counter()
+    for p in payloads:
+        decode(p)
+    decode_us = (time.perf_counter() - start) / len(payloads) * 1e6
+    per_entry = stored / len(snippets)
+    print(f"{name:>14} {per_entry:>11.0f} {raw / stored:>7.2f}x {BUDGET / per_entry:>12,.0f} {decode_us:>11.1f}")
+
+
+def compare(title, snippets):
+    train, test = snippets[::2], snippets[1::2]
+    print(f"{title}: {len(test)} snippets, {sum(map(len, test)) / len(test):.0f} chars on average")
+    print(f"{'encoding':>14} {'bytes/entry':>11} {'ratio':>8} {'fit in 50MB':>12} {'decode (us)':>11}")
+
+    # The old file layout: the whole entry as indented JSON
+    def old_json(s):
+        return json.dumps({"code_hash": "0" * 64, "language": "python", "formatter": "black",
+                           "success": True, "output": s, "mode": "formatted",
+                           "timestamp": 1.7e9, "hit_count": 0}, indent=2).encode("utf-8")
+    report("json indent=2", test, old_json, lambda p: json.loads(p)["output"])
+    report("raw", test, lambda s: s.encode("utf-8"), lambda p: p.decode("utf-8"))
+
+    codecs = [("zlib", cache_codec.ZLIB)]
+    if cache_codec._zstd():
+        codecs.append(("zstd", cache_codec.ZSTD))
+    for name, tag in codecs:
+        with tempfile.TemporaryDirectory() as tmp:
+            codec = PayloadCodec(Path(tmp))
+            codec.codec = tag
+            report(name, test, codec.encode, codec.decode)
+            if codec.train(train):
+                report(name + "+dict", test, codec.encode, codec.decode)
+    print()
+
+
+def main(argv=None):
+    compare("training corpus", load_snippets())
+    compare("package functions", load_functions())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
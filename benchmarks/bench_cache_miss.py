@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Measure how fast the cache answers "not cached".
+
+For each backend, fills a throwaway cache, then reports the per-miss
+latency of FormatterCache.get with the Bloom filter and without it (the
+storage query every miss used to make), and the time for a fresh process
+to open the cache and answer its first miss.
+
+Usage:
+    python benchmarks/bench_cache_miss.py [--entries 10000] [--misses 10000]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_backends import CacheEntry, SQLiteCacheBackend, open_backend
+
+
+def fill(cache_dir: Path, backend_name: str, n: int) -> None:
+    backend = open_backend(cache_dir, backend_name)
+    now = time.time()
+    entries = [CacheEntry(f"{i:064x}", "python", "black", True, f"x = {i}\n", "formatted", now, 0)
+               for i in range(n)]
+    if isinstance(backend, SQLiteCacheBackend):
+        backend.store_many(entries)
+    else:
+        for entry in entries:
+            backend.store(entry)
+    backend.close()
+
+
+def miss_latency(cache: FormatterCache, misses: int) -> float:
+    """Mean microseconds per missing get."""
+    codes = [f"missing = {i}" for i in range(misses)]
+    start = time.perf_counter()
+    for code in codes:
+        cache.get(code, "python")
+    return (time.perf_counter() - start) / misses * 1e6
+
+
+def cold_miss(cache_dir: str, backend_name: str, max_entries: int) -> float:
+    """Open the cache and answer one miss; milliseconds (run in a fresh process)."""
+    start = time.perf_counter()
+    cache = FormatterCache(cache_dir=Path(cache_dir), backend=backend_name, max_entries=max_entries)
+    cache.get("missing = 0", "python")
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure cache miss latency")
+    ap.add_argument("--entries", type=int, default=10_000, help="Entries in the cache")
+    ap.add_argument("--misses", type=int, default=10_000, help="Lookups per measurement")
+    args = ap.parse_args(argv)
+
+    ctx = multiprocessing.get_context("spawn")
+
+    print(f"{'backend':>7} {'miss, filter (us)':>18} {'miss, storage (us)':>19} {'cold open + miss (ms)':>22}")
+    for name in ("sqlite", "file"):
+        with tempfile.TemporaryDirectory() as tmp:
+            fill(Path(tmp), name, args.entries)
+            # First open builds the filter from storage
+            cache = FormatterCache(cache_dir=Path(tmp), backend=name, max_entries=args.entries,
+                                   memory_entries=0)
+            with_filter = miss_latency(cache, args.misses)
+            bloom, cache.bloom = cache.bloom, None
+            without_filter = miss_latency(cache, min(args.misses, 2000))
+            cache.bloom = bloom
+            with ctx.Pool(1) as pool:
+                cold = min(pool.apply(cold_miss, (tmp, name, args.entries)) for _ in range(3))
+        print(f"{name:>7} {with_filter:>18.2f} {without_filter:>19.2f} {cold:>22.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Replay a clipboard history with raw and with layout-normalized cache keys.
+
+Each clip is looked up as process_text would look it up, keyed either by
+its exact text or by its text with indentation, CRLF line endings and
+trailing spaces removed (cache.normalize_layout); a miss stores it. The
+difference in hit rate is what normalization gains.
+
+The default history is synthetic: Zipf-popular functions from this
+package's own source, each paste at a random nesting level and with a
+random chance of CRLF line endings or trailing spaces. A real history
+can be replayed from a JSONL file with a "text" field per line (the
+format of ~/.clipfix_history.jsonl).
+
+Usage:
+    python benchmarks/bench_cache_normalize.py [--length 5000] [--history FILE]
+"""
+
+import argparse
+import ast
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.layout import split_layout
+
+PACKAGE = Path(__file__).parent.parent / "python" / "clipfix"
+
+
+def package_functions():
+    """Source of every top-level function and method in the package."""
+    snippets = []
+    for path in sorted(PACKAGE.rglob("*.py")):
+        source = path.read_text(encoding="utf-8")
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                snippet = ast.get_source_segment(source, node, padded=True)
+                if snippet:
+                    snippets.append(split_layout(snippet + "\n")[0])
+    return snippets
+
+
+def synthetic_history(length: int, seed: int = 0):
+    """Zipf(1.0) pastes of package functions, each with a random layout."""
+    rng = random.Random(seed)
+    snippets = package_functions()
+    weights = [1.0 / (rank + 1) for rank in range(len(snippets))]
+    history = []
+    for code in rng.choices(snippets, weights, k=length):
+        indent = " " * rng.choice((0, 0, 4, 8, 12))
+        code = "".join(indent + line if line.strip() else line for line in code.splitlines(keepends=True))
+        if rng.random() < 0.2:
+            code = code.replace("\n", "  \n", 1)
+        if rng.random() < 0.2:
+            code = code.replace("\n", "\r\n")
+        history.append(code)
+    return history
+
+
+def replay(history, normalize: bool) -> float:
+    """Hit rate of history against an initially empty cache."""
+    hits = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FormatterCache(cache_dir=Path(tmp), max_entries=100_000, max_size_mb=1024)
+        for code in history:
+            if normalize:
+                code = split_layout(code)[0]
+            if cache.get(code, "python") is not None:
+                hits += 1
+            else:
+                cache.put(code, "python", "black", True, code, "formatted")
+        cache.flush()
+    return hits / len(history)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a clipboard history with raw and normalized cache keys")
+    ap.add_argument("--length", type=int, default=5_000, help="Synthetic history length")
+    ap.add_argument("--history", type=Path, help="JSONL history file with a \"text\" field per line")
+    args = ap.parse_args(argv)
+
+    if args.history:
+        history = [json.loads(line)["text"] for line in args.history.read_text(encoding="utf-8").splitlines() if line.strip()]
+    else:
+        history = synthetic_history(args.length)
+
+    raw = replay(history, normalize=False)
+    normalized = replay(history, normalize=True)
+    print(f"history: {len(history)} clips, {len(set(history))} distinct")
+    print(f"{'keys':>10} {'hit rate':>9}")
+    print(f"{'raw':>10} {raw:>9.1%}")
+    print(f"{'normalized':>10} {normalized:>9.1%}")
+    print(f"extra hits: {normalized - raw:+.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Replay an access trace against each cache eviction policy.
+
+Each trace item is a snippet key; replaying it does what process_text
+does: a cache lookup, and on a miss a put of the formatted result. The
+memory tier is disabled so every hit is served by the on-disk policy.
+
+The default trace is synthetic: Zipf-popular snippets (the code that
+keeps getting pasted) interleaved with bursts of one-off pastes. A real
+trace can be given as a file with one key per line.
+
+Usage:
+    python benchmarks/bench_cache_policy.py [--capacity 200] [--length 10000] [--trace FILE]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_policy import POLICIES
+
+
+def synthetic_trace(length: int, universe: int, seed: int = 0):
+    """Zipf(1.0) accesses over universe snippets, with a one-off burst every 500 accesses."""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(universe)]
+    trace = []
+    one_off = 0
+    while len(trace) < length:
+        trace.extend(f"hot-{k}" for k in rng.choices(range(universe), weights, k=500))
+        burst = rng.randint(50, 300)
+        trace.extend(f"once-{one_off + i}" for i in range(burst))
+        one_off += burst
+    return trace[:length]
+
+
+def replay(policy: str, trace, capacity: int):
+    """Returns (hit rate, seconds)."""
+    hits = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FormatterCache(cache_dir=Path(tmp), max_entries=capacity, max_size_mb=1024,
+                               memory_entries=0, policy=policy)
+        start = time.perf_counter()
+        for key in trace:
+            code = f"value = {key!r}"
+            if cache.get(code, "python") is not None:
+                hits += 1
+            else:
+                cache.put(code, "python", "black", True, code + "\n", "formatted")
+        elapsed = time.perf_counter() - start
+        cache.flush()
+    return hits / len(trace), elapsed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay an access trace against each cache policy")
+    ap.add_argument("--capacity", type=int, default=200, help="Cache max_entries")
+    ap.add_argument("--length", type=int, default=10_000, help="Synthetic trace length")
+    ap.add_argument("--universe", type=int, default=2_000, help="Distinct popular snippets")
+    ap.add_argument("--trace", type=Path, help="Trace file, one key per line")
+    args = ap.parse_args(argv)
+
+    if args.trace:
+        trace = [line.strip() for line in args.trace.read_text().splitlines() if line.strip()]
+    else:
+        trace = synthetic_trace(args.length, args.universe)
+
+    print(f"trace: {len(trace)} accesses, {len(set(trace))} distinct, capacity {args.capacity}")
+    print(f"{'policy':>8} {'hit rate':>9} {'time':>8}")
+    for policy in POLICIES:
+        rate, elapsed = replay(policy, trace, args.capacity)
+        print(f"{policy:>8} {rate:>9.1%} {elapsed:>7.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
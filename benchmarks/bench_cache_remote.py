@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Lookup latency through the remote cache tier, on localhost.
+
+Starts the reference server in-process, fills it from one "machine"
+(cache directory) and looks the same snippets up from a second, empty
+one: each lookup misses locally and is read through from the server.
+Also times lookups against a server that accepts connections and never
+answers, which should cost the budget once and then nothing.
+
+Usage:
+    python benchmarks/bench_cache_remote.py [--snippets 500] [--budget-ms 50]
+"""
+
+import argparse
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_bundle import identity_translator
+from clipfix.engines.cache_remote import RemoteCache
+from clipfix.engines.cache_server import make_server
+
+HERE = "ruff 0.4.1 /opt/bin/ruff 111 abc"
+THERE = "ruff 0.4.1 /usr/bin/ruff 222 abc"
+PORTABLE = "ruff 0.4.1 abc"
+TOKEN = "bench-token"
+
+
+def timed_gets(cache, snippets, identity):
+    times = []
+    for code in snippets:
+        start = time.perf_counter()
+        cache.get(code, "python", identity)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(name, times):
+    times = sorted(times)
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    print(f"{name:>22} {statistics.median(times) * 1000:>8.3f}ms {p99 * 1000:>8.3f}ms {sum(times) * 1000:>9.1f}ms")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Time lookups read through from the remote cache tier")
+    ap.add_argument("--snippets", type=int, default=500, help="Distinct snippets")
+    ap.add_argument("--budget-ms", type=int, default=50, help="Remote lookup budget")
+    args = ap.parse_args(argv)
+
+    snippets = [f"value_{i} = {{'id': {i}, 'tags': ['a', 'b']}}" for i in range(args.snippets)]
+    server = make_server("127.0.0.1", 0, token=TOKEN)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(64)
+    dead_url = f"http://127.0.0.1:{listener.getsockname()[1]}"
+
+    print(f"{args.snippets} lookups, budget {args.budget_ms} ms")
+    print(f"{'':>22} {'p50':>10} {'p99':>10} {'total':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        a = FormatterCache(cache_dir=tmp / "a", max_entries=100_000,
+                           remote=RemoteCache(url, identity_translator({HERE: PORTABLE}), args.budget_ms,
+                                              token=TOKEN))
+        a.put_many([(code, "python", "ruff", True, code + "\n", "formatted", HERE, 0.1) for code in snippets])
+        a.remote.flush(30)
+
+        local = FormatterCache(cache_dir=tmp / "local", max_entries=100_000)
+        report("local miss, no remote", timed_gets(local, snippets, THERE))
+
+        b = FormatterCache(cache_dir=tmp / "b", max_entries=100_000,
+                           remote=RemoteCache(url, identity_translator({THERE: PORTABLE}), args.budget_ms,
+                                              token=TOKEN))
+        report("remote hit", timed_gets(b, snippets, THERE))
+        report("local hit afterwards", timed_gets(b, snippets, THERE))
+
+        c = FormatterCache(cache_dir=tmp / "c", max_entries=100_000,
+                           remote=RemoteCache(dead_url, identity_translator({THERE: PORTABLE}), args.budget_ms,
+                                              state_dir=tmp / "c", token=TOKEN))
+        report("unresponsive server", timed_gets(c, snippets, THERE))
+
+    server.shutdown()
+    listener.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Measure FormatterCache cold-start time as the cache grows.
+
+Fills a throwaway cache with 100 to 100k entries (a tenth of them
+expired), then times opening it and serving one hit in a fresh process,
+as a CLI invocation would. Startup no longer sweeps expired entries or
+builds the Bloom filter, so the time should stay flat with the SQLite
+backend. The first run (no filter yet) is reported next to the best one.
+
+Usage:
+    python benchmarks/bench_cache_startup.py [--sizes 100,1000,10000,100000] [--backend sqlite]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_backends import CacheEntry, SQLiteCacheBackend, open_backend
+
+TTL = 86400
+
+
+def fill(cache_dir: Path, backend_name: str, n: int) -> None:
+    """Write n entries straight into the backend, every tenth one expired."""
+    backend = open_backend(cache_dir, backend_name)
+    now = time.time()
+    entries = [
+        CacheEntry(f"{i:064x}", "python", "black", True, f"x = {i}\n", "formatted",
+                   now - 2 * TTL if i % 10 == 0 else now, 0)
+        for i in range(n)
+    ]
+    if isinstance(backend, SQLiteCacheBackend):
+        backend.store_many(entries)
+    else:
+        for entry in entries:
+            backend.store(entry)
+    backend.close()
+
+
+def cold_start(cache_dir: str, backend_name: str) -> float:
+    """Open the cache and serve one hit; seconds (run in a fresh process)."""
+    start = time.perf_counter()
+    cache = FormatterCache(cache_dir=Path(cache_dir), backend=backend_name, ttl_seconds=TTL,
+                           max_entries=10**6, max_size_mb=1024)
+    cache.get("x = 1", "python")
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure cache cold-start time")
+    ap.add_argument("--sizes", default="100,1000,10000,100000", help="Comma-separated entry counts")
+    ap.add_argument("--backend", default="sqlite", choices=["sqlite", "file"])
+    ap.add_argument("--runs", type=int, default=5, help="Cold starts per size (first and best are reported)")
+    args = ap.parse_args(argv)
+
+    ctx = multiprocessing.get_context("spawn")
+
+    print(f"{'entries':>8} {'backend':>7} {'first run (ms)':>15} {'best run (ms)':>14}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            fill(Path(tmp), args.backend, n)
+            times = []
+            for _ in range(args.runs):
+                with ctx.Pool(1) as pool:
+                    times.append(pool.apply(cold_start, (tmp, args.backend)))
+        print(f"{n:>8} {args.backend:>7} {times[0] * 1000:>15.2f} {min(times) * 1000:>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
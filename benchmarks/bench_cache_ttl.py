@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Replay a week of clipboard use with a 24 h TTL and with no TTL.
+
+Before cache keys carried the formatter identity, a TTL was the only
+guard against output from an older formatter, so every entry was
+dropped a day after it was written. Keyed by identity, entries stay
+until size-based eviction. This compares the hit rate of the two over a
+simulated week: Zipf-popular snippets pasted during working hours,
+with a formatter upgrade on day four (which, with identity keys, turns
+every entry stale at once, as a TTL would).
+
+The cache clock is simulated; nothing sleeps.
+
+Usage:
+    python benchmarks/bench_cache_ttl.py [--pastes-per-day 300] [--days 7]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines import cache as cache_module
+from clipfix.engines.cache import FormatterCache
+
+DAY = 86400
+
+
+def week_trace(days: int, per_day: int, universe: int, seed: int = 0):
+    """(timestamp, snippet) pastes between 9:00 and 18:00 each day, Zipf(1.0) popularity."""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(universe)]
+    trace = []
+    for day in range(days):
+        times = sorted(rng.uniform(9 * 3600, 18 * 3600) for _ in range(per_day))
+        snippets = rng.choices(range(universe), weights, k=per_day)
+        trace.extend((day * DAY + t, k) for t, k in zip(times, snippets))
+    return trace
+
+
+def replay(trace, ttl_seconds, upgrade_day: int) -> float:
+    """Hit rate of trace; ttl_seconds None = identity keys, no TTL."""
+    clock = SimpleNamespace(now=0.0)
+    real_time = cache_module.time
+    cache_module.time = SimpleNamespace(time=lambda: clock.now, perf_counter=real_time.perf_counter)
+    hits = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = FormatterCache(cache_dir=Path(tmp), ttl_seconds=ttl_seconds, max_entries=5_000)
+            for now, snippet in trace:
+                clock.now = now
+                code = f"value_{snippet} = {snippet}"
+                identity = "ruff 0.4" if now < upgrade_day * DAY else "ruff 0.5"
+                if cache.get(code, "python", identity) is not None:
+                    hits += 1
+                else:
+                    cache.put(code, "python", "ruff", True, code + "\n", "formatted", identity)
+            cache.flush()
+    finally:
+        cache_module.time = real_time
+    return hits / len(trace)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare a 24 h TTL with identity keys over a week")
+    ap.add_argument("--days", type=int, default=7, help="Days to simulate")
+    ap.add_argument("--pastes-per-day", type=int, default=300, help="Pastes per day")
+    ap.add_argument("--universe", type=int, default=2_000, help="Distinct snippets")
+    ap.add_argument("--upgrade-day", type=int, default=4, help="Day the formatter is upgraded")
+    args = ap.parse_args(argv)
+
+    trace = week_trace(args.days, args.pastes_per_day, args.universe)
+    ttl = replay(trace, DAY, args.upgrade_day)
+    keyed = replay(trace, None, args.upgrade_day)
+    print(f"trace: {len(trace)} pastes over {args.days} days, upgrade on day {args.upgrade_day}")
+    print(f"{'keys':>16} {'hit rate':>9}")
+    print(f"{'24 h TTL':>16} {ttl:>9.1%}")
+    print(f"{'identity, no TTL':>16} {keyed:>9.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
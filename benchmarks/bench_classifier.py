@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Accuracy and latency of the language classifiers.
+
+Evaluates on the knowledge/*.json test cases (not part of the training
+corpus), broken and fixed variants alike:
+
+    heuristic  language_detector.detect_language
+    ngram      the shipped n-gram model, every answer
+    gated      the n-gram model above the configured threshold, LLM otherwise
+    llm        llm_classify (only with --llm; needs mlx-lm and the model)
+
+Usage:
+    python benchmarks/bench_classifier.py [--llm]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.language_detector import detect_language
+from clipfix.engines.ngram_classifier import classifier_threshold, get_ngram_classifier
+
+KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
+
+
+def load_cases():
+    """(language, snippet) pairs from the knowledge base test cases."""
+    cases = []
+    for path in sorted(KNOWLEDGE_DIR.glob("*.json")):
+        data = json.loads(path.read_text())
+        lang = data["language"].lower()
+        for case in data.get("test_cases", []):
+            for key in ("broken", "fixed"):
+                if isinstance(case.get(key), str):
+                    cases.append((lang, case[key]))
+    return cases
+
+
+def run(name, classify, cases):
+    """Classify every case; print accuracy and latency."""
+    correct = 0
+    times = []
+    for lang, text in cases:
+        start = time.perf_counter()
+        kind = classify(text)
+        times.append(time.perf_counter() - start)
+        correct += kind == lang
+    times.sort()
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    print(
+        f"{name:>10} {correct:>3}/{len(cases):<3} {correct / len(cases):>6.1%} "
+        f"{statistics.median(times) * 1e6:>10.0f} {p99 * 1e6:>10.0f}"
+    )
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Classifier accuracy and latency")
+    ap.add_argument("--llm", action="store_true", help="Also run llm_classify (slow, needs the model)")
+    args = ap.parse_args(argv)
+
+    cases = load_cases()
+
+    start = time.perf_counter()
+    model = get_ngram_classifier()
+    load_ms = (time.perf_counter() - start) * 1000
+    if model is None:
+        print("✖ n-gram model not found; run training/train_ngram_classifier.py", file=sys.stderr)
+        return 1
+    threshold = classifier_threshold()
+
+    llm_classify = None
+    if args.llm:
+        from clipfix.engines.llm import llm_classify
+
+    def llm_kind(text):
+        cls = llm_classify(text)
+        return cls.get("inner_kind") or cls.get("kind")
+
+    gated_llm_calls = 0
+
+    def gated(text):
+        nonlocal gated_llm_calls
+        guess = model.predict(text)
+        if guess.confidence >= threshold:
+            return guess.kind
+        gated_llm_calls += 1
+        return llm_kind(text) if llm_classify else guess.kind
+
+    print(f"{len(cases)} cases, model loaded in {load_ms:.1f} ms, threshold {threshold}\n")
+    print(f"{'classifier':>10} {'correct':>7} {'acc':>6} {'p50 (us)':>10} {'p99 (us)':>10}")
+    run("heuristic", lambda t: detect_language(t).kind, cases)
+    run("ngram", lambda t: model.predict(t).kind, cases)
+    run("gated", gated, cases)
+    if llm_classify:
+        run("llm", llm_kind, cases)
+    note = "" if llm_classify else " (n-gram answer used instead; pass --llm to run them)"
+    print(f"\nGated path sent {gated_llm_calls}/{len(cases)} cases to the LLM{note}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON pretty-printing paths across input sizes.
+
+Compares the stdlib (json.loads + json.dumps), orjson (when installed)
+and the streaming re-indenter (both joined into one string and consumed
+chunk by chunk), reporting wall time, throughput and the peak RSS growth
+over the input itself. Each measurement runs in a fresh process so earlier
+runs do not inflate the high-water mark.
+
+Usage:
+    python benchmarks/bench_json.py [--max-mb 64]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import random
+import resource
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.json_stream import dumps_orjson, dumps_stdlib, iter_reindent, reindent_json
+
+
+def make_payload(target_bytes: int, seed: int = 0) -> str:
+    """
+    Build a minified API-response-like JSON document of roughly target_bytes.
+
+    A pool of distinct records is repeated, so building the payload needs
+    little more memory than the payload itself.
+    """
+    rng = random.Random(seed)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12)))
+
+    pool = []
+    for _ in range(1000):
+        record = {
+            "id": rng.randint(1, 10**9),
+            "name": word(),
+            "active": rng.random() < 0.5,
+            "tags": [word() for _ in range(rng.randint(0, 4))],
+            "owner": {"login": word(), "team": None},
+        }
+        pool.append(json.dumps(record, separators=(",", ":")))
+
+    avg = sum(len(r) + 1 for r in pool) / len(pool)
+    count = max(1, int(target_bytes / avg))
+    items = [pool[i % len(pool)] for i in range(count)]
+    items[0] = '{"items":[' + items[0]
+    items[-1] = items[-1] + '],"count":' + str(count) + "}"
+    return ",".join(items)
+
+
+def stream_to_sink(text: str):
+    """Streaming path consumed chunk by chunk, as a writer to a file would (returns a sha256 object)."""
+    digest = hashlib.sha256()
+    for chunk in iter_reindent(text):
+        digest.update(chunk.encode("utf-8"))
+    digest.update(b"\n")
+    return digest
+
+
+def _digest(out):
+    """Hash a path's output; the chunk path already returns a hash object."""
+    if out is None or not isinstance(out, str):
+        return out
+    return hashlib.sha256(out.encode("utf-8"))
+
+
+PATHS = {
+    "stdlib": dumps_stdlib,
+    "orjson": dumps_orjson,
+    "stream": reindent_json,
+    "chunks": stream_to_sink,
+}
+
+
+def _max_rss() -> int:
+    """Peak RSS of this process in bytes."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def measure(path: str, size: int):
+    """
+    Run one path on a fresh payload.
+
+    Returns (output sha256, input length, seconds, peak RSS growth in bytes).
+    Only a digest goes back to the parent: a child's peak RSS starts at the
+    parent's size, so the parent must stay small.
+    """
+    text = make_payload(size)
+    baseline = _max_rss()
+    start = time.perf_counter()
+    out = PATHS[path](text)
+    elapsed = time.perf_counter() - start
+    peak = _max_rss() - baseline
+    digest = _digest(out)
+    return (digest.hexdigest() if digest is not None else None), len(text), elapsed, peak
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--max-mb", type=float, default=64, help="Largest payload size in MB")
+    args = ap.parse_args(argv)
+
+    sizes = [10_000, 100_000, 1_000_000, 10_000_000, 64_000_000, 200_000_000]
+    sizes = [s for s in sizes if s <= args.max_mb * 1_000_000]
+
+    ctx = multiprocessing.get_context("spawn")
+
+    print(f"{'size':>10} {'path':>8} {'time':>9} {'MB/s':>8} {'peak RSS +':>11} {'same':>5}")
+    for size in sizes:
+        reference = None
+        for name in PATHS:
+            with ctx.Pool(1) as pool:
+                out, length, elapsed, peak = pool.apply(measure, (name, size))
+            if out is None:
+                print(f"{length:>10} {name:>8} {'n/a':>9}")
+                continue
+            if reference is None:
+                reference = out
+            same = "yes" if out == reference else "NO"
+            mbps = length / 1e6 / elapsed if elapsed > 0 else float("inf")
+            print(f"{length:>10} {name:>8} {elapsed:>8.3f}s {mbps:>8.1f} {peak / 1e6:>9.1f}MB {same:>5}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,37 +4,144 @@ Inspired by qlty's caching but simplified for clipboard use case.
 Provides instant results for unchanged code.
 """
 
+import atexit
 import hashlib
-import json
-import os
+import sys
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
-from dataclasses import dataclass, asdict
-import tempfile
-import fcntl
-
-
-@dataclass
-class CacheEntry:
-    """Represents a cached formatting result."""
-    code_hash: str           # SHA-256 hash of input code
-    language: str            # Detected language
-    formatter: str           # Formatter used (e.g., "black", "prettier")
-    success: bool            # Whether formatting succeeded
-    output: str              # Formatted code
-    mode: str               # Mode/status string
-    timestamp: float         # Unix timestamp when cached
-    hit_count: int = 0       # Number of cache hits
-
-    def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return asdict(self)
-
-    @classmethod
-    def from_dict(cls, data: dict) -> 'CacheEntry':
-        """Create from dictionary."""
-        return cls(**data)
+from typing import Callable, Optional, Set, Tuple, Dict, Any, List
+
+from .cache_backends import CacheBackend, CacheEntry, open_backend
+from .cache_bloom import BloomFilter
+from .cache_bundle import BundleRow, read_bundle, write_bundle
+from .cache_policy import Candidate, make_policy
+from .cache_remote import RemoteCache, open_remote
+from .cache_telemetry import TELEMETRY_FILE, UNKNOWN, CacheTelemetry, formatter_label, summarize
+from .locking import InterProcessLock
+
+# Minimum time between background sweeps of expired entries
+GC_INTERVAL_SECONDS = 3600
+
+# Expired entries removed per sweep; a full batch leaves the sweep due,
+# so a large backlog is worked off over the next few writes
+GC_BATCH = 500
+
+# Hits buffered before their access metadata is written back
+ACCESS_FLUSH_BATCH = 64
+
+# Least recently used entries the policy chooses among, beyond the
+# number that must go
+EVICTION_WINDOW = 16
+
+# Bloom filter capacity per max_entries: entry and content keys, with
+# headroom for the keys of evicted entries until the next rebuild
+BLOOM_KEYS_PER_ENTRY = 8
+
+# Entries needed before a compression dictionary is trained on them,
+# and how many of the most recently used ones are sampled
+DICT_TRAIN_MIN_ENTRIES = 200
+DICT_TRAIN_SAMPLES = 1000
+
+# Entries written per transaction when importing a bundle
+IMPORT_BATCH = 1000
+
+# Prefix keeping content-index hashes apart from entry keys in the filter
+_CONTENT_PREFIX = "c:"
+
+# Approximate per-entry bookkeeping (entry object, key, dict slot) on top
+# of the output string itself
+_ENTRY_OVERHEAD = 400
+
+
+def _entry_size(entry: CacheEntry) -> int:
+    """Approximate memory held by an entry (O(1))."""
+    return sys.getsizeof(entry.output) + _ENTRY_OVERHEAD
+
+
+class MemoryLRU:
+    """
+    Bounded in-memory tier: an ordered LRU with entry and byte budgets.
+
+    Thread-safe; get() moves an entry to the most recently used end and
+    put() evicts from the other end until both budgets hold.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize memory tier.
+
+        Args:
+            max_entries: Maximum number of entries held
+            max_bytes: Maximum approximate size of held entries
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[CacheEntry, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry and mark it most recently used."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Insert or replace an entry, evicting least recently used ones."""
+        size = _entry_size(entry)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.max_bytes:
+                # Would evict everything else and still not fit
+                return
+            self._entries[key] = (entry, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key: str) -> Optional[CacheEntry]:
+        """Remove an entry if present."""
+        with self._lock:
+            item = self._entries.pop(key, None)
+            if item is None:
+                return None
+            self.bytes -= item[1]
+            return item[0]
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def items(self) -> List[Tuple[str, CacheEntry]]:
+        """Snapshot of (key, entry) pairs, least recently used first."""
+        with self._lock:
+            return [(key, item[0]) for key, item in self._entries.items()]
+
+    def values(self) -> List[CacheEntry]:
+        """Snapshot of entries, least recently used first."""
+        return [entry for _, entry in self.items()]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
 
 
 class FormatterCache:
@@ -42,66 +149,195 @@ class FormatterCache:
     Simple and fast cache for formatter results.
 
     Features:
-    - Content-based caching (SHA-256 hash)
-    - TTL-based expiration
-    - LRU eviction when size limit reached
-    - File-based persistence
-    - Thread-safe operations
+    - Content-based caching (SHA-256 hash), keyed by formatter identity
+      (version, binary, flags, config) when the caller gives one, so an
+      upgrade misses instead of serving stale output and entries need
+      no TTL
+    - Content-only index (code hash -> last resolved language), so a
+      repeated paste skips detection and classification
+    - Fixed points: every formatted output is indexed too, so copying
+      already-formatted code back hits without running the formatter
+    - Memory-mapped Bloom filter in front of storage, so misses are
+      answered without a query or file access; a missing one is built
+      from storage on the write path, never at startup
+    - Bounded in-memory LRU tier (entry and byte budgets) in front of
+      persistent storage; disk hits are promoted into it
+    - Negative entries: a formatter's deterministic failure is cached
+      under its identity (name, version, binary) with a short TTL, so a
+      paste it rejected fails again without running it
+    - Optional TTL-based expiration, checked lazily on read; expired entries are
+      swept in small batches at most once per GC_INTERVAL_SECONDS, or
+      all at once by gc()
+    - Hit counts and access times persisted in batches, without
+      rewriting payloads
+    - Frequency-aware admission and eviction (TinyLFU by default, see
+      cache_policy) when the entry or size limit is reached
+    - Pluggable persistence (SQLite in WAL mode by default, see
+      cache_backends), with compressed payloads (see cache_codec)
+    - Thread- and process-safe writes (storage, eviction and sweeps run
+      under an advisory lock on cache.lock)
+    - Measured telemetry (see cache_telemetry): hits, misses, evictions
+      and expirations per language and formatter, the formatting time
+      hits saved, and lookup latency percentiles, kept across processes
+    - Optional shared remote tier (see cache_remote): local misses are
+      read through from it within a latency budget, new results written
+      behind to it
     """
 
     def __init__(
         self,
         cache_dir: Optional[Path] = None,
-        ttl_seconds: int = 86400,  # 24 hours default
+        ttl_seconds: Optional[int] = None,  # no expiry by default
+        failure_ttl_seconds: int = 600,  # 10 minutes default
         max_entries: int = 1000,
-        max_size_mb: int = 50
+        max_size_mb: int = 50,
+        backend: Optional[str] = None,
+        memory_entries: int = 256,
+        memory_mb: int = 16,
+        policy: Optional[str] = None,
+        remote: Optional[RemoteCache] = None
     ):
         """
         Initialize formatter cache.
 
         Args:
             cache_dir: Directory to store cache. None = ~/.ecliplint/cache/
-            ttl_seconds: Time-to-live for cache entries in seconds
+            ttl_seconds: Time-to-live for cache entries in seconds. None =
+                entries live until evicted
+            failure_ttl_seconds: Time-to-live for cached formatter failures in seconds
             max_entries: Maximum number of cache entries
             max_size_mb: Maximum cache size in megabytes
+            backend: "sqlite" or "file". None = ECLIPLINT_CACHE_BACKEND or sqlite
+            memory_entries: Maximum number of entries held in memory
+            memory_mb: Maximum size of entries held in memory in megabytes
+            policy: "tinylfu", "lru" or "lfu". None = ECLIPLINT_CACHE_POLICY or tinylfu
+            remote: Shared remote tier behind this cache. None = local only
         """
         if cache_dir is None:
             cache_dir = Path.home() / ".ecliplint" / "cache"
 
         self.cache_dir = Path(cache_dir)
         self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
         self.max_entries = max_entries
         self.max_size_mb = max_size_mb
 
         # Create cache directory if it doesn't exist
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-        # Cache index file (maps hash -> cache file)
-        self.index_file = self.cache_dir / "index.json"
+        # Persistent storage, written under a lock shared with other processes
+        self.backend: CacheBackend = open_backend(self.cache_dir, backend)
+        self.lock = InterProcessLock(self.cache_dir / "cache.lock")
+
+        # In-memory LRU tier for fast lookups
+        self.memory_cache = MemoryLRU(memory_entries, memory_mb * 1024 * 1024)
+
+        # Marker file whose mtime records the last expiry sweep
+        self.gc_marker = self.cache_dir / "last_gc"
+
+        # Negative-lookup filter over entry and content keys (None until
+        # built, if there is none yet)
+        self._bloom_pending = False
+        self.bloom = self._open_bloom()
+
+        # Eviction/admission policy
+        self.policy = make_policy(policy, max_entries, self.cache_dir)
+        self.admission_rejects = 0
+        self.fixed_point_hits = 0
+        self.failure_hits = 0
 
-        # In-memory cache for fast lookups
-        self.memory_cache: Dict[str, CacheEntry] = {}
+        # Persistent counters and lookup latencies
+        self.telemetry = CacheTelemetry(self.cache_dir / TELEMETRY_FILE)
 
-        # Load existing cache index
-        self._load_index()
+        # Shared tier consulted after local misses
+        self.remote = remote
 
-        # Clean expired entries on startup
-        self._clean_expired()
+        # Hits not yet written back: key -> (hit count, last access)
+        self._pending_access: Dict[str, Tuple[int, float]] = {}
+        self._access_lock = threading.Lock()
+        atexit.register(self.flush)
 
-    def _compute_hash(self, code: str, language: str) -> str:
+        # Train a compression dictionary at most once per process
+        self._dict_checked = False
+
+    def _open_bloom(self, create: bool = False) -> Optional[BloomFilter]:
+        """
+        Map the Bloom filter.
+
+        A new (or resized) filter has to be filled from every stored key,
+        so it is only built with create=True, by _build_bloom(); until
+        then there is no filter and lookups go to storage.
+        """
+        try:
+            bloom = BloomFilter(self.cache_dir / "keys.bloom", self.max_entries * BLOOM_KEYS_PER_ENTRY,
+                                create=create)
+            if bloom.created:
+                bloom.rebuild(self._all_filter_keys())
+            return bloom
+        except FileNotFoundError:
+            # Not built yet (or built for another max_entries)
+            self._bloom_pending = True
+            return None
+        except Exception as e:
+            # Not critical - every lookup goes to storage instead
+            print(f"Cache Bloom filter unavailable: {e}", file=sys.stderr)
+            return None
+
+    def _build_bloom(self) -> None:
+        """Build the Bloom filter from storage if startup found none."""
+        if not self._bloom_pending:
+            return
+        self._bloom_pending = False
+        with self.lock:
+            self.bloom = self._open_bloom(create=True)
+
+    def _all_filter_keys(self) -> List[str]:
+        keys = self.backend.keys()
+        keys.extend(_CONTENT_PREFIX + h for h in self.backend.content_items())
+        return keys
+
+    def _maybe_cached(self, filter_key: str) -> bool:
+        """False only if filter_key is definitely not stored."""
+        return self.bloom is None or filter_key in self.bloom
+
+    def _filter_add(self, filter_key: str) -> None:
+        if self.bloom is None:
+            return
+        try:
+            self.bloom.add(filter_key)
+            if self.bloom.saturated:
+                # Drop the bits of removed entries
+                self.bloom.rebuild(self._all_filter_keys())
+        except Exception as e:
+            # Not critical - lookups fall back to storage
+            print(f"Cache Bloom filter disabled: {e}", file=sys.stderr)
+            self.bloom = None
+
+    def _compute_hash(self, code: str, language: str, identity: Optional[str] = None) -> str:
         """
         Compute hash for cache key.
 
         Includes both code content and language to avoid collisions
-        when same code is detected as different languages.
+        when same code is detected as different languages, and the
+        formatter identity if there is one.
         """
-        content = f"{language}:{code}"
+        content = f"{language}:{code}" if identity is None else f"{language}:{identity}:{code}"
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _compute_failure_hash(self, code: str, language: str, formatter: str) -> str:
+        """Compute hash for a negative entry (formatter identity included)."""
+        content = f"failed:{formatter}:{language}:{code}"
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
+    def _compute_content_hash(self, code: str) -> str:
+        """Compute hash of code alone (key of the content index)."""
+        return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
     def get(
         self,
         code: str,
-        language: str
+        language: str,
+        identity: Optional[str] = None
     ) -> Optional[Tuple[bool, str, str]]:
         """
         Get formatted code from cache.
@@ -109,56 +345,277 @@ class FormatterCache:
         Args:
             code: Input code to format
             language: Detected language
+            identity: Identity of the formatter that would run (see put)
 
         Returns:
             (success, output, mode) if cached, None if not cached or expired
         """
-        cache_key = self._compute_hash(code, language)
+        start = time.perf_counter()
+        entry = self._lookup_entry(self._compute_hash(code, language, identity))
+        if entry is not None:
+            result = self._as_result(entry)
+        else:
+            entry = self._get_formatted(code, language, identity)
+            result = self._content_result(code, entry) if entry is not None else None
+        if entry is None and self.remote is not None and identity is not None:
+            entry = self._get_remote([(code, language, identity)])[0]
+            result = self._as_result(entry) if entry is not None else None
+        self._record_lookup(language, identity, entry, time.perf_counter() - start)
+        return result
+
+    def get_many(
+        self,
+        requests: List[Tuple[str, str, Optional[str]]]
+    ) -> List[Optional[Tuple[bool, str, str]]]:
+        """
+        Get several results at once.
 
-        # Check memory cache first
-        if cache_key in self.memory_cache:
-            entry = self.memory_cache[cache_key]
+        Each key is hashed once, and everything the memory tier and the
+        Bloom filter cannot answer is read from storage in one pass.
 
-            # Check if expired
-            if time.time() - entry.timestamp > self.ttl_seconds:
-                # Expired, remove from cache
-                del self.memory_cache[cache_key]
-                return None
+        Args:
+            requests: (code, language, identity) per lookup, as for get()
+
+        Returns:
+            (success, output, mode) or None per request, in order
+        """
+        start = time.perf_counter()
+        now = time.time()
+        keys = [self._compute_hash(code, language, identity) for code, language, identity in requests]
+
+        found: Dict[str, CacheEntry] = {}
+        to_load = []
+        for cache_key in keys:
+            self.policy.record(cache_key)
+            entry = self.memory_cache.get(cache_key)
+            if entry is not None:
+                found[cache_key] = entry
+            elif self._maybe_cached(cache_key):
+                to_load.append(cache_key)
+        if to_load:
+            found.update(self.backend.load_many(to_load))
+
+        results = []
+        entries: List[Optional[CacheEntry]] = []
+        for (code, language, identity), cache_key in zip(requests, keys):
+            entry = found.get(cache_key)
+            if entry is not None:
+                entry = self._accept(cache_key, entry, now)
+            if entry is not None:
+                results.append(self._as_result(entry))
+            else:
+                entry = self._get_formatted(code, language, identity)
+                results.append(self._content_result(code, entry) if entry is not None else None)
+            entries.append(entry)
+
+        # Everything missed locally goes to the remote tier in one request
+        if self.remote is not None:
+            missed = [i for i, entry in enumerate(entries) if entry is None and requests[i][2] is not None]
+            if missed:
+                for i, entry in zip(missed, self._get_remote([requests[i] for i in missed])):
+                    if entry is not None:
+                        entries[i] = entry
+                        results[i] = self._as_result(entry)
+
+        for (code, language, identity), entry in zip(requests, entries):
+            self._record_lookup(language, identity, entry)
+        # One latency sample per call, however many segments it answered
+        self.telemetry.record_latency(time.perf_counter() - start)
+        return results
+
+    def _get_remote(self, requests: List[Tuple[str, str, str]]) -> List[Optional[CacheEntry]]:
+        """
+        Read local misses through from the remote tier.
 
-            # Update hit count
-            entry.hit_count += 1
+        Hits are stored locally under the local identity, so the next
+        lookup does not leave the machine.
 
-            # Cache hit!
-            return entry.success, entry.output, f"{entry.mode}:cached"
+        Args:
+            requests: (code, language, identity) per lookup
 
-        # Check disk cache
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        if cache_file.exists():
+        Returns:
+            Entry or None per request
+        """
+        errors = self.remote.errors
+        found = self.remote.get_many(requests)
+        if self.remote.errors > errors:
+            self.telemetry.record("remote_errors", UNKNOWN, UNKNOWN)
+
+        now = time.time()
+        entries: List[Optional[CacheEntry]] = []
+        batch: List[Tuple[str, CacheEntry]] = []
+        for (code, language, identity), item in zip(requests, found):
+            if item is None:
+                entries.append(None)
+                continue
+            cache_key = self._compute_hash(code, language, identity)
             try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    entry = CacheEntry.from_dict(data)
+                duration = float(item.get("duration") or 0.0)
+            except (TypeError, ValueError):
+                duration = 0.0
+            entry = CacheEntry(
+                code_hash=cache_key,
+                language=language,
+                formatter=identity,
+                success=True,
+                output=item["output"],
+                mode=str(item.get("mode") or "formatted"),
+                timestamp=now,
+                hit_count=1,
+                duration=duration
+            )
+            self.memory_cache.put(cache_key, entry)
+            self.telemetry.record("remote_hits", language, formatter_label(identity))
+            entries.append(entry)
+            batch.append((code, entry))
+        if batch:
+            with self.lock:
+                self._store(batch)
+        return entries
+
+    def _record_lookup(
+        self,
+        language: str,
+        identity: Optional[str],
+        entry: Optional[CacheEntry],
+        latency: Optional[float] = None
+    ) -> None:
+        """Count a hit (with the formatting time it saved) or a miss."""
+        if entry is not None:
+            self.telemetry.record("hits", entry.language, formatter_label(entry.formatter), entry.duration, latency)
+        else:
+            self.telemetry.record("misses", language, formatter_label(identity), latency=latency)
 
-                    # Check if expired
-                    if time.time() - entry.timestamp > self.ttl_seconds:
-                        # Expired, remove from cache
-                        cache_file.unlink()
-                        return None
+    def _get_formatted(
+        self,
+        code: str,
+        language: str,
+        identity: Optional[str]
+    ) -> Optional[CacheEntry]:
+        """Entry whose input or output is code, formatted in this language."""
+        content_hash = self._compute_content_hash(code)
+        entry = self._lookup_content(content_hash)
+        if entry is None or entry.language != language:
+            return None
+        if identity is not None and entry.formatter != identity:
+            # Made by another formatter version
+            return None
+        return entry
+
+    def get_by_content(
+        self,
+        code: str,
+        identity: Optional[Callable[[str], str]] = None
+    ) -> Optional[Tuple[str, Tuple[bool, str, str]]]:
+        """
+        Look up code by content alone, without knowing its language.
 
-                    # Load into memory cache
-                    self.memory_cache[cache_key] = entry
+        Args:
+            code: Input code to format
+            identity: Maps a language to the identity of the formatter that
+                would run now; entries made by another one are ignored
 
-                    # Update hit count
-                    entry.hit_count += 1
+        Returns:
+            (language, (success, output, mode)) for the language this code
+            was last cached under, None if not cached or expired
+        """
+        start = time.perf_counter()
+        entry = self._lookup_content(self._compute_content_hash(code))
+        if entry is not None and identity is not None and entry.formatter != identity(entry.language):
+            entry = None
+        if entry is None:
+            # Not counted as a miss: the caller goes on to a keyed lookup
+            self.telemetry.record_latency(time.perf_counter() - start)
+            return None
+        self._record_lookup(entry.language, None, entry, time.perf_counter() - start)
+        return entry.language, self._content_result(code, entry)
+
+    def get_failure(self, code: str, language: str, formatter: str) -> Optional[str]:
+        """
+        Get a cached formatter failure.
 
-                    return entry.success, entry.output, f"{entry.mode}:cached"
-            except Exception:
-                # Corrupted cache file, remove it
-                cache_file.unlink()
+        Args:
+            code: Input code to format
+            language: Detected language
+            formatter: Identity of the formatter that would run
+
+        Returns:
+            The formatter's error text if it rejected this input before,
+            None if not cached or expired
+        """
+        entry = self._lookup_entry(self._compute_failure_hash(code, language, formatter))
+        if entry is None or entry.success:
+            return None
+        self.failure_hits += 1
+        return entry.output
+
+    def _lookup_content(self, content_hash: str) -> Optional[CacheEntry]:
+        """Get the live entry the content index maps content_hash to."""
+        if not self._maybe_cached(_CONTENT_PREFIX + content_hash):
+            return None
+        cache_key = self.backend.content_lookup(content_hash)
+        if cache_key is None:
+            return None
+
+        entry = self._lookup_entry(cache_key)
+        if entry is None:
+            # Entry evicted or expired since it was indexed
+            self.backend.content_forget(content_hash)
+        return entry
+
+    def _content_result(self, code: str, entry: CacheEntry) -> Tuple[bool, str, str]:
+        """Result for code found through the content index."""
+        own_keys = (self._compute_hash(code, entry.language), self._compute_hash(code, entry.language, entry.formatter))
+        if entry.output == code and entry.code_hash not in own_keys:
+            # Fixed point: code is another input's formatted output
+            self.fixed_point_hits += 1
+            return entry.success, code, "already formatted:cached"
+        return self._as_result(entry)
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        ttl = self.ttl_seconds if entry.success else self.failure_ttl_seconds
+        return ttl is not None and now - entry.timestamp > ttl
+
+    @staticmethod
+    def _as_result(entry: CacheEntry) -> Tuple[bool, str, str]:
+        return entry.success, entry.output, f"{entry.mode}:cached"
+
+    def _lookup_entry(self, cache_key: str) -> Optional[CacheEntry]:
+        """Get a live entry (memory tier, then backend) and record the hit."""
+        now = time.time()
+        self.policy.record(cache_key)
+
+        # Check memory tier first, then the backend
+        entry = self.memory_cache.get(cache_key)
+        if entry is None:
+            if not self._maybe_cached(cache_key):
+                # Definite miss, no storage access
                 return None
+            entry = self.backend.load(cache_key)
+            if entry is None:
+                # Cache miss
+                return None
+        return self._accept(cache_key, entry, now)
+
+    def _accept(self, cache_key: str, entry: CacheEntry, now: float) -> Optional[CacheEntry]:
+        """Drop an expired entry, or promote a live one and count the hit."""
+        # Check if expired
+        if self._expired(entry, now):
+            # Expired, remove from cache
+            self.memory_cache.pop(cache_key)
+            self.backend.delete(cache_key)
+            self.telemetry.record("expirations", entry.language, formatter_label(entry.formatter))
+            return None
 
-        # Cache miss
-        return None
+        # Promote into (or refresh in) the memory tier
+        self.memory_cache.put(cache_key, entry)
+
+        # Update hit count (written back in batches)
+        entry.hit_count += 1
+        self._record_access(cache_key, entry.hit_count, now)
+
+        # Cache hit!
+        return entry
 
     def put(
         self,
@@ -167,7 +624,9 @@ class FormatterCache:
         formatter: str,
         success: bool,
         output: str,
-        mode: str
+        mode: str,
+        identity: Optional[str] = None,
+        duration: float = 0.0
     ) -> None:
         """
         Store formatted code in cache.
@@ -177,213 +636,445 @@ class FormatterCache:
             language: Detected language
             formatter: Formatter used
             success: Whether formatting succeeded
-            output: Formatted code
+            output: Formatted code, or the formatter's error text on failure
             mode: Mode/status string
+            identity: Identity of the formatter (version, binary, flags).
+                Part of the key, and recorded as the entry's formatter
+            duration: Seconds the formatter took; a hit counts it as saved
         """
-        # Don't cache LLM repairs (non-deterministic)
-        if "llm" in mode.lower():
+        self.put_many([(code, language, formatter, success, output, mode, identity, duration)])
+
+    def put_many(
+        self,
+        items: List[Tuple[str, str, str, bool, str, str, Optional[str], float]]
+    ) -> None:
+        """
+        Store several results at once.
+
+        Entries and their content index mappings are written in one
+        transaction, followed by a single limit check.
+
+        Args:
+            items: (code, language, formatter, success, output, mode,
+                identity, duration) per result, as for put()
+        """
+        now = time.time()
+        batch: List[Tuple[str, CacheEntry]] = []
+        uploads = []
+        for code, language, formatter, success, output, mode, identity, duration in items:
+            # Don't cache LLM repairs (non-deterministic)
+            if "llm" in mode.lower():
+                continue
+
+            # Failures are only looked up by get_failure(), under the formatter
+            # identity, and are neither content-indexed nor fixed points
+            if not success:
+                cache_key = self._compute_failure_hash(code, language, formatter)
+            else:
+                cache_key = self._compute_hash(code, language, identity)
+
+            # Create cache entry
+            entry = CacheEntry(
+                code_hash=cache_key,
+                language=language,
+                formatter=identity if identity is not None else formatter,
+                success=success,
+                output=output,
+                mode=mode,
+                timestamp=now,
+                hit_count=0,
+                duration=duration
+            )
+            self.memory_cache.put(cache_key, entry)
+            batch.append((code, entry))
+            if success and identity is not None:
+                uploads.append((code, language, identity, output, mode, duration))
+        if not batch:
             return
 
-        # Don't cache failures (might be transient)
-        if not success:
+        # Share with other machines (queued, uploaded in the background)
+        if self.remote is not None and uploads:
+            self.remote.put_many(uploads)
+
+        # Store on disk what the policy admits
+        with self.lock:
+            stored = self._store(batch)
+        self.admission_rejects += len(batch) - stored
+        if not any(entry.success for _, entry in batch):
             return
 
-        cache_key = self._compute_hash(code, language)
-
-        # Create cache entry
-        entry = CacheEntry(
-            code_hash=cache_key,
-            language=language,
-            formatter=formatter,
-            success=success,
-            output=output,
-            mode=mode,
-            timestamp=time.time(),
-            hit_count=0
-        )
+        # Compress with a trained dictionary once there is enough to train on
+        if not self._dict_checked and self.backend.count() >= DICT_TRAIN_MIN_ENTRIES:
+            self._dict_checked = True
+            if not self.backend.codec.dict_id:
+                self.train_dictionary()
+
+        # Sweep some expired entries if a sweep is due
+        self._maybe_sweep()
 
-        # Store in memory cache
-        self.memory_cache[cache_key] = entry
+        # Build a missing Bloom filter here rather than at startup
+        self._build_bloom()
+
+    def _store(self, batch: List[Tuple[str, CacheEntry]]) -> int:
+        """
+        Write entries, their index mappings and evictions (under the lock).
+
+        Args:
+            batch: (input code, entry) pairs
+
+        Returns:
+            Number of entries the policy admitted
+        """
+        sizes = [len(entry.output.encode('utf-8')) for _, entry in batch]
+        over_entries, over_bytes = self._over_limits(sum(sizes))
+        if over_entries + len(batch) <= 0 and over_bytes <= 0:
+            # Room for all of them
+            admitted = [entry for _, entry in batch]
+        else:
+            admitted = [entry for (_, entry), size in zip(batch, sizes) if self._admit(entry.code_hash, size)]
+        if not admitted:
+            return 0
+
+        admitted_keys = {entry.code_hash for entry in admitted}
+        content: Dict[str, str] = {}
+        for code, entry in batch:
+            if not entry.success or entry.code_hash not in admitted_keys:
+                continue
+            # Remember the language this content resolved to
+            content[self._compute_content_hash(code)] = entry.code_hash
+
+            # The output is a fixed point (formatting it changes nothing), so
+            # index it too; the mapping goes away with the entry
+            if entry.output != code:
+                content[self._compute_content_hash(entry.output)] = entry.code_hash
 
-        # Store on disk
-        cache_file = self.cache_dir / f"{cache_key}.json"
         try:
-            # Write to temp file first (atomic write)
-            with tempfile.NamedTemporaryFile(
-                mode='w',
-                dir=self.cache_dir,
-                delete=False
-            ) as tmp:
-                json.dump(entry.to_dict(), tmp, indent=2)
-                tmp_path = tmp.name
-
-            # Atomic rename
-            os.rename(tmp_path, cache_file)
+            self.backend.store_many(admitted, content)
         except Exception as e:
             # Cache write failed, not critical
-            print(f"Cache write failed: {e}", file=os.sys.stderr)
+            print(f"Cache write failed: {e}", file=sys.stderr)
+            return 0
+        for entry in admitted:
+            self._filter_add(entry.code_hash)
+        for content_hash in content:
+            self._filter_add(_CONTENT_PREFIX + content_hash)
 
         # Check cache limits
-        self._enforce_limits()
+        self._enforce_limits(protect=admitted_keys)
+        return len(admitted)
 
-    def _load_index(self) -> None:
-        """Load cache index from disk."""
-        if self.index_file.exists():
-            try:
-                with open(self.index_file, 'r') as f:
-                    index = json.load(f)
-
-                # Load entries into memory (up to a limit)
-                for cache_key in list(index.keys())[:100]:  # Load first 100
-                    cache_file = self.cache_dir / f"{cache_key}.json"
-                    if cache_file.exists():
-                        try:
-                            with open(cache_file, 'r') as f:
-                                data = json.load(f)
-                                self.memory_cache[cache_key] = CacheEntry.from_dict(data)
-                        except Exception:
-                            # Corrupted entry, skip
-                            pass
-            except Exception:
-                # Corrupted index, will be rebuilt
-                pass
+    def _clean_expired(self, limit: Optional[int] = None) -> int:
+        """
+        Remove expired cache entries.
+
+        Args:
+            limit: Remove at most this many from storage. None = all
 
-    def _save_index(self) -> None:
-        """Save cache index to disk."""
-        index = {}
+        Returns:
+            Number of entries removed from storage
+        """
+        now = time.time()
+        cutoff = now - self.ttl_seconds if self.ttl_seconds is not None else None
+        failure_cutoff = now - self.failure_ttl_seconds if self.failure_ttl_seconds is not None else None
+        removed = []
+        if cutoff is not None or failure_cutoff is not None:
+            with self.lock:
+                removed = self.backend.expire(cutoff, failure_cutoff, limit)
+        for _ in removed:
+            # Swept without reading the entries back
+            self.telemetry.record("expirations", UNKNOWN, UNKNOWN)
 
-        # Build index from cache files
-        for cache_file in self.cache_dir.glob("*.json"):
-            if cache_file != self.index_file:
-                cache_key = cache_file.stem
-                index[cache_key] = str(cache_file)
+        # Clear expired entries from memory cache
+        expired_keys = [
+            key for key, entry in self.memory_cache.items()
+            if self._expired(entry, now)
+        ]
+        for key in expired_keys:
+            self.memory_cache.pop(key)
+        return len(removed)
 
-        # Save index
+    def _last_sweep(self) -> float:
         try:
-            with tempfile.NamedTemporaryFile(
-                mode='w',
-                dir=self.cache_dir,
-                delete=False
-            ) as tmp:
-                json.dump(index, tmp, indent=2)
-                tmp_path = tmp.name
-
-            os.rename(tmp_path, self.index_file)
-        except Exception:
-            # Index save failed, not critical
+            return self.gc_marker.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def _mark_swept(self) -> None:
+        try:
+            self.gc_marker.touch()
+        except OSError:
+            # Marker write failed, not critical (the next put sweeps again)
             pass
 
-    def _clean_expired(self) -> None:
-        """Remove expired cache entries."""
-        now = time.time()
-        expired_files = []
+    def _maybe_sweep(self) -> None:
+        """
+        Remove one batch of expired entries if the last sweep is old enough.
 
-        # Check all cache files
-        for cache_file in self.cache_dir.glob("*.json"):
-            if cache_file == self.index_file:
-                continue
+        Runs on the write path, after formatting, so reads and startup
+        never pay for it. The sweep only counts as done once a batch
+        comes back short.
+        """
+        if time.time() - self._last_sweep() < GC_INTERVAL_SECONDS:
+            return
+        if self._clean_expired(GC_BATCH) < GC_BATCH:
+            self._mark_swept()
 
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    timestamp = data.get('timestamp', 0)
+    def gc(self) -> int:
+        """
+        Remove all expired entries now and retrain the compression dictionary.
 
-                    if now - timestamp > self.ttl_seconds:
-                        expired_files.append(cache_file)
-            except Exception:
-                # Corrupted file, mark for removal
-                expired_files.append(cache_file)
+        Returns:
+            Number of entries removed
+        """
+        removed = self._clean_expired()
+        self._mark_swept()
+        self._build_bloom()
+        self.train_dictionary()
+        return removed
+
+    def train_dictionary(self) -> Optional[int]:
+        """
+        Train a compression dictionary on recently used outputs.
 
-        # Remove expired files
-        for cache_file in expired_files:
+        New entries are compressed with it; existing ones keep the
+        dictionary they were written with.
+
+        Returns:
+            Dictionary id, None if the cache is too small or training failed
+        """
+        if self.backend.count() < DICT_TRAIN_MIN_ENTRIES:
+            return None
+        return self.backend.codec.train(self.backend.sample_outputs(DICT_TRAIN_SAMPLES))
+
+    def _record_access(self, cache_key: str, hit_count: int, now: float) -> None:
+        with self._access_lock:
+            self._pending_access[cache_key] = (hit_count, now)
+            due = len(self._pending_access) >= ACCESS_FLUSH_BATCH
+        if due:
+            self._flush_access()
+
+    def _flush_access(self) -> None:
+        """Write buffered access metadata (one batch)."""
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+        if pending:
             try:
-                cache_file.unlink()
+                with self.lock:
+                    self.backend.touch_many(pending)
             except Exception:
+                # Access tracking is not critical
                 pass
 
-        # Clear expired entries from memory cache
-        expired_keys = []
-        for key, entry in self.memory_cache.items():
-            if now - entry.timestamp > self.ttl_seconds:
-                expired_keys.append(key)
+    def flush(self) -> None:
+        """Write buffered access metadata, policy state and telemetry to disk."""
+        self._flush_access()
+        self.policy.save()
+        try:
+            with self.lock:
+                self.telemetry.flush()
+        except Exception:
+            # Telemetry is not critical
+            pass
 
-        for key in expired_keys:
-            del self.memory_cache[key]
-
-    def _enforce_limits(self) -> None:
-        """Enforce cache size and entry limits."""
-        # Count cache files
-        cache_files = list(self.cache_dir.glob("*.json"))
-        cache_files = [f for f in cache_files if f != self.index_file]
-
-        # Check entry count
-        if len(cache_files) > self.max_entries:
-            # Sort by modification time (LRU)
-            cache_files.sort(key=lambda f: f.stat().st_mtime)
-
-            # Remove oldest entries
-            to_remove = len(cache_files) - self.max_entries
-            for cache_file in cache_files[:to_remove]:
-                try:
-                    cache_file.unlink()
+    def _over_limits(self, extra_bytes: int = 0) -> Tuple[int, int]:
+        """(entries over the limit, bytes over the limit), either may be <= 0."""
+        return (
+            self.backend.count() - self.max_entries,
+            self.backend.total_size() + extra_bytes - self.max_size_mb * 1024 * 1024,
+        )
 
-                    # Remove from memory cache
-                    cache_key = cache_file.stem
-                    if cache_key in self.memory_cache:
-                        del self.memory_cache[cache_key]
-                except Exception:
-                    pass
+    def _admit(self, cache_key: str, size: int) -> bool:
+        """Whether a new entry may displace the policy's first victim."""
+        over_entries, over_bytes = self._over_limits(size)
+        if over_entries < 0 and over_bytes <= 0:
+            return True
+        self._flush_access()
+        candidates = [c for c in self.backend.coldest(EVICTION_WINDOW) if c[0] != cache_key]
+        if not candidates:
+            return True
+        return self.policy.admit(cache_key, self.policy.order(candidates)[0])
+
+    def _select_victims(
+        self,
+        candidates: List[Candidate],
+        over_entries: int,
+        over_bytes: int,
+        protect: Set[str]
+    ) -> Tuple[List[str], bool]:
+        """
+        Pick victims in policy order until both limits hold.
 
-        # Check total size
-        total_size = sum(f.stat().st_size for f in cache_files)
-        max_size_bytes = self.max_size_mb * 1024 * 1024
+        Returns:
+            (victim keys, whether they are enough)
+        """
+        ordered = self.policy.order(candidates)
+        if len(protect) > 1:
+            # A batch larger than the room left: its own entries go last
+            ordered = [c for c in ordered if c[0] not in protect] + [c for c in ordered if c[0] in protect]
+        victims: List[str] = []
+        freed = 0
+        for key, size, _ in ordered:
+            if len(victims) >= over_entries and freed >= over_bytes:
+                break
+            if key in protect and len(protect) == 1:
+                continue
+            victims.append(key)
+            freed += size
+        return victims, len(victims) >= over_entries and freed >= over_bytes
 
-        if total_size > max_size_bytes:
-            # Sort by access time and hit count
-            cache_entries = []
-            for cache_file in cache_files:
-                try:
-                    with open(cache_file, 'r') as f:
-                        data = json.load(f)
-                        cache_entries.append((
-                            cache_file,
-                            data.get('hit_count', 0),
-                            data.get('timestamp', 0)
-                        ))
-                except Exception:
-                    # Corrupted file, mark for removal
-                    cache_entries.append((cache_file, 0, 0))
+    def _enforce_limits(self, protect: Set[str] = frozenset()) -> None:
+        """
+        Enforce cache size and entry limits.
 
-            # Sort by hit count (ascending) then timestamp (ascending)
-            # Remove least used and oldest first
-            cache_entries.sort(key=lambda x: (x[1], x[2]))
+        The policy chooses among the least recently used entries, a window
+        EVICTION_WINDOW larger than the number that must go (widened until
+        enough bytes are freed).
 
-            # Remove entries until under size limit
-            current_size = total_size
-            for cache_file, _, _ in cache_entries:
-                if current_size <= max_size_bytes:
-                    break
+        Args:
+            protect: Entries just stored: a single one is never evicted, a
+                batch only once everything else is gone
+        """
+        over_entries, over_bytes = self._over_limits()
+        if over_entries <= 0 and over_bytes <= 0:
+            return
 
-                try:
-                    file_size = cache_file.stat().st_size
-                    cache_file.unlink()
-                    current_size -= file_size
-
-                    # Remove from memory cache
-                    cache_key = cache_file.stem
-                    if cache_key in self.memory_cache:
-                        del self.memory_cache[cache_key]
-                except Exception:
-                    pass
+        # Eviction reads the persisted access metadata
+        self._flush_access()
+
+        window = max(over_entries, 0) + EVICTION_WINDOW
+        while True:
+            candidates = self.backend.coldest(window)
+            removed, enough = self._select_victims(candidates, over_entries, over_bytes, protect)
+            if enough or len(candidates) < window:
+                break
+            window *= 2
+        labels = self.backend.labels(removed)
+        self.backend.delete_many(removed)
+        for language, formatter in labels.values():
+            self.telemetry.record("evictions", language, formatter_label(formatter))
+
+        # Remove from memory tier
+        for cache_key in removed:
+            self.memory_cache.pop(cache_key)
+
+    def export_bundle(self, path: Path, portable: Callable[[str], Optional[str]]) -> int:
+        """
+        Write live results to a shareable bundle (see cache_bundle).
+
+        Only entries another machine can reach are exported: successful
+        ones with a content index mapping, made by a formatter portable
+        has a translation for (failures are keyed by the local identity
+        and stay behind).
+
+        Args:
+            path: Bundle file
+            portable: Maps an entry's formatter identity to its portable
+                identity, None for formatters not installed here (the
+                entry is from an older version)
+
+        Returns:
+            Number of entries written
+        """
+        now = time.time()
+        by_key: Dict[str, List[str]] = {}
+        for content_hash, cache_key in self.backend.content_items().items():
+            by_key.setdefault(cache_key, []).append(content_hash)
+
+        rows: List[BundleRow] = []
+        content: List[Tuple[str, int]] = []
+        for entry in self.backend.entries():
+            hashes = by_key.get(entry.code_hash)
+            if not hashes or not entry.success or self._expired(entry, now):
+                continue
+            identity = portable(entry.formatter)
+            if identity is None:
+                continue
+            content.extend((content_hash, len(rows)) for content_hash in hashes)
+            rows.append((entry.code_hash, entry.language, identity, entry.mode,
+                         entry.output, entry.duration, entry.timestamp))
+        write_bundle(path, rows, content)
+        return len(rows)
+
+    def import_bundle(self, path: Path, local: Callable[[str], Optional[str]]) -> Tuple[int, int]:
+        """
+        Merge a bundle's entries into the cache.
+
+        Entries are relabeled with the local formatter identity and found
+        through the content index. Entries and content already cached
+        here are kept as they are; the rest is written in bulk, bypassing
+        admission, and the limits are enforced once at the end (imported
+        entries keep their original age, so local ones are evicted last).
+
+        Args:
+            path: Bundle file
+            local: Maps a portable identity to the local formatter
+                identity, None if the local formatter differs
+
+        Returns:
+            (entries imported, entries skipped as incompatible)
+
+        Raises:
+            ValueError: The file is not a readable bundle
+        """
+        rows, content = read_bundle(path)
+        now = time.time()
+
+        entries: List[Optional[CacheEntry]] = []
+        incompatible = 0
+        for cache_key, language, identity, mode, output, duration, timestamp in rows:
+            formatter = local(identity)
+            if formatter is None:
+                incompatible += 1
+                entries.append(None)
+                continue
+            entry = CacheEntry(
+                code_hash=cache_key,
+                language=language,
+                formatter=formatter,
+                success=True,
+                output=output,
+                mode=mode,
+                timestamp=timestamp,
+                hit_count=0,
+                duration=duration
+            )
+            entries.append(None if self._expired(entry, now) else entry)
+
+        with self.lock:
+            present = self.backend.labels([e.code_hash for e in entries if e is not None])
+            indexed = self.backend.content_items()
+            mappings: Dict[int, Dict[str, str]] = {}
+            for content_hash, index in content:
+                entry = entries[index] if 0 <= index < len(entries) else None
+                if entry is not None and content_hash not in indexed:
+                    mappings.setdefault(index, {})[content_hash] = entry.code_hash
+
+            # Unreachable without a mapping, or already here
+            fresh = [i for i, e in enumerate(entries) if e is not None and i in mappings and e.code_hash not in present]
+            for start in range(0, len(fresh), IMPORT_BATCH):
+                chunk = fresh[start:start + IMPORT_BATCH]
+                batch_content: Dict[str, str] = {}
+                for i in chunk:
+                    batch_content.update(mappings[i])
+                self.backend.store_many([entries[i] for i in chunk], batch_content)
+                for i in chunk:
+                    self._filter_add(entries[i].code_hash)
+                for content_hash in batch_content:
+                    self._filter_add(_CONTENT_PREFIX + content_hash)
+            self._enforce_limits()
+        return len(fresh), incompatible
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        # Remove all cache files
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                cache_file.unlink()
-            except Exception:
-                pass
+        with self.lock:
+            self.backend.clear()
+            if self.bloom is not None:
+                try:
+                    self.bloom.rebuild([])
+                except Exception:
+                    self.bloom = None
+        with self._access_lock:
+            self._pending_access.clear()
 
         # Clear memory cache
         self.memory_cache.clear()
@@ -395,20 +1086,52 @@ class FormatterCache:
         Returns:
             Dictionary with cache stats
         """
-        cache_files = list(self.cache_dir.glob("*.json"))
-        cache_files = [f for f in cache_files if f != self.index_file]
-
-        total_size = sum(f.stat().st_size for f in cache_files)
-
-        # Calculate hit rate from memory cache
-        total_hits = sum(e.hit_count for e in self.memory_cache.values())
+        memory = self.memory_cache
+        total_hits = sum(e.hit_count for e in memory.values())
+
+        # Measured across processes since the counters were started
+        measured = summarize(self.telemetry.snapshot())
+
+        # Compression, and how many entries of the current average stored
+        # size fit the byte budget
+        entries = self.backend.count()
+        stored = self.backend.total_size()
+        raw = self.backend.raw_size()
+        codec = self.backend.codec
+        capacity = self.max_entries
+        if entries and stored:
+            capacity = min(capacity, self.max_size_mb * 1024 * 1024 * entries // stored)
 
         return {
-            "entries": len(cache_files),
-            "size_mb": total_size / (1024 * 1024),
-            "memory_entries": len(self.memory_cache),
+            "entries": entries,
+            "size_mb": stored / (1024 * 1024),
+            "raw_size_mb": raw / (1024 * 1024),
+            "compression_ratio": raw / stored if stored else 1.0,
+            "codec": codec.name + ("+dict" if codec.dict_id else ""),
+            "capacity_entries": capacity,
+            "memory_entries": len(memory),
+            "memory_mb": memory.bytes / (1024 * 1024),
+            "memory_hits": memory.hits,
+            "memory_misses": memory.misses,
+            "memory_evictions": memory.evictions,
             "total_hits": total_hits,
-            "ttl_hours": self.ttl_seconds / 3600,
+            "hits": measured["hits"],
+            "misses": measured["misses"],
+            "evictions": measured["evictions"],
+            "expirations": measured["expirations"],
+            "time_saved_seconds": measured["saved_seconds"],
+            "lookup_p50_ms": measured["lookup_p50"] * 1000 if measured["lookup_p50"] is not None else None,
+            "lookup_p99_ms": measured["lookup_p99"] * 1000 if measured["lookup_p99"] is not None else None,
+            "languages": measured["languages"],
+            "formatters": measured["formatters"],
+            "policy": self.policy.name,
+            "admission_rejects": self.admission_rejects,
+            "fixed_point_hits": self.fixed_point_hits,
+            "failure_hits": self.failure_hits,
+            "remote": self.remote.url if self.remote is not None else None,
+            "remote_hits": measured["remote_hits"],
+            "remote_errors": measured["remote_errors"],
+            "ttl_hours": self.ttl_seconds / 3600 if self.ttl_seconds is not None else None,
             "max_entries": self.max_entries,
             "max_size_mb": self.max_size_mb,
         }
@@ -423,13 +1146,39 @@ def get_formatter_cache(**kwargs) -> FormatterCache:
     global _cache
     if _cache is None:
         _cache = FormatterCache(**kwargs)
+        if "remote" not in kwargs:
+            # Shared tier from ECLIPLINT_REMOTE_CACHE, if configured
+            _cache.remote = open_remote(_cache.cache_dir)
     return _cache
 
 
-def cache_get(code: str, language: str) -> Optional[Tuple[bool, str, str]]:
+def cache_get(code: str, language: str, identity: Optional[str] = None) -> Optional[Tuple[bool, str, str]]:
     """Convenience function to get from cache."""
     cache = get_formatter_cache()
-    return cache.get(code, language)
+    return cache.get(code, language, identity)
+
+
+def cache_get_by_content(
+    code: str,
+    identity: Optional[Callable[[str], str]] = None
+) -> Optional[Tuple[str, Tuple[bool, str, str]]]:
+    """Convenience function to get from cache by content alone."""
+    cache = get_formatter_cache()
+    return cache.get_by_content(code, identity)
+
+
+def cache_get_failure(code: str, language: str, formatter: str) -> Optional[str]:
+    """Convenience function to get a cached formatter failure."""
+    cache = get_formatter_cache()
+    return cache.get_failure(code, language, formatter)
+
+
+def cache_get_many(
+    requests: List[Tuple[str, str, Optional[str]]]
+) -> List[Optional[Tuple[bool, str, str]]]:
+    """Convenience function to get several results from cache."""
+    cache = get_formatter_cache()
+    return cache.get_many(requests)
 
 
 def cache_put(
@@ -438,11 +1187,19 @@ def cache_put(
     formatter: str,
     success: bool,
     output: str,
-    mode: str
+    mode: str,
+    identity: Optional[str] = None,
+    duration: float = 0.0
 ) -> None:
     """Convenience function to put in cache."""
     cache = get_formatter_cache()
-    cache.put(code, language, formatter, success, output, mode)
+    cache.put(code, language, formatter, success, output, mode, identity, duration)
+
+
+def cache_put_many(items: List[Tuple[str, str, str, bool, str, str, Optional[str], float]]) -> None:
+    """Convenience function to put several results in cache."""
+    cache = get_formatter_cache()
+    cache.put_many(items)
 
 
 def clear_cache() -> None:
@@ -451,6 +1208,12 @@ def clear_cache() -> None:
     cache.clear()
 
 
+def cache_gc() -> int:
+    """Remove all expired cache entries, returning how many were removed."""
+    cache = get_formatter_cache()
+    return cache.gc()
+
+
 def cache_stats() -> Dict[str, Any]:
     """Get cache statistics."""
     cache = get_formatter_cache()
@@ -461,43 +1224,35 @@ def cache_detailed_stats() -> Dict[str, Any]:
     """
     Get detailed cache statistics with additional metrics.
 
+    Hit rate and time saved are measured (see cache_telemetry): the rate
+    is hits over lookups, and every hit counts the time its entry's
+    formatter took.
+
     Returns:
-        Dictionary with enhanced stats including hit rate, time saved, top languages
+        Dictionary with enhanced stats including hit rate, time saved,
+        top languages and the share of lookups lost to eviction
     """
-    from collections import Counter
     cache = get_formatter_cache()
     basic_stats = cache.stats()
 
-    # Calculate hit rate
-    total_hits = basic_stats['total_hits']
-    memory_entries = basic_stats['memory_entries']
-    hit_rate = total_hits / max(memory_entries, 1)  # Avoid division by zero
-
-    # Estimate time saved (avg 2.5 seconds per format operation)
-    time_saved_seconds = total_hits * 2.5
+    lookups = basic_stats['hits'] + basic_stats['misses']
+    hit_rate = basic_stats['hits'] / lookups if lookups else 0.0
 
-    # Collect language statistics from cache files
-    language_counts = Counter()
-    cache_dir = cache.cache_dir
+    # Evictions per lookup: high with a low hit rate means the limits are
+    # too small for the working set
+    eviction_rate = basic_stats['evictions'] / lookups if lookups else 0.0
 
-    for cache_file in cache_dir.glob("*.json"):
-        if cache_file == cache.index_file:
-            continue
-        try:
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-                language = data.get('language', 'unknown')
-                hit_count = data.get('hit_count', 0)
-                language_counts[language] += hit_count
-        except Exception:
-            pass
+    top_languages = [(lang, int(row['hits'])) for lang, row in basic_stats['languages'].items() if row['hits']]
+    top_languages.sort(key=lambda item: -item[1])
 
     # Add enhanced metrics to basic stats
     enhanced_stats = {
         **basic_stats,
+        'lookups': lookups,
         'hit_rate': hit_rate,
-        'time_saved_seconds': time_saved_seconds,
-        'top_languages': language_counts.most_common(10) if language_counts else []
+        'eviction_rate': eviction_rate,
+        'avg_entry_kb': basic_stats['size_mb'] * 1024 / basic_stats['entries'] if basic_stats['entries'] else 0.0,
+        'top_languages': top_languages[:10]
     }
 
-    return enhanced_stats
\ No newline at end of file
+    return enhanced_stats
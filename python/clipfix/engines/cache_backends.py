@@ -0,0 +1,868 @@
+"""
+Storage backends for the eClipLint formatter cache.
+FormatterCache keeps its in-memory layer and policy (TTL, limits) and
+delegates persistence to a backend:
+
+- SQLiteCacheBackend: one WAL-mode database with indexed columns, so
+  get, put, eviction and stats are indexed queries (default)
+- FileCacheBackend: the original layout, one JSON file per entry
+
+Both store the formatted output compressed (see cache_codec).
+
+migrate_file_cache() copies a file-layout cache into any backend.
+"""
+
+import base64
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .cache_codec import PayloadCodec
+from .cache_telemetry import TELEMETRY_FILE
+
+
+@dataclass
+class CacheEntry:
+    """Represents a cached formatting result."""
+    code_hash: str           # SHA-256 hash of input code
+    language: str            # Detected language
+    formatter: str           # Formatter used (e.g., "black", "prettier")
+    success: bool            # Whether formatting succeeded
+    output: str              # Formatted code
+    mode: str               # Mode/status string
+    timestamp: float         # Unix timestamp when cached
+    hit_count: int = 0       # Number of cache hits
+    duration: float = 0.0    # Seconds the formatter took to produce it
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CacheEntry':
+        """Create from dictionary."""
+        return cls(**data)
+
+
+class CacheBackend(ABC):
+    """Persistent storage for cache entries and the content index."""
+
+    codec: PayloadCodec
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry by key, None if missing or unreadable."""
+
+    def load_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        """Get the stored, readable entries among keys (key -> entry)."""
+        found = {}
+        for key in keys:
+            entry = self.load(key)
+            if entry is not None:
+                found[key] = entry
+        return found
+
+    @abstractmethod
+    def store(self, entry: CacheEntry) -> None:
+        """Insert or replace an entry (keyed by entry.code_hash)."""
+
+    def store_many(self, entries: List[CacheEntry], content: Optional[Dict[str, str]] = None) -> None:
+        """
+        Insert entries and content index mappings together.
+
+        Args:
+            entries: Entries to insert or replace
+            content: Content hash -> entry key mappings to record
+        """
+        for entry in entries:
+            self.store(entry)
+        for content_hash, key in (content or {}).items():
+            self.content_record(content_hash, key)
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+
+    @abstractmethod
+    def touch_many(self, updates: Dict[str, Tuple[int, float]]) -> None:
+        """
+        Persist access metadata without rewriting payloads.
+
+        Args:
+            updates: key -> (hit count, last access time)
+        """
+
+    @abstractmethod
+    def expire(self, cutoff: Optional[float], failure_cutoff: Optional[float], limit: Optional[int] = None) -> List[str]:
+        """
+        Remove entries written before their cutoff.
+
+        Content index mappings to removed entries are dropped as well.
+
+        Args:
+            cutoff: Unix timestamp; older successful entries are removed.
+                None = keep them
+            failure_cutoff: Unix timestamp; older cached failures are
+                removed. None = keep them
+            limit: Remove at most this many (oldest first). None = all
+
+        Returns:
+            Removed keys
+        """
+
+    @abstractmethod
+    def coldest(self, limit: int) -> List[Tuple[str, int, int]]:
+        """
+        Eviction candidates, least recently used first.
+
+        Returns:
+            Up to limit (key, size in bytes, hit count) tuples
+        """
+
+    @abstractmethod
+    def delete_many(self, keys: List[str]) -> None:
+        """Remove entries and the content index mappings to them."""
+
+    def labels(self, keys: List[str]) -> Dict[str, Tuple[str, str]]:
+        """Language and formatter of the stored entries among keys (key -> (language, formatter))."""
+        return {key: (entry.language, entry.formatter) for key, entry in self.load_many(keys).items()}
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored entries."""
+
+    @abstractmethod
+    def total_size(self) -> int:
+        """Stored size in bytes."""
+
+    @abstractmethod
+    def raw_size(self) -> int:
+        """Uncompressed size of the stored outputs in bytes."""
+
+    @abstractmethod
+    def language_hits(self) -> Counter:
+        """Hit count per language."""
+
+    @abstractmethod
+    def entries(self) -> Iterator[CacheEntry]:
+        """Iterate over all entries."""
+
+    @abstractmethod
+    def keys(self) -> List[str]:
+        """All entry keys (without loading payloads)."""
+
+    def sample_outputs(self, limit: int) -> List[str]:
+        """Up to limit stored outputs (dictionary training material)."""
+        return [e.output for e in itertools.islice(self.entries(), limit)]
+
+    @abstractmethod
+    def content_lookup(self, content_hash: str) -> Optional[str]:
+        """Key last stored for this code-only hash."""
+
+    @abstractmethod
+    def content_record(self, content_hash: str, key: str) -> None:
+        """Point a code-only hash at an entry key."""
+
+    @abstractmethod
+    def content_forget(self, content_hash: str) -> None:
+        """Drop a content index mapping."""
+
+    @abstractmethod
+    def content_items(self) -> Dict[str, str]:
+        """The whole content index."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries and the content index."""
+
+    def close(self) -> None:
+        """Release resources."""
+
+
+# Marks file entries whose output is a base64 PayloadCodec payload
+_B64_PAYLOAD = "b64-codec"
+
+
+class FileCacheBackend(CacheBackend):
+    """
+    One JSON file per entry in a flat directory, the output compressed
+    and base64-encoded (files written before compression still load).
+
+    Access metadata is kept out of the payloads: a hit sets the entry
+    file's mtime to the access time, and hit counts live in access.json.
+    Limits and stats glob and stat every file, so writes are O(n) in
+    cache size; kept for compatibility and as a migration source.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize file backend.
+
+        Args:
+            cache_dir: Directory holding <hash>.json entry files
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Legacy cache index file (no longer written, never an entry)
+        self.index_file = self.cache_dir / "index.json"
+
+        # Content index file (maps code-only hash -> language-keyed hash)
+        self.content_index_file = self.cache_dir / "content_index.json"
+        self.content_index: Dict[str, str] = self._load_content_index()
+
+        # Access file (maps hash -> persisted hit count)
+        self.access_file = self.cache_dir / "access.json"
+        self.hit_counts: Dict[str, int] = self._load_json_dict(self.access_file)
+
+        self.codec = PayloadCodec(self.cache_dir / "dictionaries")
+
+    def _is_meta_file(self, path: Path) -> bool:
+        """Index and telemetry files share the cache directory with entry files."""
+        return path in (self.index_file, self.content_index_file, self.access_file) or path.name == TELEMETRY_FILE
+
+    def _entry_files(self) -> List[Path]:
+        return [f for f in self.cache_dir.glob("*.json") if not self._is_meta_file(f)]
+
+    def _write_json(self, path: Path, data, indent: Optional[int] = None) -> None:
+        # Write to temp file first, then atomic rename
+        with tempfile.NamedTemporaryFile(
+            mode='w',
+            dir=self.cache_dir,
+            delete=False
+        ) as tmp:
+            json.dump(data, tmp, indent=indent)
+            tmp_path = tmp.name
+
+        os.rename(tmp_path, path)
+
+    def load(self, key: str) -> Optional[CacheEntry]:
+        cache_file = self.cache_dir / f"{key}.json"
+        if not cache_file.exists():
+            return None
+        try:
+            return self._read_entry(cache_file)
+        except Exception:
+            # Corrupted cache file, remove it
+            self.delete(key)
+            return None
+
+    def _read_entry(self, cache_file: Path) -> CacheEntry:
+        with open(cache_file, 'r') as f:
+            data = json.load(f)
+        if data.pop('encoding', None) == _B64_PAYLOAD:
+            data['output'] = self.codec.decode(base64.b64decode(data['output']))
+        entry = CacheEntry.from_dict(data)
+        entry.hit_count = max(entry.hit_count, self.hit_counts.get(entry.code_hash, 0))
+        return entry
+
+    def store(self, entry: CacheEntry) -> None:
+        data = entry.to_dict()
+        data['output'] = base64.b64encode(self.codec.encode(entry.output)).decode('ascii')
+        data['encoding'] = _B64_PAYLOAD
+        try:
+            self._write_json(self.cache_dir / f"{entry.code_hash}.json", data)
+        except Exception as e:
+            # Cache write failed, not critical
+            print(f"Cache write failed: {e}", file=sys.stderr)
+
+    def delete(self, key: str) -> None:
+        try:
+            (self.cache_dir / f"{key}.json").unlink()
+        except Exception:
+            pass
+
+    def expire(self, cutoff: Optional[float], failure_cutoff: Optional[float], limit: Optional[int] = None) -> List[str]:
+        expired = []
+
+        # Check cache files until limit expired ones are found
+        for cache_file in self._entry_files():
+            if limit is not None and len(expired) >= limit:
+                break
+            try:
+                with open(cache_file, 'r') as f:
+                    data = json.load(f)
+                entry_cutoff = cutoff if data.get('success', True) else failure_cutoff
+                if entry_cutoff is not None and data.get('timestamp', 0) < entry_cutoff:
+                    expired.append(cache_file)
+            except Exception:
+                # Corrupted file, mark for removal
+                expired.append(cache_file)
+
+        for cache_file in expired:
+            self.delete(cache_file.stem)
+        removed = [f.stem for f in expired]
+        self._forget_keys(removed)
+        return removed
+
+    def touch_many(self, updates: Dict[str, Tuple[int, float]]) -> None:
+        for key, (hit_count, last_access) in updates.items():
+            try:
+                os.utime(self.cache_dir / f"{key}.json", (last_access, last_access))
+            except OSError:
+                # Entry removed meanwhile
+                continue
+            self.hit_counts[key] = hit_count
+        self._save_hit_counts()
+
+    def coldest(self, limit: int) -> List[Tuple[str, int, int]]:
+        stats = []
+        for cache_file in self._entry_files():
+            try:
+                st = cache_file.stat()
+            except OSError:
+                continue
+            stats.append((st.st_mtime, cache_file.stem, st.st_size))
+        stats.sort()
+        return [(key, size, self.hit_counts.get(key, 0)) for _, key, size in stats[:limit]]
+
+    def delete_many(self, keys: List[str]) -> None:
+        for key in keys:
+            self.delete(key)
+        self._forget_keys(keys)
+
+    def count(self) -> int:
+        return len(self._entry_files())
+
+    def total_size(self) -> int:
+        return sum(f.stat().st_size for f in self._entry_files())
+
+    def language_hits(self) -> Counter:
+        language_counts = Counter()
+        for cache_file in self._entry_files():
+            try:
+                with open(cache_file, 'r') as f:
+                    data = json.load(f)
+                    hits = max(data.get('hit_count', 0), self.hit_counts.get(cache_file.stem, 0))
+                    language_counts[data.get('language', 'unknown')] += hits
+            except Exception:
+                pass
+        return language_counts
+
+    def raw_size(self) -> int:
+        return sum(len(e.output.encode('utf-8')) for e in self.entries())
+
+    def keys(self) -> List[str]:
+        return [f.stem for f in self._entry_files()]
+
+    def entries(self) -> Iterator[CacheEntry]:
+        for cache_file in self._entry_files():
+            try:
+                yield self._read_entry(cache_file)
+            except Exception:
+                continue
+
+    def _load_json_dict(self, path: Path) -> dict:
+        """Load a JSON object from disk (empty if missing or corrupted)."""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _load_content_index(self) -> Dict[str, str]:
+        """Load the content index from disk (empty if missing or corrupted)."""
+        return self._load_json_dict(self.content_index_file)
+
+    def _save_hit_counts(self) -> None:
+        try:
+            self._write_json(self.access_file, self.hit_counts)
+        except Exception:
+            # Access save failed, not critical
+            pass
+
+    def _save_content_index(self) -> None:
+        try:
+            self._write_json(self.content_index_file, self.content_index)
+        except Exception:
+            # Index save failed, not critical
+            pass
+
+    def content_lookup(self, content_hash: str) -> Optional[str]:
+        return self.content_index.get(content_hash)
+
+    def content_record(self, content_hash: str, key: str) -> None:
+        self.content_index[content_hash] = key
+        self._save_content_index()
+
+    def store_many(self, entries: List[CacheEntry], content: Optional[Dict[str, str]] = None) -> None:
+        for entry in entries:
+            self.store(entry)
+        if content:
+            # One index write for the whole batch
+            self.content_index.update(content)
+            self._save_content_index()
+
+    def content_forget(self, content_hash: str) -> None:
+        self.content_index.pop(content_hash, None)
+
+    def content_items(self) -> Dict[str, str]:
+        return dict(self.content_index)
+
+    def _forget_keys(self, keys: List[str]) -> None:
+        """Drop content index mappings that point at removed entries."""
+        if not keys:
+            return
+        gone = set(keys)
+        self.content_index = {
+            content_hash: key
+            for content_hash, key in self.content_index.items()
+            if key not in gone
+        }
+        self._save_content_index()
+        if any(key in self.hit_counts for key in gone):
+            for key in gone:
+                self.hit_counts.pop(key, None)
+            self._save_hit_counts()
+
+    def clear(self) -> None:
+        # Remove all cache files; telemetry outlives a clear, as with SQLite
+        for cache_file in self.cache_dir.glob("*.json"):
+            if cache_file.name == TELEMETRY_FILE:
+                continue
+            try:
+                cache_file.unlink()
+            except Exception:
+                pass
+        self.content_index.clear()
+        self.hit_counts.clear()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    language    TEXT NOT NULL,
+    formatter   TEXT NOT NULL,
+    success     INTEGER NOT NULL,
+    output      BLOB NOT NULL,  -- PayloadCodec payload (TEXT in version 1)
+    mode        TEXT NOT NULL,
+    timestamp   REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hit_count   INTEGER NOT NULL DEFAULT 0,
+    size        INTEGER NOT NULL,  -- stored payload bytes
+    raw_size    INTEGER NOT NULL DEFAULT 0,  -- uncompressed output bytes
+    duration    REAL NOT NULL DEFAULT 0  -- seconds the formatter took
+);
+CREATE INDEX IF NOT EXISTS entries_language ON entries (language);
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+-- Eviction no longer orders by hit count; the index only slowed hits
+DROP INDEX IF EXISTS entries_hits;
+
+CREATE TABLE IF NOT EXISTS content_index (
+    content_hash TEXT PRIMARY KEY,
+    key          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS content_index_key ON content_index (key);
+
+-- Running totals, kept by triggers so stats never scan the table
+CREATE TABLE IF NOT EXISTS totals (
+    id        INTEGER PRIMARY KEY CHECK (id = 0),
+    entries   INTEGER NOT NULL,
+    bytes     INTEGER NOT NULL,
+    raw_bytes INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO totals (id, entries, bytes, raw_bytes) VALUES (0, 0, 0, 0);
+
+CREATE TRIGGER IF NOT EXISTS entries_ins AFTER INSERT ON entries BEGIN
+    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size,
+                      raw_bytes = raw_bytes + NEW.raw_size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_del AFTER DELETE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size,
+                      raw_bytes = raw_bytes - OLD.raw_size WHERE id = 0;
+    DELETE FROM content_index WHERE key = OLD.key;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_upd AFTER UPDATE OF size, raw_size ON entries BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size + NEW.size,
+                      raw_bytes = raw_bytes - OLD.raw_size + NEW.raw_size WHERE id = 0;
+END;
+
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+SCHEMA_VERSION = "3"
+
+# Version 1 -> 2: raw_size / raw_bytes columns (payload compression);
+# the triggers are dropped so _SCHEMA recreates them with raw_bytes
+_MIGRATE_V1 = """
+ALTER TABLE entries ADD COLUMN raw_size INTEGER NOT NULL DEFAULT 0;
+UPDATE entries SET raw_size = size;
+ALTER TABLE totals ADD COLUMN raw_bytes INTEGER NOT NULL DEFAULT 0;
+UPDATE totals SET raw_bytes = bytes;
+DROP TRIGGER IF EXISTS entries_ins;
+DROP TRIGGER IF EXISTS entries_del;
+DROP TRIGGER IF EXISTS entries_upd;
+"""
+
+# Version 2 -> 3: duration column (measured time saved); older entries
+# count as having taken no time
+_MIGRATE_V2 = """
+ALTER TABLE entries ADD COLUMN duration REAL NOT NULL DEFAULT 0;
+"""
+
+# An upsert, not INSERT OR REPLACE: REPLACE deletes the old row without
+# firing delete triggers, which would double-count the totals
+_UPSERT = """
+INSERT INTO entries (key, language, formatter, success, output, mode, timestamp, last_access, hit_count, size, raw_size, duration)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    language = excluded.language,
+    formatter = excluded.formatter,
+    success = excluded.success,
+    output = excluded.output,
+    mode = excluded.mode,
+    timestamp = excluded.timestamp,
+    last_access = excluded.last_access,
+    hit_count = excluded.hit_count,
+    size = excluded.size,
+    raw_size = excluded.raw_size,
+    duration = excluded.duration
+"""
+
+# Keys per IN (...) query (SQLite allows 999 parameters in older builds)
+_MAX_PARAMS = 500
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Single-file SQLite database in WAL mode.
+
+    Readers never block the writer, and every operation is an indexed
+    query; entry count and total sizes come from trigger-maintained totals.
+    Outputs are stored as compressed BLOBs; rows written before
+    compression hold TEXT and are returned as is.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize SQLite backend.
+
+        Args:
+            db_path: Database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=5.0,
+            isolation_level=None,  # autocommit; explicit BEGIN where needed
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES ('schema_version', ?)",
+            (SCHEMA_VERSION,)
+        )
+        self.codec = PayloadCodec(self.db_path.parent / "dictionaries")
+
+    def _migrate(self) -> None:
+        """Upgrade a database written by an older schema version."""
+        columns = [r[1] for r in self._conn.execute("PRAGMA table_info(entries)")]
+        if columns and "raw_size" not in columns:
+            self._conn.executescript(f"BEGIN;{_MIGRATE_V1}COMMIT;")
+        if columns and "duration" not in columns:
+            self._conn.executescript(f"BEGIN;{_MIGRATE_V2}COMMIT;")
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _row_to_entry(self, row) -> CacheEntry:
+        """
+        Build an entry from a row, decompressing its output.
+
+        Raises:
+            ValueError: The payload cannot be decoded
+        """
+        key, language, formatter, success, output, mode, timestamp, hit_count, duration = row
+        return CacheEntry(
+            code_hash=key,
+            language=language,
+            formatter=formatter,
+            success=bool(success),
+            output=self.codec.decode(output) if isinstance(output, bytes) else output,
+            mode=mode,
+            timestamp=timestamp,
+            hit_count=hit_count,
+            duration=duration
+        )
+
+    _COLUMNS = "key, language, formatter, success, output, mode, timestamp, hit_count, duration"
+
+    def _row(self, entry: CacheEntry) -> tuple:
+        payload = self.codec.encode(entry.output)
+        return (
+            entry.code_hash, entry.language, entry.formatter, int(entry.success),
+            payload, entry.mode, entry.timestamp, entry.timestamp,
+            entry.hit_count, len(payload), len(entry.output.encode('utf-8')), entry.duration,
+        )
+
+    def load(self, key: str) -> Optional[CacheEntry]:
+        rows = self._query(f"SELECT {self._COLUMNS} FROM entries WHERE key = ?", (key,))
+        if not rows:
+            return None
+        try:
+            return self._row_to_entry(rows[0])
+        except ValueError:
+            # Undecodable payload (e.g. written with zstd, now unavailable)
+            self.delete(key)
+            return None
+
+    def store(self, entry: CacheEntry) -> None:
+        try:
+            self._execute(_UPSERT, self._row(entry))
+        except sqlite3.Error as e:
+            # Cache write failed, not critical
+            print(f"Cache write failed: {e}", file=sys.stderr)
+
+    def load_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        rows = []
+        for i in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[i:i + _MAX_PARAMS]
+            rows.extend(self._query(
+                f"SELECT {self._COLUMNS} FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        found = {}
+        for row in rows:
+            try:
+                found[row[0]] = self._row_to_entry(row)
+            except ValueError:
+                # Undecodable payload (e.g. written with zstd, now unavailable)
+                self.delete(row[0])
+        return found
+
+    def store_many(self, entries: List[CacheEntry], content: Optional[Dict[str, str]] = None) -> None:
+        """
+        Insert entries and content index mappings in one transaction.
+
+        Raises:
+            sqlite3.Error: The transaction failed (nothing was written)
+        """
+        rows = [self._row(e) for e in entries]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_UPSERT, rows)
+                if content:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO content_index (content_hash, key) VALUES (?, ?)",
+                        list(content.items())
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, key: str) -> None:
+        self._execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def touch_many(self, updates: Dict[str, Tuple[int, float]]) -> None:
+        rows = [(hit_count, last_access, key) for key, (hit_count, last_access) in updates.items()]
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "UPDATE entries SET hit_count = ?, last_access = ? WHERE key = ?", rows
+                )
+                self._conn.execute("COMMIT")
+        except sqlite3.Error:
+            # Access tracking is not critical
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+
+    def expire(self, cutoff: Optional[float], failure_cutoff: Optional[float], limit: Optional[int] = None) -> List[str]:
+        # Timestamps are positive: a cutoff of 0 removes nothing
+        with self._lock:
+            keys = [r[0] for r in self._conn.execute(
+                "SELECT key FROM entries WHERE timestamp < CASE WHEN success THEN ? ELSE ? END "
+                "ORDER BY timestamp LIMIT ?",
+                (cutoff or 0.0, failure_cutoff or 0.0, -1 if limit is None else limit)
+            )]
+            if keys:
+                self._conn.execute("BEGIN")
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in keys])
+                self._conn.execute("COMMIT")
+        return keys
+
+    def coldest(self, limit: int) -> List[Tuple[str, int, int]]:
+        return self._query(
+            "SELECT key, size, hit_count FROM entries ORDER BY last_access LIMIT ?", (limit,)
+        )
+
+    def delete_many(self, keys: List[str]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in keys])
+            self._conn.execute("COMMIT")
+
+    def labels(self, keys: List[str]) -> Dict[str, Tuple[str, str]]:
+        found = {}
+        for i in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[i:i + _MAX_PARAMS]
+            for key, language, formatter in self._query(
+                f"SELECT key, language, formatter FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                found[key] = (language, formatter)
+        return found
+
+    def count(self) -> int:
+        return self._query("SELECT entries FROM totals WHERE id = 0")[0][0]
+
+    def total_size(self) -> int:
+        return self._query("SELECT bytes FROM totals WHERE id = 0")[0][0]
+
+    def raw_size(self) -> int:
+        return self._query("SELECT raw_bytes FROM totals WHERE id = 0")[0][0]
+
+    def language_hits(self) -> Counter:
+        return Counter(dict(self._query(
+            "SELECT language, SUM(hit_count) FROM entries GROUP BY language"
+        )))
+
+    def entries(self) -> Iterator[CacheEntry]:
+        for row in self._query(f"SELECT {self._COLUMNS} FROM entries"):
+            try:
+                yield self._row_to_entry(row)
+            except ValueError:
+                continue
+
+    def sample_outputs(self, limit: int) -> List[str]:
+        rows = self._query(
+            f"SELECT {self._COLUMNS} FROM entries ORDER BY last_access DESC LIMIT ?", (limit,)
+        )
+        outputs = []
+        for row in rows:
+            try:
+                outputs.append(self._row_to_entry(row).output)
+            except ValueError:
+                continue
+        return outputs
+
+    def keys(self) -> List[str]:
+        return [r[0] for r in self._query("SELECT key FROM entries")]
+
+    def content_lookup(self, content_hash: str) -> Optional[str]:
+        rows = self._query("SELECT key FROM content_index WHERE content_hash = ?", (content_hash,))
+        return rows[0][0] if rows else None
+
+    def content_record(self, content_hash: str, key: str) -> None:
+        try:
+            self._execute(
+                "INSERT OR REPLACE INTO content_index (content_hash, key) VALUES (?, ?)",
+                (content_hash, key)
+            )
+        except sqlite3.Error:
+            # Index write failed, not critical
+            pass
+
+    def content_forget(self, content_hash: str) -> None:
+        self._execute("DELETE FROM content_index WHERE content_hash = ?", (content_hash,))
+
+    def content_items(self) -> Dict[str, str]:
+        return dict(self._query("SELECT content_hash, key FROM content_index"))
+
+    def get_meta(self, name: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM meta WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, name: str, value: str) -> None:
+        self._execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM content_index")
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_file_cache(src_dir: Path, dest: CacheBackend, remove: bool = False) -> int:
+    """
+    Copy a file-layout cache into another backend.
+
+    Args:
+        src_dir: Directory of <hash>.json entry files
+        dest: Backend to copy into
+        remove: Delete the source files after a successful copy
+
+    Returns:
+        Number of entries migrated
+    """
+    src = FileCacheBackend(src_dir)
+    migrated = list(src.entries())
+    dest.store_many(migrated, src.content_items())
+
+    if remove:
+        src.clear()
+        try:
+            src.index_file.unlink()
+        except OSError:
+            pass
+    return len(migrated)
+
+
+BACKENDS = ("sqlite", "file")
+DEFAULT_BACKEND = "sqlite"
+
+
+def backend_name() -> str:
+    """Backend chosen by ECLIPLINT_CACHE_BACKEND (sqlite or file)."""
+    name = os.environ.get("ECLIPLINT_CACHE_BACKEND", DEFAULT_BACKEND).lower()
+    return name if name in BACKENDS else DEFAULT_BACKEND
+
+
+def open_backend(cache_dir: Path, name: Optional[str] = None) -> CacheBackend:
+    """
+    Open the storage backend for a cache directory.
+
+    The first time the SQLite backend is opened next to an existing
+    file-layout cache, the entries are migrated into it once and the
+    JSON files removed.
+
+    Args:
+        cache_dir: Cache directory
+        name: "sqlite" or "file". None = ECLIPLINT_CACHE_BACKEND or sqlite
+    """
+    name = name or backend_name()
+    cache_dir = Path(cache_dir)
+    if name == "file":
+        return FileCacheBackend(cache_dir)
+
+    backend = SQLiteCacheBackend(cache_dir / "cache.db")
+    if backend.get_meta("migrated_from_files") is None:
+        if any(f.name != TELEMETRY_FILE for f in cache_dir.glob("*.json")):
+            try:
+                count = migrate_file_cache(cache_dir, backend, remove=True)
+                print(f"Migrated {count} cache entries to {backend.db_path.name}", file=sys.stderr)
+            except Exception as e:
+                # Not critical - the old entries are simply not carried over
+                print(f"Cache migration failed: {e}", file=sys.stderr)
+        backend.set_meta("migrated_from_files", str(time.time()))
+    return backend
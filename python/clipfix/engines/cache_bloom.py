@@ -0,0 +1,199 @@
+"""
+Memory-mapped Bloom filter for eClipLint cache lookups.
+Every stored key sets a few bits in a small file that is mapped at
+startup; a lookup whose bits are not all set is a definite miss and is
+answered without touching SQLite or the cache directory.
+
+Bits are only ever set in place (a put is a handful of byte writes to
+the shared mapping, visible to other processes at once); deleted keys
+leave their bits behind, so the filter is rebuilt from the backend, into
+a temp file renamed over the old one, once it has absorbed more inserts
+than it was sized for. A process whose mapping was renamed over by
+another's rebuild re-maps the new file before trusting a miss or
+setting bits.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Iterable, List
+
+_MAGIC = b"ECBF"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHH QQQ")  # magic, version, hashes, bits, capacity, inserted
+
+# Target false positive rate at capacity
+FALSE_POSITIVE_RATE = 0.01
+
+
+def _geometry(capacity: int, fp_rate: float) -> tuple:
+    """(bits, hash count) for capacity keys at fp_rate."""
+    bits = max(1024, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+    bits = (bits + 7) // 8 * 8
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def _file_id(st: os.stat_result) -> tuple:
+    return st.st_dev, st.st_ino
+
+
+class BloomFilter:
+    """Bloom filter over string keys, stored in a memory-mapped file."""
+
+    def __init__(self, path: Path, capacity: int, fp_rate: float = FALSE_POSITIVE_RATE,
+                 create: bool = True):
+        """
+        Open (or create) a filter file.
+
+        A missing or mismatched file is replaced by an empty filter;
+        check `created` and fill it with rebuild().
+
+        Args:
+            path: Filter file
+            capacity: Inserts before the false positive rate exceeds fp_rate
+            fp_rate: Target false positive rate at capacity
+            create: Replace a missing or mismatched file. False = raise
+                FileNotFoundError instead
+
+        Raises:
+            FileNotFoundError: No matching file and create is False
+            OSError: The file cannot be created or mapped
+        """
+        self.path = Path(path)
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.bits, self.hashes = _geometry(capacity, fp_rate)
+        self.created = False
+        self._file = None
+        self._map = None
+        self._id = None
+        if not self._open():
+            if not create:
+                raise FileNotFoundError(f"{self.path}: no Bloom filter of this size")
+            self._write([])
+            self.created = True
+            if not self._open():
+                raise OSError(f"{self.path}: cannot map Bloom filter")
+
+    def _open(self) -> bool:
+        """Map the file if it matches the configured geometry."""
+        try:
+            f = open(self.path, "r+b")
+        except OSError:
+            return False
+        try:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                f.close()
+                return False
+            magic, version, hashes, bits, capacity, _ = _HEADER.unpack(header)
+            if (magic, version, hashes, bits, capacity) != (_MAGIC, _FORMAT_VERSION, self.hashes, self.bits, self.capacity):
+                f.close()
+                return False
+            mapping = mmap.mmap(f.fileno(), _HEADER.size + bits // 8)
+            file_id = _file_id(os.fstat(f.fileno()))
+        except (OSError, ValueError):
+            f.close()
+            return False
+        self.close()  # drop a previous mapping, if any
+        self._file, self._map, self._id = f, mapping, file_id
+        return True
+
+    def _replaced(self) -> bool:
+        """Whether another process renamed a new filter over the mapped file."""
+        try:
+            return _file_id(os.stat(self.path)) != self._id
+        except OSError:
+            # Removed, not replaced: the mapping is still the latest filter
+            return False
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hashes)]
+
+    def _test(self, positions: List[int]) -> bool:
+        m = self._map
+        base = _HEADER.size
+        for pos in positions:
+            if not m[base + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        positions = self._positions(key)
+        if self._test(positions):
+            return True
+        # A miss is only definite in the current file: another process may
+        # have rebuilt it since it was mapped, adding keys to the new one
+        if not self._replaced():
+            return False
+        if not self._open():
+            # New file unreadable (or another geometry): cannot rule it out
+            return True
+        return self._test(positions)
+
+    def add(self, key: str) -> None:
+        """
+        Set key's bits in the current file.
+
+        Raises:
+            OSError: The file was replaced by one that cannot be mapped
+        """
+        if self._replaced() and not self._open():
+            raise OSError(f"{self.path}: cannot map Bloom filter")
+        m = self._map
+        base = _HEADER.size
+        for pos in self._positions(key):
+            i = base + (pos >> 3)
+            m[i] = m[i] | (1 << (pos & 7))
+        inserted = struct.unpack_from("<Q", m, _HEADER.size - 8)[0]
+        struct.pack_into("<Q", m, _HEADER.size - 8, inserted + 1)
+
+    @property
+    def inserted(self) -> int:
+        """Inserts since the filter was last rebuilt."""
+        return struct.unpack_from("<Q", self._map, _HEADER.size - 8)[0]
+
+    @property
+    def saturated(self) -> bool:
+        return self.inserted > self.capacity
+
+    def _write(self, keys: Iterable[str]) -> None:
+        """Write a filter holding keys to a temp file and rename it into place."""
+        table = bytearray(self.bits // 8)
+        inserted = 0
+        for key in keys:
+            for pos in self._positions(key):
+                table[pos >> 3] |= 1 << (pos & 7)
+            inserted += 1
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.path.parent, delete=False) as tmp:
+            tmp.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, self.hashes, self.bits, self.capacity, inserted))
+            tmp.write(table)
+        os.replace(tmp.name, self.path)
+
+    def rebuild(self, keys: Iterable[str]) -> None:
+        """
+        Replace the filter with one holding exactly keys.
+
+        Raises:
+            OSError: The new file cannot be written or mapped
+        """
+        self._write(keys)
+        if not self._open():
+            raise OSError(f"{self.path}: cannot map Bloom filter")
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._file, self._map, self._id = None, None, None
@@ -0,0 +1,124 @@
+"""
+Shareable cache bundles for eClipLint.
+Formatter output depends only on the formatter (name, version, flags,
+config), so a cache built on one machine is valid on any other with the
+same toolchain. A bundle carries cached results with a portable
+identity in place of the machine-specific one (binary path and mtime);
+importing keeps the entries whose formatter matches the local one and
+relabels them with the local identity, so a fleet can start warm.
+
+Format: a 9-byte header (magic, format version, entry count) followed
+by a zlib-compressed JSON document. zlib rather than zstd so a bundle
+opens wherever Python does.
+"""
+
+import json
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+BUNDLE_MAGIC = b"ECLB"
+BUNDLE_VERSION = 1
+
+_HEADER = struct.Struct("<4sBI")  # magic, format version, entry count
+
+ZLIB_LEVEL = 9
+
+# Bundle row: (key, language, identity, mode, output, duration, timestamp)
+BundleRow = Tuple[str, str, str, str, str, float, float]
+
+
+def write_bundle(path: Path, rows: List[BundleRow], content: List[Tuple[str, int]]) -> None:
+    """
+    Write a bundle atomically.
+
+    Args:
+        path: Bundle file
+        rows: One row per entry, identities already portable
+        content: (content hash, index into rows) index mappings
+    """
+    document = json.dumps({"entries": rows, "content": content}, separators=(",", ":"))
+    payload = _HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(rows)) + zlib.compress(document.encode("utf-8"), ZLIB_LEVEL)
+
+    path = Path(path)
+    # Write to temp file first, then atomic rename
+    with tempfile.NamedTemporaryFile(mode="wb", dir=path.parent, delete=False, suffix=".tmp") as tmp:
+        tmp.write(payload)
+    # Meant to be shipped and read by other users (temp files are 0600)
+    os.chmod(tmp.name, 0o644)
+    os.replace(tmp.name, path)
+
+
+def read_bundle(path: Path) -> Tuple[List[BundleRow], List[Tuple[str, int]]]:
+    """
+    Read a bundle.
+
+    Returns:
+        (rows, content mappings), as passed to write_bundle()
+
+    Raises:
+        ValueError: Not a bundle, a newer format version, or corrupt
+    """
+    data = Path(path).read_bytes()
+    if len(data) < _HEADER.size:
+        raise ValueError("not an ecliplint cache bundle")
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != BUNDLE_MAGIC:
+        raise ValueError("not an ecliplint cache bundle")
+    if version != BUNDLE_VERSION:
+        raise ValueError(f"unsupported cache bundle version {version} (expected {BUNDLE_VERSION})")
+    try:
+        document = json.loads(zlib.decompress(data[_HEADER.size:]).decode("utf-8"))
+        rows = [tuple(row) for row in document["entries"]]
+        content = [(content_hash, index) for content_hash, index in document["content"]]
+    except (zlib.error, UnicodeDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"corrupt cache bundle: {e}")
+    if len(rows) != count:
+        raise ValueError(f"corrupt cache bundle: {len(rows)} entries, header says {count}")
+    return rows, content
+
+
+def identity_translator(table: Dict[str, str]) -> Callable[[str], Optional[str]]:
+    """
+    Translate identities through table.
+
+    Returns:
+        Function mapping an identity to its translation, None if it has none
+    """
+    return table.get
+
+
+def portable_identities() -> Dict[str, str]:
+    """Local formatter identity -> portable identity, for this machine's formatters."""
+    from .detect_and_format import identity_translations
+    return identity_translations()
+
+
+def export_cache(path: Path) -> int:
+    """
+    Export the global cache's results for this machine's formatters.
+
+    Returns:
+        Number of entries written
+    """
+    from .cache import get_formatter_cache
+    return get_formatter_cache().export_bundle(path, identity_translator(portable_identities()))
+
+
+def import_cache(path: Path) -> Tuple[int, int]:
+    """
+    Merge a bundle into the global cache.
+
+    Returns:
+        (entries imported, entries skipped because their formatter
+        differs from the local one)
+
+    Raises:
+        ValueError: The file is not a readable bundle
+    """
+    from .cache import get_formatter_cache
+    local = {portable: identity for identity, portable in portable_identities().items()}
+    return get_formatter_cache().import_bundle(path, identity_translator(local))
@@ -0,0 +1,205 @@
+"""
+Payload compression for the eClipLint formatter cache.
+Formatted output is stored compressed: zstd when the zstandard package
+is installed, zlib otherwise. Once the cache holds enough entries a
+dictionary is trained on the cached code, which matters for the short
+snippets that make up most clipboard traffic (a few hundred bytes do
+not compress well on their own).
+
+Every payload starts with a 3-byte header (codec tag, dictionary id), so
+entries written with another codec or an older dictionary still decode.
+"""
+
+import os
+import struct
+import tempfile
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_HEADER = struct.Struct("<BH")  # codec tag, dictionary id (0 = none)
+
+RAW, ZLIB, ZSTD = 0, 1, 2
+_CODEC_NAMES = {RAW: "raw", ZLIB: "zlib", ZSTD: "zstd"}
+
+# Payloads shorter than this are stored raw
+MIN_COMPRESS_BYTES = 64
+
+# Dictionary size (zlib only uses the last 32 KiB of its dictionary)
+DICT_BYTES = 16 * 1024
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# zstandard module, False if unavailable (imported on first use)
+_ZSTD = None
+
+
+def _zstd():
+    """Import zstandard once; False if unavailable."""
+    global _ZSTD
+    if _ZSTD is None:
+        try:
+            import zstandard
+            _ZSTD = zstandard
+        except ImportError:
+            _ZSTD = False
+    return _ZSTD
+
+
+def _train_zlib(samples: List[bytes], size: int) -> bytes:
+    """
+    Build a zlib preset dictionary from the most common lines.
+
+    zlib has no trainer; a preset dictionary is just text that matches
+    can refer back to. The most frequent lines go last, where matches
+    are cheapest.
+    """
+    counts = Counter(line for sample in samples for line in sample.splitlines(keepends=True)
+                     if len(line.strip()) > 3)
+    picked: List[bytes] = []
+    total = 0
+    for line, n in counts.most_common():
+        if n < 2 or total + len(line) > size:
+            break
+        picked.append(line)
+        total += len(line)
+    return b"".join(reversed(picked))
+
+
+class PayloadCodec:
+    """Compresses cache payloads, with optional trained dictionaries."""
+
+    def __init__(self, dict_dir: Optional[Path] = None):
+        """
+        Initialize codec.
+
+        Args:
+            dict_dir: Directory holding trained dictionaries (<id>.<codec>
+                files). None = no dictionaries
+        """
+        self.dict_dir = Path(dict_dir) if dict_dir is not None else None
+        self.codec = ZSTD if _zstd() else ZLIB
+        # id -> (codec, dictionary bytes)
+        self.dictionaries: Dict[int, Tuple[int, bytes]] = {}
+        self.dict_id = 0  # dictionary used for new payloads
+        self._zstd_dicts: Dict[int, object] = {}
+        self._load_dictionaries()
+
+    @property
+    def name(self) -> str:
+        return _CODEC_NAMES[self.codec]
+
+    def _load_dictionaries(self) -> None:
+        if self.dict_dir is None or not self.dict_dir.is_dir():
+            return
+        names = {name: tag for tag, name in _CODEC_NAMES.items()}
+        for path in self.dict_dir.glob("*.*"):
+            try:
+                dict_id, codec = int(path.stem), names[path.suffix[1:]]
+                self.dictionaries[dict_id] = (codec, path.read_bytes())
+            except (ValueError, KeyError, OSError):
+                continue
+        # Newest dictionary this installation can write with
+        usable = [i for i, (codec, _) in self.dictionaries.items() if codec == self.codec]
+        self.dict_id = max(usable, default=0)
+
+    def _zstd_dict(self, dict_id: int):
+        d = self._zstd_dicts.get(dict_id)
+        if d is None:
+            d = _zstd().ZstdCompressionDict(self.dictionaries[dict_id][1])
+            self._zstd_dicts[dict_id] = d
+        return d
+
+    def encode(self, text: str) -> bytes:
+        """Compress text into a self-describing payload."""
+        data = text.encode("utf-8")
+        if len(data) < MIN_COMPRESS_BYTES:
+            return _HEADER.pack(RAW, 0) + data
+
+        dict_id = self.dict_id
+        if self.codec == ZSTD:
+            zstd = _zstd()
+            if dict_id:
+                packed = zstd.ZstdCompressor(level=ZSTD_LEVEL, dict_data=self._zstd_dict(dict_id)).compress(data)
+            else:
+                packed = zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        else:
+            if dict_id:
+                c = zlib.compressobj(ZLIB_LEVEL, zdict=self.dictionaries[dict_id][1])
+            else:
+                c = zlib.compressobj(ZLIB_LEVEL)
+            packed = c.compress(data) + c.flush()
+
+        if len(packed) >= len(data):
+            return _HEADER.pack(RAW, 0) + data
+        return _HEADER.pack(self.codec, dict_id) + packed
+
+    def decode(self, payload: bytes) -> str:
+        """
+        Decompress a payload written by encode().
+
+        Raises:
+            ValueError: Corrupt payload, or its codec/dictionary is unavailable
+        """
+        try:
+            codec, dict_id = _HEADER.unpack_from(payload)
+            data = payload[_HEADER.size:]
+            if codec == RAW:
+                return data.decode("utf-8")
+            if dict_id and dict_id not in self.dictionaries:
+                raise ValueError(f"unknown dictionary {dict_id}")
+            if codec == ZLIB:
+                d = zlib.decompressobj(zdict=self.dictionaries[dict_id][1]) if dict_id else zlib.decompressobj()
+                return (d.decompress(data) + d.flush()).decode("utf-8")
+            if codec == ZSTD and _zstd():
+                zstd = _zstd()
+                if dict_id:
+                    d = zstd.ZstdDecompressor(dict_data=self._zstd_dict(dict_id))
+                else:
+                    d = zstd.ZstdDecompressor()
+                return d.decompress(data).decode("utf-8")
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"corrupt cache payload: {e}") from None
+        raise ValueError(f"cache payload codec {codec} unavailable")
+
+    def train(self, samples: Iterable[str]) -> Optional[int]:
+        """
+        Train a dictionary on samples and use it for new payloads.
+
+        Returns:
+            New dictionary id, None if there was too little to train on or
+            it could not be saved
+        """
+        if self.dict_dir is None:
+            return None
+        encoded = [s.encode("utf-8") for s in samples]
+        if len(encoded) < 8:
+            return None
+        try:
+            if self.codec == ZSTD:
+                data = _zstd().train_dictionary(DICT_BYTES, encoded).as_bytes()
+            else:
+                data = _train_zlib(encoded, DICT_BYTES)
+        except Exception:
+            # zstd refuses samples that are too few or too uniform
+            return None
+        if not data:
+            return None
+
+        dict_id = max(self.dictionaries, default=0) + 1
+        try:
+            self.dict_dir.mkdir(parents=True, exist_ok=True)
+            # Write to temp file first, then atomic rename
+            with tempfile.NamedTemporaryFile(dir=self.dict_dir, delete=False, suffix=".tmp") as tmp:
+                tmp.write(data)
+            os.replace(tmp.name, self.dict_dir / f"{dict_id}.{self.name}")
+        except OSError:
+            # Dictionary save failed, not critical
+            return None
+        self.dictionaries[dict_id] = (self.codec, data)
+        self.dict_id = dict_id
+        return dict_id
@@ -0,0 +1,201 @@
+"""
+Eviction and admission policies for the eClipLint formatter cache.
+The backend lists eviction candidates in least-recently-used order along
+with their persisted hit counts; a policy decides which of them go and
+whether a new entry may displace one at all.
+
+- "lru": least recently used first, everything admitted
+- "lfu": fewest hits first, then oldest (the original size-limit pass)
+- "tinylfu": frequency-aware admission and eviction (Einziger et al.,
+  TinyLFU). Accesses, including misses, are counted in a small aging
+  count-min sketch persisted next to the cache; among the least recently
+  used entries, the least frequent is evicted, and a new entry is only
+  admitted when it is at least as frequent as the entry it would evict.
+  One-off pastes therefore cannot flush out snippets that keep coming back.
+"""
+
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# (key, size in bytes, persisted hit count), least recently used first
+Candidate = Tuple[str, int, int]
+
+
+class EvictionPolicy(ABC):
+    """Chooses victims among eviction candidates."""
+
+    name = ""
+
+    def record(self, key: str) -> None:
+        """Count one access (hit or miss) to key."""
+
+    def admit(self, key: str, victim: Candidate) -> bool:
+        """Whether a new entry for key may displace victim."""
+        return True
+
+    @abstractmethod
+    def order(self, candidates: List[Candidate]) -> List[Candidate]:
+        """Candidates in eviction order (first is evicted first)."""
+
+    def save(self) -> None:
+        """Persist policy state, if any."""
+
+
+class LRUPolicy(EvictionPolicy):
+    """Least recently used first."""
+
+    name = "lru"
+
+    def order(self, candidates: List[Candidate]) -> List[Candidate]:
+        return list(candidates)
+
+
+class LFUPolicy(EvictionPolicy):
+    """Fewest persisted hits first, least recently used among equals."""
+
+    name = "lfu"
+
+    def order(self, candidates: List[Candidate]) -> List[Candidate]:
+        # sorted() is stable, so ties keep their LRU order
+        return sorted(candidates, key=lambda c: c[2])
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of access frequencies with periodic halving.
+
+    Four rows of byte counters; once sample_size accesses have been
+    counted every counter is halved, so old popularity fades.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 255
+
+    def __init__(self, width: int, sample_size: int):
+        """
+        Initialize sketch.
+
+        Args:
+            width: Counters per row (rounded up to a power of two)
+            sample_size: Accesses between halvings
+        """
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.sample_size = sample_size
+        self.additions = 0
+        self.table = bytearray(self.DEPTH * self.width)
+
+    def _slots(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        mask = self.width - 1
+        return [
+            row * self.width + (int.from_bytes(digest[2 * row:2 * row + 2], "little") & mask)
+            for row in range(self.DEPTH)
+        ]
+
+    def increment(self, key: str) -> None:
+        table = self.table
+        for slot in self._slots(key):
+            if table[slot] < self.MAX_COUNT:
+                table[slot] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._halve()
+
+    def estimate(self, key: str) -> int:
+        table = self.table
+        return min(table[slot] for slot in self._slots(key))
+
+    def _halve(self) -> None:
+        self.table = bytearray(b >> 1 for b in self.table)
+        self.additions //= 2
+
+    def to_bytes(self) -> bytes:
+        return self.additions.to_bytes(8, "little") + bytes(self.table)
+
+    def load_bytes(self, data: bytes) -> bool:
+        """Restore state saved by to_bytes (False if the size does not match)."""
+        if len(data) != 8 + len(self.table):
+            return False
+        self.additions = int.from_bytes(data[:8], "little")
+        self.table = bytearray(data[8:])
+        return True
+
+
+class TinyLFUPolicy(EvictionPolicy):
+    """Frequency-aware admission and eviction over an aging sketch."""
+
+    name = "tinylfu"
+
+    def __init__(self, capacity: int, path: Optional[Path] = None):
+        """
+        Initialize policy.
+
+        Args:
+            capacity: Maximum cache entries (sizes the sketch)
+            path: File the sketch is persisted to. None = in memory only
+        """
+        self.sketch = FrequencySketch(width=capacity * 4, sample_size=capacity * 10)
+        self.path = Path(path) if path is not None else None
+        self._dirty = False
+        if self.path is not None:
+            try:
+                self.sketch.load_bytes(self.path.read_bytes())
+            except OSError:
+                # No sketch yet (or unreadable), start cold
+                pass
+
+    def record(self, key: str) -> None:
+        self.sketch.increment(key)
+        self._dirty = True
+
+    def admit(self, key: str, victim: Candidate) -> bool:
+        return self.sketch.estimate(key) >= self.sketch.estimate(victim[0])
+
+    def order(self, candidates: List[Candidate]) -> List[Candidate]:
+        estimate = self.sketch.estimate
+        return sorted(candidates, key=lambda c: estimate(c[0]))
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        try:
+            # Write to temp file first, then atomic rename
+            with tempfile.NamedTemporaryFile(dir=self.path.parent, delete=False) as tmp:
+                tmp.write(self.sketch.to_bytes())
+            os.replace(tmp.name, self.path)
+            self._dirty = False
+        except OSError:
+            # Sketch save failed, not critical (frequencies restart cold)
+            pass
+
+
+POLICIES = ("tinylfu", "lru", "lfu")
+DEFAULT_POLICY = "tinylfu"
+
+
+def policy_name() -> str:
+    """Policy chosen by ECLIPLINT_CACHE_POLICY (tinylfu, lru or lfu)."""
+    name = os.environ.get("ECLIPLINT_CACHE_POLICY", DEFAULT_POLICY).lower()
+    return name if name in POLICIES else DEFAULT_POLICY
+
+
+def make_policy(name: Optional[str], capacity: int, cache_dir: Optional[Path] = None) -> EvictionPolicy:
+    """
+    Create an eviction policy.
+
+    Args:
+        name: "tinylfu", "lru" or "lfu". None = ECLIPLINT_CACHE_POLICY or tinylfu
+        capacity: Maximum cache entries
+        cache_dir: Directory to persist policy state in. None = in memory only
+    """
+    name = name or policy_name()
+    if name == "lru":
+        return LRUPolicy()
+    if name == "lfu":
+        return LFUPolicy()
+    path = Path(cache_dir) / "frequency.sketch" if cache_dir is not None else None
+    return TinyLFUPolicy(capacity, path)
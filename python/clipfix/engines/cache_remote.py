@@ -0,0 +1,348 @@
+"""
+Remote cache tier for eClipLint.
+A shared, content-addressed store on the LAN (see cache_server) behind
+the local cache: lookups the local cache misses are read through from
+it, and new results are written behind to it, so a result formatted on
+one machine is a hit on every other with the same formatters.
+
+Keys are SHA-256 hashes of language, portable formatter identity (see
+cache_bundle) and code, so they match across machines. Lookups have a
+strict latency budget: a slow or unreachable server costs at most the
+budget once, then the tier is skipped for REMOTE_BACKOFF_SECONDS (in
+every process, through a marker file) and the cache behaves as if
+there were no remote.
+
+Protocol (JSON over HTTP/1.1 keep-alive, every request carrying
+`Authorization: Bearer <ECLIPLINT_REMOTE_TOKEN>`):
+    POST /v1/lookup {"keys": [key, ...]}  -> {"entries": {key: entry}}
+    POST /v1/store  {"entries": {key: entry}} -> 204
+    GET  /v1/health -> {"entries": count}
+with entry = {"language", "formatter" (portable identity), "mode",
+"output", "duration"}.
+"""
+
+import atexit
+import hashlib
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Total time a lookup may take, connection included
+DEFAULT_BUDGET_MS = 50
+
+# Skip the remote this long after a lookup failed or timed out
+REMOTE_BACKOFF_SECONDS = 60
+
+# Idle keep-alive connections kept per process
+POOL_SIZE = 4
+
+# Entries per upload, and how long one may take
+WRITE_BATCH = 200
+WRITE_TIMEOUT_SECONDS = 2.0
+
+# Time given to uploads still queued when the process exits
+EXIT_FLUSH_SECONDS = 1.0
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP connections to one server, reused across requests and threads."""
+
+    def __init__(self, url: str, size: int = POOL_SIZE, token: Optional[str] = None):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported remote cache URL: {url}")
+        self._cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._host = parts.hostname
+        self._port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self._auth = {"Authorization": f"Bearer {token}"} if token else {}
+        self._size = size
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def request(self, method: str, path: str, body: Optional[dict], timeout: float) -> Tuple[int, bytes]:
+        """
+        Send one request on an idle connection (or a new one).
+
+        Returns:
+            (status, response body)
+
+        Raises:
+            OSError, http.client.HTTPException: The request failed (the
+                connection is discarded)
+        """
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._cls(self._host, self._port, timeout=timeout)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        else:
+            conn.connect()
+            # Small requests, answered at once: don't hold them back for ACKs
+            conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        headers.update(self._auth)
+        try:
+            conn.request(method, self.prefix + path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except Exception:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                if len(self._idle) < self._size:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        return response.status, data
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class RemoteCache:
+    """
+    Read-through, write-behind client for a remote cache server.
+
+    Thread-safe. Counters (hits, misses, errors) are per process.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        portable: Callable[[str], Optional[str]],
+        budget_ms: int = DEFAULT_BUDGET_MS,
+        state_dir: Optional[Path] = None,
+        token: Optional[str] = None
+    ):
+        """
+        Initialize remote tier.
+
+        Args:
+            url: Server URL, e.g. http://cachebox:8765
+            portable: Maps a local formatter identity to its portable
+                identity, None if it has none (never shared)
+            budget_ms: Maximum time a lookup may take
+            state_dir: Directory for the backoff marker. None = backoff
+                is per process
+            token: Shared token the server requires
+        """
+        self.url = url
+        self.portable = portable
+        self.budget = budget_ms / 1000
+        self.pool = _ConnectionPool(url, token=token)
+        self.down_marker = Path(state_dir) / "remote_down" if state_dir is not None else None
+        self._down_until = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+        # Lookups run here, so the caller can stop waiting at the budget
+        self._executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="ecliplint-remote")
+
+        # Uploads waiting for the writer thread: key -> entry
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._uploading = False
+        self._cond = threading.Condition()
+        self._writer: Optional[threading.Thread] = None
+        atexit.register(self.flush, EXIT_FLUSH_SECONDS)
+
+    def remote_key(self, code: str, language: str, identity: Optional[str]) -> Optional[Tuple[str, str]]:
+        """(remote key, portable identity), None if the formatter cannot be shared."""
+        if identity is None:
+            return None
+        portable = self.portable(identity)
+        if portable is None:
+            return None
+        content = f"{language}:{portable}:{code}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest(), portable
+
+    def available(self) -> bool:
+        """False while backing off after a failure."""
+        now = time.time()
+        if now < self._down_until:
+            return False
+        if self.down_marker is not None:
+            try:
+                down_since = self.down_marker.stat().st_mtime
+            except OSError:
+                return True
+            if now - down_since < REMOTE_BACKOFF_SECONDS:
+                # Another process found the server down
+                self._down_until = down_since + REMOTE_BACKOFF_SECONDS
+                return False
+        return True
+
+    def _mark_down(self) -> None:
+        self.errors += 1
+        self._down_until = time.time() + REMOTE_BACKOFF_SECONDS
+        if self.down_marker is not None:
+            try:
+                self.down_marker.touch()
+            except OSError:
+                # Marker write failed, not critical (backoff stays per process)
+                pass
+
+    def get_many(self, requests: List[Tuple[str, str, Optional[str]]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Look up several results, within the latency budget.
+
+        Args:
+            requests: (code, language, local identity) per lookup
+
+        Returns:
+            Entry dict (see module docstring) or None per request; all
+            None if the server is slow, unreachable or backing off
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        keys = [self.remote_key(code, language, identity) for code, language, identity in requests]
+        wanted = sorted({k[0] for k in keys if k is not None})
+        if not wanted or not self.available():
+            return results
+
+        future = self._executor.submit(self.pool.request, "POST", "/v1/lookup", {"keys": wanted}, self.budget)
+        try:
+            status, data = future.result(timeout=self.budget)
+            if status != 200:
+                raise http.client.HTTPException(f"remote cache lookup: HTTP {status}")
+            found = json.loads(data.decode("utf-8"))["entries"]
+        except (FutureTimeout, OSError, http.client.HTTPException, ValueError, KeyError, TypeError):
+            # Slow or broken server: as if there were no remote
+            self._mark_down()
+            return results
+
+        for i, ((code, language, _), k) in enumerate(zip(requests, keys)):
+            entry = found.get(k[0]) if k is not None else None
+            # A server is not trusted to have matched the key
+            if isinstance(entry, dict) and entry.get("language") == language and entry.get("formatter") == k[1] \
+                    and isinstance(entry.get("output"), str):
+                results[i] = entry
+                self.hits += 1
+            else:
+                self.misses += 1
+        return results
+
+    def put_many(self, items: List[Tuple[str, str, Optional[str], str, str, float]]) -> None:
+        """
+        Queue results for upload (returns immediately).
+
+        Args:
+            items: (code, language, local identity, output, mode,
+                duration) per successful result
+        """
+        batch = {}
+        for code, language, identity, output, mode, duration in items:
+            k = self.remote_key(code, language, identity)
+            if k is None:
+                continue
+            batch[k[0]] = {"language": language, "formatter": k[1], "mode": mode,
+                           "output": output, "duration": duration}
+        if not batch or not self.available():
+            return
+        with self._cond:
+            self._pending.update(batch)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="ecliplint-remote-writer", daemon=True)
+                self._writer.start()
+            self._cond.notify_all()
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                keys = list(self._pending)[:WRITE_BATCH]
+                batch = {key: self._pending.pop(key) for key in keys}
+                self._uploading = True
+            try:
+                status, _ = self.pool.request("POST", "/v1/store", {"entries": batch}, WRITE_TIMEOUT_SECONDS)
+                if status >= 400:
+                    raise http.client.HTTPException(f"remote cache store: HTTP {status}")
+            except Exception:
+                # Upload failed, not critical - drop what is queued and back off
+                self._mark_down()
+                with self._cond:
+                    self._pending.clear()
+            finally:
+                with self._cond:
+                    self._uploading = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout: float = WRITE_TIMEOUT_SECONDS) -> None:
+        """Wait up to timeout for queued uploads to finish."""
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._pending or self._uploading:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                self._cond.wait(remaining)
+
+
+def remote_url() -> Optional[str]:
+    """Remote cache server from ECLIPLINT_REMOTE_CACHE, None if not set."""
+    return os.environ.get("ECLIPLINT_REMOTE_CACHE") or None
+
+
+def remote_token() -> Optional[str]:
+    """Shared server token from ECLIPLINT_REMOTE_TOKEN, None if not set."""
+    return os.environ.get("ECLIPLINT_REMOTE_TOKEN") or None
+
+
+def remote_budget_ms() -> int:
+    """Lookup budget from ECLIPLINT_REMOTE_BUDGET_MS (default DEFAULT_BUDGET_MS)."""
+    try:
+        return int(os.environ.get("ECLIPLINT_REMOTE_BUDGET_MS", DEFAULT_BUDGET_MS))
+    except ValueError:
+        return DEFAULT_BUDGET_MS
+
+
+def _portable_translator() -> Callable[[str], Optional[str]]:
+    """Translate local identities to portable ones, resolving formatters on first use."""
+    translate = None
+
+    def portable(identity: str) -> Optional[str]:
+        nonlocal translate
+        if translate is None:
+            from .cache_bundle import identity_translator, portable_identities
+            translate = identity_translator(portable_identities())
+        return translate(identity)
+    return portable
+
+
+def open_remote(state_dir: Optional[Path] = None) -> Optional[RemoteCache]:
+    """
+    Remote tier configured by ECLIPLINT_REMOTE_CACHE, None if there is none.
+
+    Args:
+        state_dir: Directory for the backoff marker (the cache directory)
+    """
+    url = remote_url()
+    if url is None:
+        return None
+    try:
+        return RemoteCache(url, _portable_translator(), remote_budget_ms(), state_dir, remote_token())
+    except ValueError as e:
+        print(f"Remote cache disabled: {e}", file=sys.stderr)
+        return None
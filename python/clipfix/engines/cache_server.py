@@ -0,0 +1,256 @@
+"""
+Reference remote cache server for eClipLint.
+A small content-addressed store for the remote cache tier (see
+cache_remote): a threaded HTTP/1.1 server with keep-alive, backed by
+one SQLite database and bounded to a number of entries (least recently
+read ones go first). Lookups and stores must carry the shared token
+(`Authorization: Bearer <token>`) from ECLIPLINT_REMOTE_TOKEN; traffic
+is plain HTTP, so it is still meant for a trusted LAN.
+
+Usage:
+    ECLIPLINT_REMOTE_TOKEN=<secret> python -m clipfix.engines.cache_server
+        [--host 127.0.0.1] [--port 8765] [--db ~/.ecliplint/remote-cache.db]
+        [--max-entries 100000]
+
+Then set ECLIPLINT_REMOTE_CACHE=http://<host>:8765 and the same
+ECLIPLINT_REMOTE_TOKEN on the clients.
+"""
+
+import argparse
+import hmac
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Largest request body accepted
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Keys per IN (...) query (SQLite allows 999 parameters in older builds)
+_MAX_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,  -- entry as JSON
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+"""
+
+# Fields an entry must have (see cache_remote)
+_FIELDS = ("language", "formatter", "mode", "output", "duration")
+
+
+class RemoteStore:
+    """SQLite-backed entry store, safe to share between handler threads."""
+
+    def __init__(self, db_path: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize store.
+
+        Args:
+            db_path: Database file (created if missing); ":memory:" for
+                a throwaway store
+            max_entries: Entries kept; the least recently read are
+                removed beyond it
+        """
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored entries among keys (key -> entry), marked as read."""
+        found = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), _MAX_PARAMS):
+                chunk = keys[i:i + _MAX_PARAMS]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+            if found:
+                self._conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?",
+                                       [(now, key) for key in found])
+        return found
+
+    def put_many(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Insert or replace entries, then trim to max_entries."""
+        now = time.time()
+        rows = [(key, json.dumps(entry), now) for key, entry in entries.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO entries (key, value, last_access) VALUES (?, ?, ?)", rows)
+            over = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+            if over > 0:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_access LIMIT ?)", (over,)
+                )
+            self._conn.execute("COMMIT")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+def _valid_entry(entry: Any) -> bool:
+    return isinstance(entry, dict) and all(field in entry for field in _FIELDS) \
+        and isinstance(entry["output"], str)
+
+
+class RemoteCacheHandler(BaseHTTPRequestHandler):
+    """Serves /v1/lookup, /v1/store and /v1/health over keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ecliplint-cache/1"
+
+    # Headers and body are separate writes; with Nagle's algorithm the
+    # body waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    @property
+    def store(self) -> RemoteStore:
+        return self.server.store
+
+    def _authorized(self) -> bool:
+        token = self.server.token
+        if token is None:
+            return True
+        given = self.headers.get("Authorization", "")
+        return hmac.compare_digest(given.encode("utf-8"), f"Bearer {token}".encode("utf-8"))
+
+    def _send_json(self, status: int, body: Optional[dict]) -> None:
+        data = json.dumps(body, separators=(",", ":")).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Optional[dict]:
+        """Request body as a JSON object, None (after an error response) if unusable."""
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": "request body too large"})
+            return None
+        try:
+            body = json.loads(self.rfile.read(length).decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            body = None
+        if not isinstance(body, dict):
+            self._send_json(400, {"error": "expected a JSON object"})
+            return None
+        return body
+
+    def do_GET(self) -> None:
+        if self.path == "/v1/health":
+            self._send_json(200, {"entries": self.store.count()})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        if self.path not in ("/v1/lookup", "/v1/store"):
+            self.close_connection = True
+            self._send_json(404, {"error": "not found"})
+            return
+        if not self._authorized():
+            self.close_connection = True
+            self._send_json(401, {"error": "missing or wrong token"})
+            return
+        body = self._read_json()
+        if body is None:
+            return
+
+        if self.path == "/v1/lookup":
+            keys = body.get("keys")
+            if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+                self._send_json(400, {"error": "keys must be a list of strings"})
+                return
+            self._send_json(200, {"entries": self.store.get_many(keys)})
+            return
+
+        entries = body.get("entries")
+        if not isinstance(entries, dict):
+            self._send_json(400, {"error": "entries must be an object"})
+            return
+        self.store.put_many({key: entry for key, entry in entries.items() if _valid_entry(entry)})
+        self._send_json(204, None)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    store: Optional[RemoteStore] = None,
+    verbose: bool = False,
+    token: Optional[str] = None
+) -> ThreadingHTTPServer:
+    """
+    Create a server (call serve_forever() to run it).
+
+    Args:
+        host: Address to listen on
+        port: Port to listen on; 0 = any free port (see server_address)
+        store: Entry store. None = an in-memory one
+        verbose: Log every request to stderr
+        token: Shared token required on lookups and stores. None = no
+            authentication
+    """
+    server = ThreadingHTTPServer((host, port), RemoteCacheHandler)
+    server.daemon_threads = True
+    server.store = store if store is not None else RemoteStore(Path(":memory:"))
+    server.verbose = verbose
+    server.token = token
+    return server
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run a shared eClipLint remote cache server")
+    ap.add_argument("--host", default="127.0.0.1", help="Address to listen on (0.0.0.0 = every interface)")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    ap.add_argument("--db", type=Path, default=Path.home() / ".ecliplint" / "remote-cache.db", help="Database file")
+    ap.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES, help="Entries kept")
+    ap.add_argument("--verbose", action="store_true", help="Log requests")
+    args = ap.parse_args(argv)
+
+    # From the environment, not the command line (visible in ps)
+    token = os.environ.get("ECLIPLINT_REMOTE_TOKEN")
+    if not token:
+        ap.error("set ECLIPLINT_REMOTE_TOKEN to the token clients will send")
+
+    server = make_server(args.host, args.port, RemoteStore(args.db, args.max_entries), args.verbose, token)
+    print(f"eClipLint remote cache on http://{args.host}:{server.server_address[1]} ({args.db})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
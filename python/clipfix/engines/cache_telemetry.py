@@ -0,0 +1,212 @@
+"""
+Measured cache telemetry for eClipLint.
+Hit, miss, eviction and expiration counts per language and formatter,
+the formatting time hits actually saved (every entry records how long
+its formatter took), and a histogram of lookup latencies.
+
+Counts accumulate in memory and are merged into TELEMETRY_FILE when the
+cache flushes (under the cache lock), so they add up across the short
+processes a hotkey starts.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+TELEMETRY_VERSION = 1
+
+# File in the cache directory the counts are merged into
+TELEMETRY_FILE = "telemetry.json"
+
+EVENTS = ("hits", "misses", "evictions", "expirations", "remote_hits", "remote_errors")
+
+# Lookup latency histogram: bucket i counts lookups under 2**i
+# microseconds (the last bucket takes everything slower)
+LATENCY_BUCKETS = 24
+
+# Label for counts whose language or formatter is not known (misses
+# without a formatter identity, expiry sweeps, remote failures)
+UNKNOWN = "unknown"
+
+
+def formatter_label(identity: Optional[str]) -> str:
+    """Formatter name from an identity ("black 24.1.0 /usr/bin/black ..." -> "black")."""
+    if not identity:
+        return UNKNOWN
+    return identity.split(None, 1)[0]
+
+
+def _empty_counters() -> Dict[str, float]:
+    counters: Dict[str, float] = {event: 0 for event in EVENTS}
+    counters["saved_seconds"] = 0.0
+    return counters
+
+
+def _bucket(seconds: float) -> int:
+    return min(int(seconds * 1_000_000).bit_length(), LATENCY_BUCKETS - 1)
+
+
+def latency_percentile(histogram: List[int], q: float) -> Optional[float]:
+    """
+    Latency below which a fraction q of lookups completed.
+
+    Args:
+        histogram: Bucket counts (see LATENCY_BUCKETS)
+        q: Fraction, e.g. 0.99
+
+    Returns:
+        Upper bound of the bucket holding that lookup in seconds, None if
+        no lookups were recorded
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            return (1 << i) / 1_000_000
+    return (1 << (len(histogram) - 1)) / 1_000_000
+
+
+class CacheTelemetry:
+    """
+    Persistent cache counters and lookup latency histogram.
+
+    Thread-safe; record() and record_latency() only touch memory, flush()
+    merges what was recorded since the last flush into the file.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize telemetry.
+
+        Args:
+            path: JSON file the counts are merged into
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._latency = [0] * LATENCY_BUCKETS
+
+    def record(
+        self,
+        event: str,
+        language: str,
+        formatter: str,
+        saved_seconds: float = 0.0,
+        latency: Optional[float] = None
+    ) -> None:
+        """
+        Count one event.
+
+        Args:
+            event: One of EVENTS
+            language: Language of the entry or lookup
+            formatter: Formatter name (see formatter_label)
+            saved_seconds: Formatting time a hit saved
+            latency: Seconds the lookup took, if this event ends one
+        """
+        with self._lock:
+            counters = self._counters.setdefault(language or UNKNOWN, {}).setdefault(formatter, _empty_counters())
+            counters[event] += 1
+            counters["saved_seconds"] += saved_seconds
+            if latency is not None:
+                self._latency[_bucket(latency)] += 1
+
+    def record_latency(self, seconds: float) -> None:
+        """Count one lookup taking seconds."""
+        with self._lock:
+            self._latency[_bucket(seconds)] += 1
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == TELEMETRY_VERSION and len(data.get("latency", ())) == LATENCY_BUCKETS:
+                return data
+        except (OSError, ValueError, AttributeError):
+            pass
+        # Missing, corrupt or from another version: start over
+        return {"version": TELEMETRY_VERSION, "counters": {}, "latency": [0] * LATENCY_BUCKETS}
+
+    @staticmethod
+    def _merge(data: Dict[str, Any], counters: Dict[str, Dict[str, Dict[str, float]]], latency: List[int]) -> None:
+        for language, formatters in counters.items():
+            for formatter, pending in formatters.items():
+                stored = data["counters"].setdefault(language, {}).setdefault(formatter, _empty_counters())
+                for name, value in pending.items():
+                    stored[name] = stored.get(name, 0) + value
+        data["latency"] = [a + b for a, b in zip(data["latency"], latency)]
+
+    def flush(self) -> None:
+        """Merge counts recorded since the last flush into the file (caller holds the cache lock)."""
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            latency, self._latency = self._latency, [0] * LATENCY_BUCKETS
+        if not counters and not any(latency):
+            return
+        data = self._load()
+        self._merge(data, counters, latency)
+        try:
+            # Write to temp file first, then atomic rename
+            with tempfile.NamedTemporaryFile(mode="w", dir=self.path.parent, delete=False,
+                                             suffix=".tmp", encoding="utf-8") as tmp:
+                json.dump(data, tmp)
+            os.replace(tmp.name, self.path)
+        except OSError:
+            # Telemetry is not critical
+            pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Persisted counts plus those not yet flushed.
+
+        Returns:
+            {"counters": {language: {formatter: {event: count, ...,
+            "saved_seconds": s}}}, "latency": [bucket counts]}
+        """
+        data = self._load()
+        with self._lock:
+            self._merge(data, self._counters, self._latency)
+        return {"counters": data["counters"], "latency": data["latency"]}
+
+
+def summarize(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Totals, per-language and per-formatter breakdowns and latency percentiles.
+
+    Args:
+        snapshot: CacheTelemetry.snapshot()
+
+    Returns:
+        Dictionary with totals (hits, misses, evictions, expirations,
+        saved_seconds), "languages" and "formatters" (name -> totals,
+        busiest first) and lookup_p50/lookup_p99 in seconds (or None)
+    """
+    totals = _empty_counters()
+    languages: Dict[str, Dict[str, float]] = {}
+    formatters: Dict[str, Dict[str, float]] = {}
+    for language, by_formatter in snapshot["counters"].items():
+        for formatter, counters in by_formatter.items():
+            for group, name in ((languages, language), (formatters, formatter)):
+                row = group.setdefault(name, _empty_counters())
+                for event, value in counters.items():
+                    row[event] = row.get(event, 0) + value
+            for event, value in counters.items():
+                totals[event] = totals.get(event, 0) + value
+
+    def busiest(group):
+        return dict(sorted(group.items(), key=lambda item: -(item[1]["hits"] + item[1]["misses"])))
+
+    return {
+        **totals,
+        "languages": busiest(languages),
+        "formatters": busiest(formatters),
+        "lookup_p50": latency_percentile(snapshot["latency"], 0.50),
+        "lookup_p99": latency_percentile(snapshot["latency"], 0.99),
+    }
@@ -1,21 +1,80 @@
 from __future__ import annotations
-import json
-import subprocess
-import tempfile
+import dataclasses
+import hashlib
+import importlib.metadata
+import importlib.util
+import io
+import os
 import textwrap
+import time
 from pathlib import Path
 from typing import Tuple
 
-from .segmenter import regex_segment
+from .segmenter import Segment, regex_segment
 from .llm import llm_classify, llm_repair
-from .cache import cache_get, cache_put
+from .cache import cache_get_by_content, cache_get_failure, cache_get_many, cache_put_many
+from .formatter_registry import get_formatter_registry
+from .formatter_pool import get_worker_pool
+from .formatter_invoke import run_in_file, run_stdio, scratch_path
+from .json_stream import format_json
+from .locking import get_single_flight
+from .layout import NORMALIZE_MAX_CHARS, Layout, apply_layout, normalize_layout_enabled, split_layout
+from .ndjson import format_ndjson
+from .language_detector import detect_language
+from .ngram_classifier import classifier_threshold, classify_ngram
+
+# Candidate kinds formatted concurrently when detection is ambiguous
+SPECULATE_TOP_K = 3
 
 def _has_cmd(cmd: str) -> bool:
-    return subprocess.call(["bash","-lc", f"command -v {cmd} >/dev/null 2>&1"]) == 0
+    return get_formatter_registry().available(cmd)
+
+def _cmd(name: str, *args: str) -> list[str]:
+    """Build an argv for a formatter using its resolved absolute path."""
+    return [get_formatter_registry().path(name) or name, *args]
 
 def _format_json(s: str) -> str:
-    obj = json.loads(s)
-    return json.dumps(obj, indent=2, ensure_ascii=False) + "\n"
+    return format_json(s)
+
+_BLACK_IMPORTABLE = None
+
+def _has_black_lib() -> bool:
+    """Check (once) whether black can be imported into this process."""
+    global _BLACK_IMPORTABLE
+    if _BLACK_IMPORTABLE is None:
+        _BLACK_IMPORTABLE = importlib.util.find_spec("black") is not None
+    return _BLACK_IMPORTABLE
+
+_BLACK_INPROCESS = None
+
+def _use_black_lib() -> bool:
+    """
+    Check (once) whether black's library can stand in for the black CLI.
+
+    Only when it is the same release as the `black` on PATH, and no user
+    config exists (the library API formats with the default Mode and
+    does not read ~/.config/black).
+    """
+    global _BLACK_INPROCESS
+    if _BLACK_INPROCESS is None:
+        _BLACK_INPROCESS = False
+        if _has_black_lib() and not any(Path(c).expanduser().exists() for c in _USER_CONFIGS["black"]):
+            try:
+                lib_version = importlib.metadata.version("black")
+            except importlib.metadata.PackageNotFoundError:
+                lib_version = None
+            # `black --version` prints e.g. "black, 24.1.0 (compiled: yes)"
+            cli_version = get_formatter_registry().version("black") or ""
+            _BLACK_INPROCESS = lib_version is not None and lib_version in cli_version.replace(",", " ").split()
+    return _BLACK_INPROCESS
+
+def _format_python_inprocess(code: str) -> str:
+    """Format Python with black's library API (no fork/exec, no temp file)."""
+    import black
+    try:
+        return black.format_str(code, mode=black.Mode())
+    except Exception as e:
+        raise RuntimeError(str(e).strip() or type(e).__name__) from e
 
 def _format_yaml(s: str) -> str:
     try:
@@ -23,22 +82,207 @@ def _format_yaml(s: str) -> str:
         y = YAML()
         y.indent(mapping=2, sequence=4, offset=2)
         data = y.load(s)
-        with tempfile.TemporaryDirectory() as tmp:
-            p = Path(tmp) / "out.yaml"
-            with p.open("w", encoding="utf-8") as f:
-                y.dump(data, f)
-            return p.read_text(encoding="utf-8")
+        buf = io.StringIO()
+        y.dump(data, buf)
+        return buf.getvalue()
     except Exception:
         return s
 
 def _run_file_formatter(cmd: list[str], content: str, ext: str) -> str:
-    with tempfile.TemporaryDirectory() as tmp:
-        p = Path(tmp) / f"in.{ext}"
-        p.write_text(content)
-        proc = subprocess.run(cmd + [str(p)], capture_output=True, text=True)
-        if proc.returncode != 0:
-            raise RuntimeError((proc.stderr or proc.stdout).strip())
-        return p.read_text()
+    return run_in_file(cmd, content, ext)
+
+def _run_formatter(name: str, cmd: list[str], content: str, ext: str, options: dict | None = None, stdin: bool = True) -> str:
+    """
+    Run a formatter: warm worker if enabled, else stdin/stdout, else a scratch file.
+
+    Args:
+        name: Formatter name (registry/worker key)
+        cmd: Full argv (stdin form when stdin=True, file path appended otherwise)
+        content: Code to format
+        ext: File extension for tools that need a real file
+        options: Worker options (parser, dialect, ...)
+        stdin: Whether cmd streams through stdin/stdout
+    """
+    pool = get_worker_pool()
+    if pool is not None and pool.supports(name):
+        out = pool.format(name, content, options)
+        if out is not None:
+            return out
+    if stdin:
+        return run_stdio(cmd, content)
+    return _run_file_formatter(cmd, content, ext)
+
+def _worker_for(kind: str) -> str | None:
+    """Name of the worker-capable formatter _format_code would use for a kind."""
+    k = (kind or "").lower()
+    if k == "python" and not _has_cmd("ruff") and _has_cmd("black") and not _use_black_lib():
+        return "black"
+    if k in ("javascript","js","typescript","ts") and _has_cmd("prettier"):
+        return "prettier"
+    if k == "sql" and _has_cmd("sqlfluff"):
+        return "sqlfluff"
+    return None
+
+def warm_formatters(kinds) -> None:
+    """Start worker processes for the formatters these kinds will need."""
+    pool = get_worker_pool()
+    if pool is None:
+        return
+    pool.warm({w for w in map(_worker_for, kinds) if w})
+
+# Kinds formatted by an external binary
+_BINARY_FORMATTERS = {
+    "bash": "shfmt", "rust": "rustfmt", "sql": "sqlfluff",
+    "javascript": "prettier", "js": "prettier", "typescript": "prettier", "ts": "prettier",
+}
+
+# Fixed formatter flags (besides input/output plumbing); part of the
+# formatter identity, as they change the output
+_FORMATTER_FLAGS = {
+    "ruff": ("format",),
+    "black": ("--quiet",),
+    "shfmt": ("-i", "2", "-ci"),
+    "rustfmt": ("--emit", "stdout"),
+    "sqlfluff": ("fix", "--dialect", "postgres"),
+}
+_PRETTIER_PARSERS = {"javascript": "babel", "js": "babel", "typescript": "typescript", "ts": "typescript"}
+
+# User-level config files each formatter falls back to (input is formatted
+# in a scratch directory, so no project config applies)
+_USER_CONFIGS = {
+    "ruff": ("~/.config/ruff/ruff.toml", "~/.config/ruff/pyproject.toml"),
+    "black": ("~/.config/black",),
+    "rustfmt": ("~/.config/rustfmt/rustfmt.toml", "~/.config/rustfmt/.rustfmt.toml"),
+    "sqlfluff": ("~/.sqlfluff", "~/.config/sqlfluff"),
+}
+
+# Formatter identity per kind, resolved once per process
+_IDENTITIES: dict[str, str] = {}
+
+# Formatter errors that fail the same way every time for the same input
+# (non-zero exit, parse error); timeouts and OS errors are not cached
+_DETERMINISTIC_ERRORS = (RuntimeError, ValueError)
+
+def _formatter_name(kind: str) -> str:
+    """Name of the formatter _format_code would use for a kind."""
+    k = (kind or "").lower()
+    if k == "json":
+        return "json.dumps"
+    if k in ("ndjson","jsonl"):
+        return "ndjson"
+    if k == "yaml":
+        return "ruamel.yaml"
+    if k == "python":
+        if _has_cmd("ruff"):
+            return "ruff"
+        if _has_cmd("black"):
+            return "black:inprocess" if _use_black_lib() else "black"
+        return "dedent"
+    name = _BINARY_FORMATTERS.get(k)
+    return name if name and _has_cmd(name) else "none"
+
+def _settings_digest(name: str, kind: str) -> str:
+    """Hash of the flags and user config files that shape a formatter's output."""
+    h = hashlib.sha256()
+    flags = _FORMATTER_FLAGS.get(name, ())
+    if name == "prettier":
+        flags = ("--parser", _PRETTIER_PARSERS.get(kind, ""))
+    h.update(repr(flags).encode())
+    for config in _USER_CONFIGS.get(name, ()):
+        try:
+            h.update(Path(config).expanduser().read_bytes())
+        except OSError:
+            h.update(b"-")
+    return h.hexdigest()[:16]
+
+def _package_stamp() -> str:
+    """Modification times of the modules implementing the built-in formatters."""
+    from . import json_stream, ndjson
+    mtimes = []
+    for module_file in (__file__, json_stream.__file__, ndjson.__file__):
+        try:
+            mtimes.append(str(os.stat(module_file).st_mtime))
+        except OSError:
+            mtimes.append("0")
+    return ",".join(mtimes)
+
+def formatter_identity(kind: str) -> str:
+    """
+    Identity of the formatter a kind would be formatted with.
+
+    Covers everything that decides the output: name and version, the
+    binary's path and mtime, the fixed flags and the user-level config
+    the formatter reads. Results cached under it never go stale, because
+    an upgrade or config change makes a new identity.
+    """
+    k = (kind or "").lower()
+    identity = _IDENTITIES.get(k)
+    if identity is not None:
+        return identity
+
+    name = _formatter_name(k)
+    if name == "black:inprocess":
+        import black
+        identity = f"{name} {black.__version__} {black.Mode()!r}"
+    elif name == "ruamel.yaml":
+        try:
+            import ruamel.yaml
+            identity = f"{name} {ruamel.yaml.__version__}"
+        except ImportError:
+            # _format_yaml passes YAML through unchanged without it
+            identity = f"{name} unavailable"
+    elif name in ("json.dumps", "ndjson") or name in _PASSTHROUGH_FORMATTERS:
+        identity = f"{name} {_package_stamp()}"
+    else:
+        identity = f"{get_formatter_registry().identity(name)} {_settings_digest(name, k)}"
+    _IDENTITIES[k] = identity
+    return identity
+
+def _package_digest() -> str:
+    """Hash of the modules implementing the built-in formatters (same wherever this release is installed)."""
+    from . import json_stream, ndjson
+    h = hashlib.sha256()
+    for module_file in (__file__, json_stream.__file__, ndjson.__file__):
+        try:
+            h.update(Path(module_file).read_bytes())
+        except OSError:
+            h.update(b"-")
+    return h.hexdigest()[:16]
+
+def portable_identity(kind: str) -> str | None:
+    """
+    Machine-independent form of a kind's formatter identity.
+
+    Name, version, flags and config, without the binary's path and mtime
+    (module mtimes for the built-in formatters): equal on two machines
+    whose formatter produces the same output, so their cached results
+    can be shared (see cache_bundle). None if the formatter is missing.
+    """
+    k = (kind or "").lower()
+    name = _formatter_name(k)
+    if name in ("black:inprocess", "ruamel.yaml"):
+        # Version and mode only, portable as is
+        identity = formatter_identity(k)
+        return None if identity.endswith(" unavailable") else identity
+    if name in ("json.dumps", "ndjson") or name in _PASSTHROUGH_FORMATTERS:
+        return f"{name} {_package_digest()}"
+    version = get_formatter_registry().version(name)
+    if not version:
+        return None
+    return f"{name} {version} {_settings_digest(name, k)}"
+
+def identity_translations() -> dict[str, str]:
+    """Local formatter identity -> portable identity, for every known kind."""
+    table = {}
+    for kind in _KNOWN_KINDS:
+        try:
+            portable = portable_identity(kind)
+            if portable is not None:
+                table[formatter_identity(kind)] = portable
+        except ImportError:
+            # Formatter library not installed, nothing of it to share
+            continue
+    return table
 
 def _format_code(kind: str, code: str) -> Tuple[str, str]:
     """
@@ -51,128 +295,314 @@ def _format_code(kind: str, code: str) -> Tuple[str, str]:
 
     if k == "json":
         return _format_json(code), "json.dumps"
+    if k in ("ndjson","jsonl"):
+        return format_ndjson(code), "ndjson"
     if k == "yaml":
         return _format_yaml(code), "ruamel.yaml"
 
     if k == "python":
         if _has_cmd("ruff"):
-            return _run_file_formatter(["ruff","format"], textwrap.dedent(code), "py"), "ruff"
+            return _run_formatter("ruff", _cmd("ruff",*_FORMATTER_FLAGS["ruff"],"--stdin-filename",scratch_path("py"),"-"), textwrap.dedent(code), "py"), "ruff"
         if _has_cmd("black"):
-            return _run_file_formatter(["black","--quiet"], textwrap.dedent(code), "py"), "black"
+            # Same formatter as the CLI, without the fork/exec
+            if _use_black_lib():
+                return _format_python_inprocess(textwrap.dedent(code)), "black:inprocess"
+            return _run_formatter("black", _cmd("black",*_FORMATTER_FLAGS["black"],"--stdin-filename",scratch_path("py"),"-"), textwrap.dedent(code), "py"), "black"
         return textwrap.dedent(code).strip() + "\n", "dedent"
 
     if k == "bash":
         if _has_cmd("shfmt"):
-            return _run_file_formatter(["shfmt","-w","-i","2","-ci"], code, "sh"), "shfmt"
+            return _run_formatter("shfmt", _cmd("shfmt",*_FORMATTER_FLAGS["shfmt"]), code, "sh"), "shfmt"
         return code, "none"
 
     if k == "rust":
         if _has_cmd("rustfmt"):
-            return _run_file_formatter(["rustfmt"], code, "rs"), "rustfmt"
+            return _run_formatter("rustfmt", _cmd("rustfmt",*_FORMATTER_FLAGS["rustfmt"]), code, "rs"), "rustfmt"
         return code, "none"
 
     if k in ("javascript","js"):
         if _has_cmd("prettier"):
-            return _run_file_formatter(["prettier","--write","--parser","babel"], code, "js"), "prettier"
+            return _run_formatter("prettier", _cmd("prettier","--parser","babel","--stdin-filepath",scratch_path("js")), code, "js", {"parser": "babel"}), "prettier"
         return code, "none"
 
     if k in ("typescript","ts"):
         if _has_cmd("prettier"):
-            return _run_file_formatter(["prettier","--write","--parser","typescript"], code, "ts"), "prettier"
+            return _run_formatter("prettier", _cmd("prettier","--parser","typescript","--stdin-filepath",scratch_path("ts")), code, "ts", {"parser": "typescript"}), "prettier"
         return code, "none"
 
     if k == "sql":
         if _has_cmd("sqlfluff"):
-            return _run_file_formatter(["sqlfluff","fix","--dialect","postgres"], code, "sql"), "sqlfluff"
+            return _run_formatter("sqlfluff", _cmd("sqlfluff",*_FORMATTER_FLAGS["sqlfluff"],"--stdin-filename",scratch_path("sql"),"-"), code, "sql", {"dialect": "postgres"}), "sqlfluff"
         return code, "none"
 
     return code, "none"
 
 def _detect_kind(text: str) -> str:
-    t = text.strip()
-    low = t.lower()
+    return detect_language(text).kind
+
+# Fence labels that name a supported kind under another spelling
+_KIND_ALIASES = {
+    "py": "python", "python3": "python",
+    "sh": "bash", "shell": "bash", "zsh": "bash", "console": "bash",
+    "node": "javascript", "jsx": "javascript", "tsx": "typescript",
+    "rs": "rust", "postgres": "sql", "postgresql": "sql", "psql": "sql",
+    "yml": "yaml", "jsonl": "ndjson",
+}
+_KNOWN_KINDS = ("python","bash","rust","javascript","js","typescript","ts","sql","json","ndjson","yaml")
+
+# Kinds whose formatter rejects input in another language, so a
+# successful format is evidence (the YAML formatter swallows its errors)
+_SPECULATIVE_KINDS = ("python","bash","rust","javascript","typescript","sql","json","ndjson")
+
+# Formatter names that mean nothing actually validated the code
+_PASSTHROUGH_FORMATTERS = ("none", "dedent")
+
+def _needs_detection(seg) -> bool:
+    """Whether a segment's kind has to be detected (no usable label)."""
+    if seg.inner_kind:
+        kind = seg.inner_kind.lower()
+        return _KIND_ALIASES.get(kind, kind) not in _KNOWN_KINDS
+    return seg.kind == "raw"
+
+def _segment_kind(seg, lang_override: str = None) -> tuple[str, list[str]]:
+    """
+    Decide a segment's kind.
 
-    # 1) JSON (try parsing first - most specific)
-    try:
-        json.loads(t)
-        return "json"
-    except Exception:
-        pass
+    Returns:
+        (kind, candidates): candidates is empty when the kind is settled,
+        otherwise the ranked kinds worth formatting speculatively
+    """
+    if lang_override:
+        return lang_override.lower(), []
+    if seg.inner_kind:
+        kind = seg.inner_kind.lower()
+        kind = _KIND_ALIASES.get(kind, kind)
+        if kind in _KNOWN_KINDS:
+            return kind, []
+    elif seg.kind != "raw":
+        return seg.kind, []
+
+    detection = detect_language(seg.text)
+    if detection.confident:
+        return detection.kind, []
+
+    # Heuristics unsure: the n-gram classifier settles it when confident
+    guess = classify_ngram(seg.text)
+    if guess is not None and guess.confidence >= classifier_threshold():
+        return guess.kind, []
+
+    ranked = ([guess.kind] if guess is not None else []) + detection.candidates(SPECULATE_TOP_K)
+    candidates = []
+    for k in ranked:
+        if k in _SPECULATIVE_KINDS and k not in candidates:
+            candidates.append(k)
+    return detection.kind, candidates[:SPECULATE_TOP_K]
+
+def _format_speculative(candidates: list[str], code: str) -> tuple[tuple[str, str, str] | None, dict]:
+    """
+    Format code as each candidate kind concurrently.
 
-    # 2) Strong Python signals
-    if "import " in low or ("from " in low and " import " in low):
-        return "python"
+    Returns:
+        (winner, errors): winner is (kind, formatted_code, formatter_used)
+        for the best-ranked candidate a real formatter accepted, or None;
+        errors maps each candidate whose formatter raised to the exception
+    """
+    from .parallel_processor import speculate_format
 
-    # 3) JavaScript/TypeScript (check BEFORE general keywords)
-    # Strong JS signals: const, let, var, arrow functions
-    if any(kw in low for kw in ["const ", "let ", "var ", " => "]):
-        return "javascript"
-    if "interface " in t or ": string" in t or ": number" in t:
-        return "typescript"
-    # Weaker signals (after checking const/let/var)
-    if "function" in low:
-        return "javascript"
+    errors: dict[str, Exception] = {}
 
-    # 4) Bash
-    if low.startswith("#!/bin/bash") or "set -e" in low or low.startswith("pythonpath="):
-        return "bash"
+    def attempt(kind: str) -> tuple[str, str] | None:
+        try:
+            formatted, formatter_used = _format_code(kind, code)
+        except Exception as e:
+            errors[kind] = e
+            raise
+        if formatter_used in _PASSTHROUGH_FORMATTERS:
+            return None
+        return formatted, formatter_used
+
+    result = speculate_format(candidates, attempt)
+    if result is None:
+        return None, errors
+    kind, (formatted, formatter_used) = result
+    return (kind, formatted, formatter_used), errors
 
-    # 5) Rust
-    if "fn main" in low or "use std::" in low or "impl " in low:
-        return "rust"
+def process_text(text: str, allow_llm: bool, lang_override: str = None) -> tuple[bool, str, str]:
+    """
+    Format a clip, returning (success, output, mode).
 
-    # 6) SQL (LAST, weakest heuristic)
-    if any(x in low for x in ["select ", " join ", " where "]):
-        return "sql"
+    Identical requests running at the same time (threads of this process,
+    or another ecliplint started by a repeated hotkey) are processed once;
+    the others wait for that result instead of running the formatters or
+    the LLM again.
+    """
+    key = hashlib.sha256(f"{allow_llm}:{lang_override}:{text}".encode("utf-8")).hexdigest()
+    return tuple(get_single_flight().do(key, lambda: _process_text(text, allow_llm, lang_override)))
+
+@dataclasses.dataclass
+class SegmentPlan:
+    """A segment on its way through lookup and formatting."""
+    seg: Segment                  # Segment, text layout-normalized if enabled
+    layout: Layout                # Layout to put back on the result
+    kind: str = ""
+    candidates: list = dataclasses.field(default_factory=list)
+    identity: str = ""            # Formatter identity the result is cached under
+    output: str | None = None     # Finished text (prefix and suffix included)
+    mode: str | None = None       # Mode reported for this segment, if any
+
+    def finish(self, formatted: str, mode: str | None = None) -> None:
+        seg = self.seg
+        self.output = seg.prefix + apply_layout(formatted, self.layout) + seg.suffix
+        self.mode = mode
+
+def plan_segments(segs: list[Segment], lang_override: str = None) -> list[SegmentPlan]:
+    """
+    Resolve each segment's kind and answer what the cache can.
 
-    # Default
-    return "python"
+    All segments the content index does not settle are looked up in one
+    batch; plans with output set are done.
+    """
+    normalize = normalize_layout_enabled()
+    plans = []
+    for seg in segs:
+        # Look up and format the segment without its indentation, line
+        # endings and trailing spaces; they go back on the result
+        layout = Layout()
+        if normalize and len(seg.text) <= NORMALIZE_MAX_CHARS:
+            text, layout = split_layout(seg.text)
+            seg = dataclasses.replace(seg, text=text)
+        plan = SegmentPlan(seg, layout)
+        plans.append(plan)
+
+        # Repeated paste: the content index already knows the kind, so
+        # detection, classification and formatting are all skipped
+        if not lang_override and _needs_detection(seg):
+            content_hit = cache_get_by_content(seg.text, formatter_identity)
+            if content_hit is not None:
+                _, (cached_success, cached_output, cached_mode) = content_hit
+                if cached_success:
+                    plan.finish(cached_output, cached_mode)
+                    continue
+
+        plan.kind, plan.candidates = _segment_kind(seg, lang_override)
+        plan.identity = formatter_identity(plan.kind)
+
+    # Check cache first, all remaining segments at once
+    pending = [plan for plan in plans if plan.output is None]
+    if pending:
+        cached = cache_get_many([(plan.seg.text, plan.kind, plan.identity) for plan in pending])
+        for plan, cached_result in zip(pending, cached):
+            if cached_result is not None:
+                # Cache hit!
+                cached_success, cached_output, cached_mode = cached_result
+                if cached_success:
+                    plan.finish(cached_output, cached_mode)
+    return plans
+
+def format_segment(plan: SegmentPlan, allow_llm: bool, puts: list) -> tuple[bool, str, str] | None:
+    """
+    Format a segment the cache did not answer, finishing its plan.
 
-def process_text(text: str, allow_llm: bool, lang_override: str = None) -> tuple[bool, str, str]:
-    segs = regex_segment(text)
-    out_parts = []
-    mode = "formatted"
+    Args:
+        plan: Plan from plan_segments()
+        allow_llm: Whether to classify/repair with the LLM
+        puts: Cache writes are appended here (for cache_put_many)
 
-    for seg in segs:
-        # Use language override if provided
-        if lang_override:
-            kind = lang_override.lower()
-        else:
-            kind = seg.inner_kind or (seg.kind if seg.kind not in ("raw",) else _detect_kind(seg.text))
-
-        # LLM classify if still ambiguous
-        if allow_llm and (kind in ("unknown", "raw", "") or kind not in ("python","bash","rust","javascript","typescript","sql","json","yaml")):
+    Returns:
+        (False, "", error) on failure, None on success
+    """
+    seg, kind, candidates = plan.seg, plan.kind, plan.candidates
+
+    # Ambiguous: let the formatters decide before guessing or asking the
+    # LLM, skipping those that already rejected this exact input
+    known_failures = {}
+    if len(candidates) > 1:
+        for k in candidates:
+            failure = cache_get_failure(seg.text, k, formatter_identity(k))
+            if failure is not None:
+                known_failures[k] = failure
+    live = [k for k in candidates if k not in known_failures]
+    start = time.perf_counter()
+    speculated, errors = _format_speculative(live, seg.text) if len(candidates) > 1 and live else (None, {})
+    if speculated is not None:
+        winner, formatted, formatter_used = speculated
+        mode = f"formatted as {winner} (speculative)"
+        # Cached as the kind that won, so the next paste finds it through
+        # the content index without speculating again
+        puts.append((seg.text, winner, formatter_used, True, formatted, mode, formatter_identity(winner),
+                     time.perf_counter() - start))
+        plan.finish(formatted, mode)
+        return None
+
+    # Remember the rejections, so a repeated paste skips these formatters
+    for k, e in errors.items():
+        if isinstance(e, _DETERMINISTIC_ERRORS):
+            puts.append((seg.text, k, formatter_identity(k), False, str(e), "failed", None,
+                         time.perf_counter() - start))
+
+    if candidates:
+        # The detector always names a kind for raw text; only a fence
+        # label nobody recognised is worth loading the LLM for
+        kind = candidates[0]
+        if allow_llm and seg.inner_kind:
             cls = llm_classify(seg.text)
-            kind = cls.get("inner_kind") or cls.get("kind") or kind
-
-        # Check cache first
-        cached_result = cache_get(seg.text, kind)
-        if cached_result is not None:
-            # Cache hit!
-            cached_success, cached_output, cached_mode = cached_result
-            if cached_success:
-                out_parts.append(seg.prefix + cached_output + seg.suffix)
-                mode = cached_mode
-                continue
-
-        # Cache miss - format normally
+            llm_kind = cls.get("inner_kind") or cls.get("kind")
+            if llm_kind and llm_kind != "unknown":
+                kind = llm_kind
+    elif allow_llm and kind not in _KNOWN_KINDS:
+        cls = llm_classify(seg.text)
+        kind = cls.get("inner_kind") or cls.get("kind") or kind
+
+    # Cache miss - format normally, unless this formatter already
+    # rejected this exact input
+    formatter_id = formatter_identity(kind)
+    known_failure = known_failures.get(kind) or cache_get_failure(seg.text, kind, formatter_id)
+    # Rejected while speculating: not worth running the formatter again
+    speculative_error = errors.get(kind)
+    mode = None
+    start = time.perf_counter()
+    try:
+        if known_failure is not None:
+            raise RuntimeError(known_failure)
+        if speculative_error is not None:
+            raise speculative_error
+        formatted, formatter_used = _format_code(kind, seg.text)
+
+        # Store in cache if successful, with the time a hit will save
+        puts.append((seg.text, kind, formatter_used, True, formatted, "formatted", formatter_id,
+                     time.perf_counter() - start))
+
+    except Exception as e:
+        if known_failure is None and speculative_error is None and isinstance(e, _DETERMINISTIC_ERRORS):
+            puts.append((seg.text, kind, formatter_id, False, str(e), "failed", None,
+                         time.perf_counter() - start))
+        if not allow_llm:
+            return False, "", f"format error ({kind}): {e}"
+        repaired = llm_repair(kind, seg.text)
         try:
-            formatted, formatter_used = _format_code(kind, seg.text)
+            formatted, formatter_used = _format_code(kind, repaired)
+            mode = "repaired+formatted"
+            # Don't cache LLM repairs (non-deterministic)
+        except Exception as e2:
+            return False, "", f"repair+format error ({kind}): {e2}"
 
-            # Store in cache if successful
-            cache_put(seg.text, kind, formatter_used, True, formatted, "formatted")
+    plan.finish(formatted, mode)
+    return None
 
-        except Exception as e:
-            if not allow_llm:
-                return False, "", f"format error ({kind}): {e}"
-            repaired = llm_repair(kind, seg.text)
-            try:
-                formatted, formatter_used = _format_code(kind, repaired)
-                mode = "repaired+formatted"
-                # Don't cache LLM repairs (non-deterministic)
-            except Exception as e2:
-                return False, "", f"repair+format error ({kind}): {e2}"
-
-        out_parts.append(seg.prefix + formatted + seg.suffix)
+def _process_text(text: str, allow_llm: bool, lang_override: str = None) -> tuple[bool, str, str]:
+    plans = plan_segments(regex_segment(text), lang_override)
 
-    return True, "".join(out_parts), mode
+    # Everything formatted here is written back in one batch
+    puts: list = []
+    try:
+        for plan in plans:
+            if plan.output is None:
+                error = format_segment(plan, allow_llm, puts)
+                if error is not None:
+                    return error
+    finally:
+        cache_put_many(puts)
+
+    # As formatted in order: the last segment that reported a mode wins
+    mode = next((plan.mode for plan in reversed(plans) if plan.mode is not None), "formatted")
+    return True, "".join(plan.output for plan in plans), mode
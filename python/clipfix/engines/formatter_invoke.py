@@ -0,0 +1,118 @@
+"""
+Formatter invocation layer for eClipLint.
+Streams code through a formatter's stdin/stdout whenever the tool supports
+it, and only falls back to a reused scratch workspace (on tmpfs when
+available) for tools that insist on formatting a file in place.
+"""
+
+import atexit
+import itertools
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+
+def _tmpfs_root() -> Optional[str]:
+    """Return a RAM-backed directory if the platform has one."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return None
+
+
+class ScratchWorkspace:
+    """
+    A single per-process directory for formatter input files.
+
+    Created lazily once and removed at exit, instead of creating and
+    deleting a TemporaryDirectory for every segment.
+    """
+
+    def __init__(self):
+        self._dir: Optional[Path] = None
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    @property
+    def dir(self) -> Path:
+        with self._lock:
+            if self._dir is None:
+                self._dir = Path(tempfile.mkdtemp(prefix="ecliplint-", dir=_tmpfs_root()))
+                atexit.register(shutil.rmtree, self._dir, True)
+            return self._dir
+
+    def virtual_path(self, ext: str) -> str:
+        """
+        Path for `--stdin-filename` style flags.
+
+        Nothing is written there; it only anchors config discovery in the
+        workspace (as the old per-call temp directory did) instead of the
+        user's current directory.
+        """
+        return str(self.dir / f"in.{ext}")
+
+    def new_file(self, ext: str) -> Path:
+        """Unique file path in the workspace (safe across threads)."""
+        return self.dir / f"in-{next(self._counter)}.{ext}"
+
+
+_workspace = ScratchWorkspace()
+
+
+def scratch_path(ext: str) -> str:
+    """Virtual input path inside the shared scratch workspace."""
+    return _workspace.virtual_path(ext)
+
+
+def _check(proc: subprocess.CompletedProcess) -> None:
+    if proc.returncode != 0:
+        raise RuntimeError((proc.stderr or proc.stdout).strip())
+
+
+def run_stdio(cmd: List[str], content: str) -> str:
+    """
+    Run a formatter that reads code on stdin and writes it to stdout.
+
+    Raises:
+        RuntimeError: Formatter exited non-zero (message from stderr)
+    """
+    proc = subprocess.run(
+        cmd,
+        input=content,
+        capture_output=True,
+        text=True,
+        encoding='utf-8'
+    )
+    _check(proc)
+    return proc.stdout
+
+
+def run_in_file(cmd: List[str], content: str, ext: str) -> str:
+    """
+    Run a formatter that rewrites a file in place.
+
+    The file lives in the reused scratch workspace and is removed afterwards.
+
+    Raises:
+        RuntimeError: Formatter exited non-zero (message from stderr)
+    """
+    p = _workspace.new_file(ext)
+    try:
+        p.write_text(content, encoding='utf-8')
+        proc = subprocess.run(
+            cmd + [str(p)],
+            capture_output=True,
+            text=True,
+            encoding='utf-8'
+        )
+        _check(proc)
+        return p.read_text(encoding='utf-8')
+    finally:
+        try:
+            p.unlink()
+        except OSError:
+            pass
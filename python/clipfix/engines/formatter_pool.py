@@ -0,0 +1,341 @@
+"""
+Long-lived formatter workers for eClipLint.
+Keeps one warm process per formatter and talks to it over a JSON-lines
+stdio protocol, so repeated formats skip runtime startup and imports.
+
+Protocol (one JSON object per line):
+    worker -> {"ready": true}                              once, after imports
+    client -> {"id": 1, "code": "...", "options": {...}}
+    worker -> {"id": 1, "ok": true, "output": "..."}
+    worker -> {"id": 1, "ok": false, "error": "..."}
+
+Only formatters with an expensive runtime get a worker: prettier (Node)
+and the Python formatters black and sqlfluff. Native binaries (ruff,
+shfmt, rustfmt) start in a few milliseconds and are still run directly.
+"""
+
+import atexit
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .formatter_registry import get_formatter_registry
+
+
+WORKER_FORMATTERS = ("black", "prettier", "sqlfluff")
+
+# Runs under the formatter's own interpreter, so it must not import clipfix
+_PYTHON_WORKER = r'''
+import json, sys
+name = sys.argv[1]
+out = sys.stdout
+sys.stdout = sys.stderr  # keep library chatter off the protocol channel
+if name == "black":
+    import black
+    def fmt(code, options):
+        return black.format_str(code, mode=black.Mode())
+elif name == "sqlfluff":
+    import sqlfluff
+    def fmt(code, options):
+        dialect = options.get("dialect", "postgres")
+        # fix() returns partly fixed text for SQL it cannot parse; fail on
+        # it like `sqlfluff fix` does (raises APIParsingError)
+        sqlfluff.parse(code, dialect=dialect)
+        return sqlfluff.fix(code, dialect=dialect)
+else:
+    raise SystemExit("unknown formatter: " + name)
+out.write(json.dumps({"ready": True}) + "\n")
+out.flush()
+for line in sys.stdin:
+    try:
+        req = json.loads(line)
+    except ValueError:
+        continue
+    try:
+        resp = {"id": req["id"], "ok": True, "output": fmt(req["code"], req.get("options") or {})}
+    except Exception as e:
+        resp = {"id": req["id"], "ok": False, "error": str(e) or type(e).__name__}
+    out.write(json.dumps(resp) + "\n")
+    out.flush()
+'''
+
+_NODE_WORKER = r'''
+const readline = require("readline");
+const prettier = require(process.argv[1]);
+const send = (msg) => process.stdout.write(JSON.stringify(msg) + "\n");
+let queue = Promise.resolve();
+readline.createInterface({ input: process.stdin }).on("line", (line) => {
+  queue = queue.then(async () => {
+    let req;
+    try { req = JSON.parse(line); } catch (e) { return; }
+    try {
+      send({ id: req.id, ok: true, output: await prettier.format(req.code, req.options || {}) });
+    } catch (e) {
+      send({ id: req.id, ok: false, error: String((e && e.message) || e) });
+    }
+  });
+});
+send({ ready: true });
+'''
+
+
+class WorkerUnavailable(Exception):
+    """Raised when a worker cannot be started; callers fall back to a cold run."""
+
+
+def _python_for(binary: str) -> str:
+    """Pick the interpreter a Python console script was installed with."""
+    try:
+        with open(binary, 'rb') as f:
+            first = f.readline(256).decode('utf-8', 'replace')
+    except OSError:
+        return sys.executable
+
+    if first.startswith("#!"):
+        parts = first[2:].strip().split()
+        if parts and "python" in Path(parts[0]).name:
+            return parts[0]
+        if len(parts) > 1 and Path(parts[0]).name == "env" and "python" in parts[1]:
+            return parts[1]
+    return sys.executable
+
+
+def _prettier_package(binary: str) -> Optional[str]:
+    """Find the prettier package directory behind its bin symlink."""
+    here = Path(os.path.realpath(binary)).parent
+    for candidate in [here, *here.parents]:
+        manifest = candidate / "package.json"
+        if manifest.exists():
+            try:
+                if json.loads(manifest.read_text()).get("name") == "prettier":
+                    return str(candidate)
+            except Exception:
+                pass
+            return None
+    return None
+
+
+def _worker_argv(name: str) -> List[str]:
+    """Build the command line for a formatter's worker process."""
+    registry = get_formatter_registry()
+    binary = registry.path(name)
+    if binary is None:
+        raise WorkerUnavailable(f"{name} not installed")
+
+    if name in ("black", "sqlfluff"):
+        return [_python_for(binary), "-c", _PYTHON_WORKER, name]
+
+    if name == "prettier":
+        node = registry.path("node")
+        package = _prettier_package(binary)
+        if node is None or package is None:
+            raise WorkerUnavailable("prettier package not found")
+        return [node, "-e", _NODE_WORKER, package]
+
+    raise WorkerUnavailable(f"no worker for {name}")
+
+
+class FormatterWorker:
+    """A single warm formatter process, restarted on crash or after max_requests."""
+
+    def __init__(self, name: str, max_requests: int = 500, timeout: float = 10.0):
+        self.name = name
+        self.max_requests = max_requests
+        self.timeout = timeout
+        self.proc: Optional[subprocess.Popen] = None
+        self.served = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        try:
+            self.proc = subprocess.Popen(
+                _worker_argv(self.name),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding='utf-8',
+                bufsize=1,
+            )
+        except OSError as e:
+            raise WorkerUnavailable(f"{self.name} worker failed to start: {e}")
+
+        self.served = 0
+        try:
+            ready = json.loads(self._read_line() or "{}").get("ready")
+        except ValueError:
+            ready = False
+        if not ready:
+            self._stop()
+            raise WorkerUnavailable(f"{self.name} worker failed to start")
+
+    def _stop(self) -> None:
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=1)
+        except Exception:
+            self.proc.kill()
+        self.proc = None
+
+    def _read_line(self) -> str:
+        # Kill the worker if it hangs; readline then returns ""
+        timer = threading.Timer(self.timeout, self.proc.kill)
+        timer.start()
+        try:
+            return self.proc.stdout.readline()
+        finally:
+            timer.cancel()
+
+    def _roundtrip(self, code: str, options: dict) -> Optional[dict]:
+        if self.proc is None or self.proc.poll() is not None or self.served >= self.max_requests:
+            self._stop()
+            self._start()
+
+        self._next_id += 1
+        request = {"id": self._next_id, "code": code, "options": options}
+        try:
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+            line = self._read_line()
+        except (BrokenPipeError, OSError):
+            line = ""
+
+        try:
+            response = json.loads(line) if line else None
+        except ValueError:
+            response = None
+        if response is None:
+            # Crashed, timed out or garbled mid-request
+            self._stop()
+            return None
+
+        self.served += 1
+        return response
+
+    def format(self, code: str, options: dict) -> str:
+        """
+        Format code in the warm worker.
+
+        Raises:
+            RuntimeError: The formatter rejected the input
+            WorkerUnavailable: The worker could not be (re)started
+        """
+        with self._lock:
+            response = self._roundtrip(code, options)
+            if response is None:
+                # One retry on a fresh process
+                response = self._roundtrip(code, options)
+            if response is None:
+                raise WorkerUnavailable(f"{self.name} worker crashed")
+
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "formatter failed").strip())
+        return response["output"]
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+
+class FormatterPool:
+    """
+    One warm worker per formatter.
+
+    Formatters whose worker cannot start are remembered as broken for the
+    rest of the process, so callers fall straight back to a cold run.
+    """
+
+    def __init__(self, max_requests: int = 500, timeout: float = 10.0):
+        """
+        Initialize formatter worker pool.
+
+        Args:
+            max_requests: Restart a worker after this many requests
+            timeout: Seconds to wait for a single response
+        """
+        self.max_requests = max_requests
+        self.timeout = timeout
+        self._workers: Dict[str, FormatterWorker] = {}
+        self._broken: set = set()
+        self._lock = threading.Lock()
+
+    def supports(self, name: str) -> bool:
+        """Check whether a formatter can be served by a worker."""
+        return name in WORKER_FORMATTERS and name not in self._broken
+
+    def _worker(self, name: str) -> FormatterWorker:
+        with self._lock:
+            worker = self._workers.get(name)
+            if worker is None:
+                worker = FormatterWorker(name, self.max_requests, self.timeout)
+                self._workers[name] = worker
+            return worker
+
+    def format(self, name: str, code: str, options: Optional[dict] = None) -> Optional[str]:
+        """
+        Format code with a warm worker.
+
+        Returns:
+            Formatted code, or None if no worker is available (caller
+            should fall back to running the formatter directly)
+
+        Raises:
+            RuntimeError: The formatter rejected the input
+        """
+        if not self.supports(name):
+            return None
+        try:
+            return self._worker(name).format(code, options or {})
+        except WorkerUnavailable:
+            self._broken.add(name)
+            return None
+
+    def warm(self, names: Iterable[str]) -> None:
+        """Start workers in the background so the first request is already warm."""
+        for name in names:
+            if not self.supports(name):
+                continue
+            worker = self._worker(name)
+            threading.Thread(target=self._warm_one, args=(name, worker), daemon=True).start()
+
+    def _warm_one(self, name: str, worker: FormatterWorker) -> None:
+        with worker._lock:
+            if worker.proc is not None:
+                return
+            try:
+                worker._start()
+            except Exception:
+                self._broken.add(name)
+
+    def close(self) -> None:
+        """Stop all workers."""
+        for worker in list(self._workers.values()):
+            worker.close()
+        self._workers.clear()
+
+
+# Global pool instance (None until enabled)
+_pool = None
+
+
+def workers_enabled() -> bool:
+    """Workers are opt-in via ECLIPLINT_WORKERS=1 (or --workers)."""
+    return os.environ.get("ECLIPLINT_WORKERS", "").lower() in ("1", "true", "yes", "on")
+
+
+def get_worker_pool(**kwargs) -> Optional[FormatterPool]:
+    """Get the global worker pool, or None if workers are disabled."""
+    global _pool
+    if _pool is None:
+        if not workers_enabled():
+            return None
+        _pool = FormatterPool(**kwargs)
+        atexit.register(_pool.close)
+    return _pool
@@ -0,0 +1,267 @@
+"""
+Formatter availability registry for eClipLint.
+Resolves formatter binaries in-process instead of probing through a login
+shell, and keeps an on-disk snapshot of their paths and versions so a
+hotkey press never re-discovers the toolchain.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# (command, language label, install hint) for every formatter we know about
+KNOWN_FORMATTERS: List[Tuple[str, str, str]] = [
+    ("black", "Python", "pip install black"),
+    ("ruff", "Python", "pip install ruff"),
+    ("prettier", "JavaScript/TypeScript", "npm install -g prettier"),
+    ("shfmt", "Bash", "brew install shfmt"),
+    ("rustfmt", "Rust", "rustup component add rustfmt"),
+    ("sqlfluff", "SQL", "pip install sqlfluff"),
+]
+
+SNAPSHOT_VERSION = 1
+
+# Re-run `--version` at least this often. Shims (pyenv, asdf, mise) and
+# proxies (rustup) keep their path and mtime when the toolchain behind
+# them is upgraded, so (path, mtime) alone can go stale.
+VERSION_RECHECK_SECONDS = 24 * 3600
+
+
+@dataclass
+class FormatterInfo:
+    """Resolved location of a formatter binary."""
+    name: str                      # Command name (e.g., "ruff")
+    path: Optional[str] = None     # Absolute path, None if not installed
+    mtime: float = 0.0             # Binary mtime when resolved
+    version: Optional[str] = None  # First line of `--version`, resolved lazily
+    checked: float = 0.0           # When `--version` was last run
+
+    @property
+    def available(self) -> bool:
+        return self.path is not None
+
+
+class FormatterRegistry:
+    """
+    Process-wide view of which formatters are installed.
+
+    The snapshot is keyed by the PATH value, the mtimes of the PATH
+    directories (so newly installed tools are noticed) and the mtimes of
+    the resolved binaries (so upgrades re-read the version). Versions are
+    also re-read once they are VERSION_RECHECK_SECONDS old, for shims
+    whose target changes underneath them. A valid snapshot answers
+    availability questions with a handful of stat calls.
+    """
+
+    def __init__(self, snapshot_file: Optional[Path] = None):
+        """
+        Initialize formatter registry.
+
+        Args:
+            snapshot_file: Snapshot location. None = ~/.ecliplint/formatters.json
+        """
+        if snapshot_file is None:
+            snapshot_file = Path.home() / ".ecliplint" / "formatters.json"
+
+        self.snapshot_file = Path(snapshot_file)
+        self._lock = threading.Lock()
+        self._tools: Dict[str, FormatterInfo] = {}
+        # Versions from an invalidated snapshot, reused when (path, mtime) still match
+        self._known_versions: Dict[Tuple[str, float], Tuple[str, float]] = {}
+        self._search_path = self._current_search_path()
+        self._dir_mtimes = self._stat_dirs(self._search_path)
+
+        self._load_snapshot()
+
+    @staticmethod
+    def _current_search_path() -> str:
+        return os.environ.get("PATH", os.defpath)
+
+    @staticmethod
+    def _stat_dirs(search_path: str) -> Dict[str, float]:
+        mtimes = {}
+        for d in search_path.split(os.pathsep):
+            if not d:
+                continue
+            try:
+                mtimes[d] = os.stat(d).st_mtime
+            except OSError:
+                mtimes[d] = 0.0
+        return mtimes
+
+    @staticmethod
+    def _binary_mtime(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def _load_snapshot(self) -> None:
+        """Load the on-disk snapshot if it still matches this environment."""
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                data = json.load(f)
+        except Exception:
+            return
+
+        if data.get("version") != SNAPSHOT_VERSION:
+            return
+
+        tools = {}
+        for name, raw in data.get("tools", {}).items():
+            try:
+                tools[name] = FormatterInfo(**raw)
+            except TypeError:
+                continue
+
+        for info in tools.values():
+            if info.path and info.version is not None:
+                self._known_versions[(info.path, info.mtime)] = (info.version, info.checked)
+
+        if data.get("path") != self._search_path or data.get("dirs") != self._dir_mtimes:
+            # Toolchain may have changed: resolve again, but keep versions
+            return
+
+        for name, info in tools.items():
+            if info.path and self._binary_mtime(info.path) != info.mtime:
+                continue
+            self._tools[name] = info
+
+    def _save_snapshot(self) -> None:
+        """Persist the snapshot atomically (not critical on failure)."""
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "path": self._search_path,
+            "dirs": self._dir_mtimes,
+            "tools": {name: asdict(info) for name, info in self._tools.items()},
+        }
+        try:
+            self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                mode='w',
+                dir=self.snapshot_file.parent,
+                delete=False
+            ) as tmp:
+                json.dump(data, tmp, indent=2)
+                tmp_path = tmp.name
+            os.replace(tmp_path, self.snapshot_file)
+        except Exception as e:
+            print(f"Formatter snapshot write failed: {e}", file=sys.stderr)
+
+    def _resolve(self, name: str) -> FormatterInfo:
+        path = shutil.which(name, path=self._search_path)
+        if path is None:
+            return FormatterInfo(name=name)
+
+        path = os.path.abspath(path)
+        mtime = self._binary_mtime(path) or 0.0
+        version, checked = self._known_versions.get((path, mtime), (None, 0.0))
+        return FormatterInfo(
+            name=name,
+            path=path,
+            mtime=mtime,
+            version=version,
+            checked=checked,
+        )
+
+    def lookup(self, name: str) -> FormatterInfo:
+        """
+        Get formatter info, resolving and recording it on first use.
+
+        Args:
+            name: Command name (e.g., "ruff")
+
+        Returns:
+            FormatterInfo (path is None when not installed)
+        """
+        with self._lock:
+            info = self._tools.get(name)
+            if info is None:
+                info = self._resolve(name)
+                self._tools[name] = info
+                self._save_snapshot()
+            return info
+
+    def available(self, name: str) -> bool:
+        """Check whether a formatter is installed."""
+        return self.lookup(name).available
+
+    def path(self, name: str) -> Optional[str]:
+        """Get the absolute path of a formatter, None if not installed."""
+        return self.lookup(name).path
+
+    def version(self, name: str) -> Optional[str]:
+        """
+        Get a formatter's version string (first line of `--version`).
+
+        Runs the binary once per (path, mtime), and again when the result
+        is older than VERSION_RECHECK_SECONDS; the result is stored in the
+        snapshot.
+        """
+        info = self.lookup(name)
+        if not info.available:
+            return None
+        now = time.time()
+        if info.version is not None and now - info.checked < VERSION_RECHECK_SECONDS:
+            return info.version
+
+        try:
+            result = subprocess.run(
+                [info.path, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            output = (result.stdout or result.stderr).strip()
+            version = output.split("\n")[0] if output else "unknown"
+        except Exception:
+            return info.version
+
+        with self._lock:
+            info.version = version
+            info.checked = now
+            self._known_versions[(info.path, info.mtime)] = (version, now)
+            self._save_snapshot()
+        return version
+
+    def identity(self, name: str) -> Optional[str]:
+        """
+        Identify the installed binary: name, version, path and mtime.
+
+        Changes whenever the formatter is upgraded, reinstalled or found
+        somewhere else on PATH. None if not installed.
+        """
+        info = self.lookup(name)
+        if not info.available:
+            return None
+        return f"{name} {self.version(name)} {info.path} {info.mtime}"
+
+    def refresh(self) -> None:
+        """Forget everything and re-resolve formatters on next lookup."""
+        with self._lock:
+            self._tools.clear()
+            self._known_versions.clear()
+            self._search_path = self._current_search_path()
+            self._dir_mtimes = self._stat_dirs(self._search_path)
+            self._save_snapshot()
+
+
+# Global registry instance
+_registry = None
+
+
+def get_formatter_registry(**kwargs) -> FormatterRegistry:
+    """Get or create global formatter registry instance."""
+    global _registry
+    if _registry is None:
+        _registry = FormatterRegistry(**kwargs)
+    return _registry
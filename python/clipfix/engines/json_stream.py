@@ -0,0 +1,231 @@
+"""
+JSON pretty-printing for eClipLint.
+Small payloads go through orjson (when installed) or the stdlib; large
+payloads are re-indented by a tokenizer that never builds Python objects,
+so memory stays bounded by the nesting depth plus one output chunk.
+
+The streaming path produces the same text as
+``json.dumps(json.loads(s), indent=2, ensure_ascii=False)`` except for
+duplicate object keys, which are kept as written instead of collapsed.
+"""
+
+import json
+import re
+from json.decoder import JSONDecodeError, scanstring
+from json.encoder import encode_basestring
+from typing import Iterator, Optional
+
+# Inputs at or above this size use the streaming re-indenter
+STREAM_THRESHOLD = 1 << 20  # 1 MiB
+
+# Parts buffered before a chunk is yielded
+_CHUNK_PARTS = 4096
+
+_WS = re.compile(r'[ \t\n\r]*')
+# One token per match; the group that matched identifies the token type
+_TOKEN = re.compile(
+    r'[ \t\n\r]*(?:'
+    r'("[^"\\\x00-\x1f]*")'                            # 1 string without escapes
+    r'|(")'                                             # 2 string with escapes
+    r'|([{\[])'                                         # 3 open
+    r'|([}\]])'                                         # 4 close
+    r'|(,)'                                             # 5 comma
+    r'|(:)'                                             # 6 colon
+    r'|(-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?)'       # 7 number (8 frac, 9 exp)
+    r'|(true|false|null|NaN|Infinity|-Infinity)'        # 10 literal
+    r'|([^ \t\n\r])'                                    # 11 anything else
+    r')',
+    re.DOTALL
+)
+_T_STRING, _T_ESCAPED, _T_OPEN, _T_CLOSE, _T_COMMA, _T_COLON, _T_NUMBER = 1, 2, 3, 4, 5, 6, 7
+_T_LITERAL = 10
+_CLOSES = {"{": "}", "[": "]"}
+# orjson prints floats differently from repr() (1e16 vs 1e+16, 0.000015 vs
+# 1.5e-05) and reads integers beyond 64 bits as floats
+_ORJSON_UNSAFE = re.compile(r'\d[.eE]|\d{19}')
+
+# Parser states
+_VALUE, _KEY, _COLON, _AFTER = range(4)
+_EXPECTING = {
+    _VALUE: "Expecting value",
+    _KEY: "Expecting property name enclosed in double quotes",
+    _COLON: "Expecting ':' delimiter",
+    _AFTER: "Expecting ',' delimiter",
+}
+
+
+def _encode_number(tok: str, frac: Optional[str], exp: Optional[str]) -> str:
+    """Render a number literal the way json.dumps(json.loads(tok)) would."""
+    if frac is None and exp is None:
+        return "0" if tok == "-0" else tok
+    value = float(tok)
+    if value == float("inf"):
+        return "Infinity"
+    if value == float("-inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def iter_reindent(text: str, indent: int = 2) -> Iterator[str]:
+    """
+    Re-indent a JSON document chunk by chunk without building objects.
+
+    Args:
+        text: JSON document
+        indent: Spaces per nesting level
+
+    Yields:
+        Output chunks (no trailing newline)
+
+    Raises:
+        json.JSONDecodeError: Input is not valid JSON
+    """
+    stack = []      # open containers: '{' or '['
+    parts = []
+    newlines = ["\n"]  # newlines[d] = newline + indentation for depth d
+    pad = " " * indent
+    state = _VALUE
+    opened = False  # last token opened a container (may still be empty)
+    match = _TOKEN.match
+    emit = parts.append
+    pos = 0
+
+    while True:
+        m = match(text, pos)
+        if m is None:
+            pos = _WS.match(text, pos).end()
+            if pos == len(text) and state == _AFTER and not stack:
+                break
+            if pos == len(text) or state in (_VALUE, _KEY):
+                raise JSONDecodeError(_EXPECTING[state], text, pos)
+            raise JSONDecodeError("Extra data" if not stack else _EXPECTING[state], text, pos)
+
+        kind = m.lastindex
+        pos = m.end()
+
+        if opened:
+            opened = False
+            if kind == _T_CLOSE and m.group(kind) == _CLOSES[stack[-1]]:
+                stack.pop()
+                emit(m.group(kind))
+                state = _AFTER
+                continue
+            depth = len(stack)
+            if depth == len(newlines):
+                newlines.append(newlines[-1] + pad)
+            emit(newlines[depth])
+
+        if state == _AFTER:
+            if kind == _T_COMMA and stack:
+                emit(",")
+                emit(newlines[len(stack)])
+                state = _KEY if stack[-1] == "{" else _VALUE
+            elif kind == _T_CLOSE and stack and m.group(kind) == _CLOSES[stack[-1]]:
+                stack.pop()
+                emit(newlines[len(stack)])
+                emit(m.group(kind))
+            else:
+                raise JSONDecodeError("Extra data" if not stack else _EXPECTING[state], text, m.start(kind))
+
+        elif state == _COLON:
+            if kind != _T_COLON:
+                raise JSONDecodeError(_EXPECTING[state], text, m.start(kind))
+            emit(": ")
+            state = _VALUE
+
+        elif kind == _T_STRING:
+            emit(m.group(kind))
+            state = _COLON if state == _KEY else _AFTER
+
+        elif kind == _T_ESCAPED:
+            value, pos = scanstring(text, pos, True)
+            emit(encode_basestring(value))
+            state = _COLON if state == _KEY else _AFTER
+
+        elif state == _KEY:
+            raise JSONDecodeError(_EXPECTING[state], text, m.start(kind))
+
+        elif kind == _T_OPEN:
+            c = m.group(kind)
+            stack.append(c)
+            emit(c)
+            opened = True
+            state = _KEY if c == "{" else _VALUE
+
+        elif kind == _T_NUMBER:
+            emit(_encode_number(m.group(kind), m.group(_T_NUMBER + 1), m.group(_T_NUMBER + 2)))
+            state = _AFTER
+
+        elif kind == _T_LITERAL:
+            emit(m.group(kind))
+            state = _AFTER
+
+        else:
+            raise JSONDecodeError(_EXPECTING[state], text, m.start(kind))
+
+        if len(parts) >= _CHUNK_PARTS:
+            yield "".join(parts)
+            del parts[:]
+
+    if parts:
+        yield "".join(parts)
+
+
+def reindent_json(text: str, indent: int = 2) -> str:
+    """Streaming equivalent of json.dumps(json.loads(text), indent=2, ensure_ascii=False) + newline."""
+    return "".join(iter_reindent(text, indent)) + "\n"
+
+
+def dumps_stdlib(text: str) -> str:
+    """Parse and re-serialize with the stdlib (builds the full object tree)."""
+    obj = json.loads(text)
+    return json.dumps(obj, indent=2, ensure_ascii=False) + "\n"
+
+
+_ORJSON = None
+
+
+def _orjson():
+    """Import orjson once; False if unavailable."""
+    global _ORJSON
+    if _ORJSON is None:
+        try:
+            import orjson
+            _ORJSON = orjson
+        except ImportError:
+            _ORJSON = False
+    return _ORJSON
+
+
+def dumps_orjson(text: str) -> Optional[str]:
+    """
+    Parse and re-serialize with orjson.
+
+    Returns None when orjson is missing, when the document may contain
+    floats or very large integers (orjson would print them differently
+    from the stdlib), or when orjson rejects the input (NaN), so the
+    caller can fall back to the stdlib.
+    """
+    orjson = _orjson()
+    if not orjson or _ORJSON_UNSAFE.search(text):
+        return None
+    try:
+        return orjson.dumps(orjson.loads(text), option=orjson.OPT_INDENT_2).decode("utf-8") + "\n"
+    except (orjson.JSONDecodeError, orjson.JSONEncodeError):
+        return None
+
+
+def format_json(text: str) -> str:
+    """
+    Pretty-print JSON with 2-space indentation.
+
+    Raises:
+        ValueError: Input is not valid JSON
+    """
+    if len(text) >= STREAM_THRESHOLD:
+        return reindent_json(text)
+
+    out = dumps_orjson(text)
+    if out is not None:
+        return out
+    return dumps_stdlib(text)
@@ -0,0 +1,189 @@
+"""
+Language detection for eClipLint.
+Scores every supported language in a single pass over a bounded sample,
+using one precompiled regex alternation of weighted keyword signals, and
+reports a confidence so callers can skip LLM classification when the
+answer is already clear.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from .ndjson import looks_like_ndjson
+
+# Only this many leading characters are scanned for keyword signals
+SAMPLE_CHARS = 64 * 1024
+
+# Whole-text JSON parses are only attempted below this size; larger
+# inputs are judged on their first and last characters (the formatter
+# still validates them)
+JSON_PARSE_LIMIT = 1 << 20  # 1 MiB
+
+# Detections at or above this confidence do not need LLM classification
+CONFIDENT = 0.6
+
+# Score at which a single language is considered strongly evidenced
+_STRONG_SCORE = 4
+
+# Tie-break order (and the order of the old heuristic chain)
+LANGUAGES = ("python", "javascript", "typescript", "bash", "rust", "sql")
+DEFAULT_LANGUAGE = "python"
+
+# (language, weight, pattern). Patterns are case-sensitive unless they
+# carry their own (?i:...) group; lowercasing the input would copy it.
+_SIGNALS: List[Tuple[str, int, str]] = [
+    # Python
+    ("python", 3, r"^[ \t]*import[ \t]+[\w.]+[ \t]*(?:as[ \t]+\w+[ \t]*)?$"),
+    ("python", 4, r"^[ \t]*from[ \t]+[\w.]+[ \t]+import\b"),
+    ("python", 3, r"^[ \t]*(?:async[ \t]+)?def[ \t]+\w+[ \t]*\("),
+    ("python", 2, r"^[ \t]*class[ \t]+\w+[ \t]*(?:\([^)]*\))?:"),
+    ("python", 2, r"\bself\.\w"),
+    ("python", 1, r"\bprint\("),
+    ("python", 2, r"^[ \t]*(?:elif|except)\b.*:[ \t]*$"),
+    ("python", 2, r"\b(?:None|True|False)\b"),
+    # JavaScript
+    ("javascript", 3, r"\b(?:const|let|var)[ \t]+[\w$\[{]"),
+    ("javascript", 2, r"=>"),
+    ("javascript", 2, r"\bfunction\b"),
+    ("javascript", 3, r"\bconsole\.\w+\("),
+    ("javascript", 4, r"^[ \t]*import\b.*\bfrom[ \t]+['\"]"),
+    ("javascript", 3, r"\brequire\(['\"]"),
+    ("javascript", 2, r"\b(?:module\.exports|export[ \t]+(?:default|const|function|class))\b"),
+    ("javascript", 1, r"===|!=="),
+    # TypeScript (JavaScript signals also count towards it, see below)
+    ("typescript", 4, r"\binterface[ \t]+\w+"),
+    ("typescript", 4, r":[ \t]*(?:string|number|boolean|void|any|unknown)\b"),
+    ("typescript", 3, r"^[ \t]*(?:export[ \t]+)?type[ \t]+\w+[ \t]*(?:<[^>]*>)?[ \t]*="),
+    ("typescript", 2, r"\b(?:private|public|readonly)[ \t]+\w+[ \t]*[:;(]"),
+    # Bash
+    ("bash", 6, r"\A#![^\n]*\b(?:ba|z)?sh\b"),
+    ("bash", 3, r"^[ \t]*set[ \t]+-[euxo]"),
+    ("bash", 4, r"\A(?i:pythonpath=)"),
+    ("bash", 2, r"^[ \t]*(?:fi|done|esac)[ \t]*$"),
+    ("bash", 2, r";[ \t]*(?:then|do)\b"),
+    ("bash", 1, r"^[ \t]*echo[ \t]"),
+    ("bash", 1, r"\$\{?\w+"),
+    # Rust
+    ("rust", 5, r"\bfn[ \t]+main[ \t]*\("),
+    ("rust", 5, r"\buse[ \t]+(?:std|crate)::"),
+    ("rust", 3, r"^[ \t]*impl\b"),
+    ("rust", 3, r"\blet[ \t]+mut\b"),
+    ("rust", 2, r"^[ \t]*(?:pub[ \t]+)?fn[ \t]+\w+"),
+    ("rust", 2, r"\w!\("),
+    ("rust", 1, r"->[ \t]*[A-Z&(]"),
+    # SQL (keywords are case-insensitive)
+    ("sql", 3, r"(?i:\bselect\b[\s\S]{0,200}?\bfrom\b)"),
+    ("sql", 2, r"(?i:\b(?:inner|left|right|outer)?[ \t]*join\b)"),
+    ("sql", 2, r"(?i:\bwhere\b)"),
+    ("sql", 4, r"(?i:\binsert[ \t]+into\b|\bcreate[ \t]+(?:table|index|view)\b|\bupdate\b[^\n]*\bset\b|\bdelete[ \t]+from\b)"),
+    ("sql", 2, r"(?i:\b(?:group|order)[ \t]+by\b)"),
+]
+
+# One alternation; the matching group's name identifies the signal
+_SCANNER = re.compile(
+    "|".join(f"(?P<s{i}>{pattern})" for i, (_, _, pattern) in enumerate(_SIGNALS)),
+    re.MULTILINE
+)
+_SIGNAL_BY_GROUP: Dict[str, Tuple[str, int]] = {
+    f"s{i}": (lang, weight) for i, (lang, weight, _) in enumerate(_SIGNALS)
+}
+
+_NON_SPACE = re.compile(r"\S")
+_JSON_START = frozenset('{["-0123456789tfn')
+_JSON_CLOSE = {"{": "}", "[": "]"}
+
+
+@dataclass
+class Detection:
+    """Result of language detection."""
+    kind: str                    # Best language
+    confidence: float            # 0.0 (guess) to 1.0 (certain)
+    scores: Dict[str, int] = field(default_factory=dict)  # Keyword score per language
+
+    @property
+    def confident(self) -> bool:
+        return self.confidence >= CONFIDENT
+
+    def candidates(self, k: int = 3) -> List[str]:
+        """Best k languages by score (the detected kind first)."""
+        ranked = [self.kind]
+        for lang in sorted(self.scores, key=lambda l: (-self.scores[l], LANGUAGES.index(l))):
+            if lang not in ranked and self.scores[lang] > 0:
+                ranked.append(lang)
+        return ranked[:k]
+
+
+def _json_kind(text: str, start: int) -> Tuple[str, float]:
+    """
+    Classify text as JSON / NDJSON without full parses where possible.
+
+    Returns:
+        (kind, confidence), or ("", 0.0) if it is neither
+    """
+    first = text[start]
+    if first not in _JSON_START:
+        return "", 0.0
+
+    if len(text) <= JSON_PARSE_LIMIT:
+        try:
+            json.loads(text)
+            return "json", 1.0
+        except ValueError:
+            pass
+    elif first in _JSON_CLOSE and text.rstrip()[-1:] == _JSON_CLOSE[first] \
+            and not looks_like_ndjson(text[start:start + SAMPLE_CHARS]):
+        return "json", 0.9
+
+    if first in "{[" and looks_like_ndjson(text[start:start + SAMPLE_CHARS]):
+        return "ndjson", 0.95
+    return "", 0.0
+
+
+def score_languages(sample: str) -> Dict[str, int]:
+    """
+    Score each language by the weighted keyword signals found in sample.
+
+    One finditer pass over the sample; TypeScript also receives the
+    JavaScript score once it has evidence of its own, since it is a
+    superset.
+    """
+    scores = dict.fromkeys(LANGUAGES, 0)
+    lookup = _SIGNAL_BY_GROUP
+    for m in _SCANNER.finditer(sample):
+        lang, weight = lookup[m.lastgroup]
+        scores[lang] += weight
+    if scores["typescript"]:
+        scores["typescript"] += scores["javascript"]
+    return scores
+
+
+def detect_language(text: str) -> Detection:
+    """
+    Detect the language of a code snippet.
+
+    Args:
+        text: Code snippet (only a bounded sample is scanned)
+
+    Returns:
+        Detection with kind, confidence and per-language scores
+    """
+    m = _NON_SPACE.search(text)
+    if m is None:
+        return Detection(DEFAULT_LANGUAGE, 0.0)
+
+    start = m.start()
+    kind, confidence = _json_kind(text, start)
+    if kind:
+        return Detection(kind, confidence)
+
+    scores = score_languages(text[start:start + SAMPLE_CHARS])
+    ranked = sorted(LANGUAGES, key=lambda l: (-scores[l], LANGUAGES.index(l)))
+    best, runner_up = scores[ranked[0]], scores[ranked[1]]
+    if best == 0:
+        return Detection(DEFAULT_LANGUAGE, 0.0, scores)
+
+    # Margin over the runner-up, scaled down while evidence is thin
+    confidence = (best - runner_up) / best * min(1.0, best / _STRONG_SCORE)
+    return Detection(ranked[0], round(confidence, 3), scores)
@@ -0,0 +1,69 @@
+"""
+Layout normalization for clipboard segments.
+The same snippet copied from a different nesting level, from a CRLF file,
+or with trailing spaces is the same code; splitting that layout off before
+lookup and formatting lets all of those copies share one cache entry, and
+the layout is put back on the formatted result.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Tuple
+
+DEFAULT_NORMALIZE = False
+
+# Larger segments (bulk JSON/NDJSON) are formatted as-is
+NORMALIZE_MAX_CHARS = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Layout:
+    """Base indentation and line ending removed from a segment."""
+    indent: str = ""
+    newline: str = "\n"
+
+    @property
+    def identity(self) -> bool:
+        return not self.indent and self.newline == "\n"
+
+
+def split_layout(code: str) -> Tuple[str, Layout]:
+    """
+    Split code into layout-free text and its layout.
+
+    The text has LF line endings, no trailing whitespace and no
+    indentation common to all non-blank lines.
+
+    Returns:
+        Tuple of (normalized_text, layout)
+    """
+    newline = "\r\n" if "\r\n" in code else "\n"
+    lines = [line.rstrip() for line in code.split("\n")]
+
+    margins = [line[:len(line) - len(line.lstrip())] for line in lines if line]
+    indent = os.path.commonprefix(margins) if margins else ""
+    if indent:
+        lines = [line[len(indent):] for line in lines]
+
+    return "\n".join(lines), Layout(indent, newline)
+
+
+def apply_layout(text: str, layout: Layout) -> str:
+    """Re-indent non-blank lines of text and restore the line endings of layout."""
+    if layout.identity:
+        return text
+    if layout.indent:
+        text = "\n".join(layout.indent + line if line.strip() else line for line in text.split("\n"))
+    if layout.newline != "\n":
+        text = text.replace("\r\n", "\n").replace("\n", layout.newline)
+    return text
+
+
+def normalize_layout_enabled() -> bool:
+    """Whether segments are normalized before lookup (cache.normalize_layout in llm.yaml)."""
+    try:
+        from .config_loader import load_llm_config
+        cfg = load_llm_config().get("cache") or {}
+        return bool(cfg.get("normalize_layout", DEFAULT_NORMALIZE))
+    except Exception:
+        return DEFAULT_NORMALIZE
@@ -0,0 +1,252 @@
+"""
+Advisory locking for eClipLint.
+Several ecliplint processes can run at once (a mashed hotkey), and one
+process formats segments on several threads, so shared files (cache,
+history) are only written under a lock, and identical work in flight is
+done once: later callers wait for the first one's result.
+
+Locks are flock(2) locks on small lock files, combined with a thread
+lock (flock does not exclude threads sharing a descriptor). Where fcntl
+is unavailable (Windows), locking is per process only.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Longest a process waits for another one computing the same key before
+# computing it itself
+SINGLE_FLIGHT_WAIT_SECONDS = 10.0
+
+# How often a waiting process retries the key's lock
+SINGLE_FLIGHT_POLL_SECONDS = 0.01
+
+
+class InterProcessLock:
+    """Re-entrant lock held across threads and processes."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize lock.
+
+        Args:
+            path: Lock file (created on first use)
+        """
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._lock_file()
+            except Exception:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def _lock_file(self) -> None:
+        if fcntl is None:
+            return
+        if self._file is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a+b")
+            except OSError:
+                # Lock file unusable (read-only home?), not critical -
+                # fall back to excluding threads only
+                return
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+
+    def __enter__(self) -> "InterProcessLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class _Call:
+    """A computation in flight in this process."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs one computation per key at a time, sharing its result.
+
+    Within a process, concurrent callers for a key wait for the first and
+    get its result (or exception). Across processes, the first caller
+    holds the key's own lock file (removed when it is done); a caller
+    that finds it held leaves a marker, waits for the lock (at most
+    SINGLE_FLIGHT_WAIT_SECONDS), and takes the result the first process
+    left for it (as JSON) if there is one, otherwise computes it itself.
+    """
+
+    def __init__(self, lock_dir: Optional[Path] = None):
+        """
+        Initialize single-flight registry.
+
+        Args:
+            lock_dir: Directory for lock and result files. None = within
+                this process only
+        """
+        self.lock_dir = Path(lock_dir) if lock_dir is not None else None
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.shared = 0  # results taken from another caller
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, unless a call for key is already in flight.
+
+        Args:
+            key: Identifies the computation (e.g. a content hash)
+            fn: Computation; its result must be JSON-serializable to be
+                shared across processes (it then arrives as JSON, e.g.
+                tuples as lists)
+
+        Returns:
+            fn's result, or the result of the call already in flight
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            self.shared += 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_across_processes(key, fn)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _do_across_processes(self, key: str, fn: Callable[[], Any]) -> Any:
+        if self.lock_dir is None or fcntl is None:
+            return fn()
+        lock_file = self.lock_dir / f"{key}.lock"
+        try:
+            self.lock_dir.mkdir(parents=True, exist_ok=True)
+            f = open(lock_file, "a+b")
+        except OSError:
+            # Lock directory unusable, not critical
+            return fn()
+
+        marker = self.lock_dir / f"{key}.waiting"
+        result_file = self.lock_dir / f"{key}.result"
+        with f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another process is computing this very key
+                return self._wait_for(f, marker, result_file, fn)
+            try:
+                result = fn()
+                if marker.exists():
+                    self._leave_result(result_file, result)
+                return result
+            finally:
+                # Removed while still held: a caller that opened it before
+                # gets the lock on the unlinked file, a later one starts anew
+                try:
+                    lock_file.unlink()
+                except OSError:
+                    pass
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _wait_for(self, f, marker: Path, result_file: Path, fn: Callable[[], Any]) -> Any:
+        """Wait (bounded) for the process holding the lock, then take its result."""
+        since = time.time()
+        try:
+            marker.touch()
+        except OSError:
+            pass
+        deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_SECONDS
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    # Taking too long (an LLM repair?): don't wait any longer
+                    try:
+                        marker.unlink()
+                    except OSError:
+                        pass
+                    return fn()
+                time.sleep(SINGLE_FLIGHT_POLL_SECONDS)
+        try:
+            try:
+                if result_file.stat().st_mtime >= since - 1:
+                    result = json.loads(result_file.read_text(encoding="utf-8"))
+                    self.shared += 1
+                    return result
+            except (OSError, ValueError):
+                # No result for us (finished before we waited)
+                pass
+            return fn()
+        finally:
+            for path in (marker, result_file):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _leave_result(result_file: Path, result: Any) -> None:
+        try:
+            # Write to temp file first, then atomic rename
+            with tempfile.NamedTemporaryFile(mode="w", dir=result_file.parent, delete=False,
+                                             suffix=".tmp", encoding="utf-8") as tmp:
+                json.dump(result, tmp)
+            os.replace(tmp.name, result_file)
+        except (OSError, TypeError, ValueError):
+            # Not critical - the waiter computes it itself
+            pass
+
+
+# Global single-flight registry
+_single_flight = None
+
+
+def get_single_flight(**kwargs) -> SingleFlight:
+    """Get or create global single-flight registry (locks in ~/.ecliplint/locks/)."""
+    global _single_flight
+    if _single_flight is None:
+        kwargs.setdefault("lock_dir", Path.home() / ".ecliplint" / "locks")
+        _single_flight = SingleFlight(**kwargs)
+    return _single_flight
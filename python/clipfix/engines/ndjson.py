@@ -0,0 +1,132 @@
+"""
+NDJSON / JSON Lines formatting for eClipLint.
+Every line is validated and normalized on its own, so large log extracts
+can be split into line-aligned chunks and formatted across a process pool,
+then reassembled in the original order.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+# Inputs at or above this size are formatted across a process pool
+PARALLEL_THRESHOLD = 8 << 20  # 8 MiB
+
+# Target size of one chunk handed to a worker
+CHUNK_BYTES = 1 << 20  # 1 MiB
+
+# Lines sampled when detecting NDJSON
+DETECT_SAMPLE_LINES = 20
+
+
+def _normalize_line(line: str) -> str:
+    """Re-serialize one JSON value on a single line."""
+    return json.dumps(json.loads(line), ensure_ascii=False)
+
+
+def looks_like_ndjson(text: str) -> bool:
+    """
+    Check whether text is JSON Lines (two or more JSON values, one per line).
+
+    Only the first DETECT_SAMPLE_LINES non-blank lines are parsed, so
+    detection stays cheap on very large pastes; every line is still
+    validated when formatting.
+    """
+    records = 0
+    start = 0
+    while records < DETECT_SAMPLE_LINES:
+        end = text.find("\n", start)
+        line = (text[start:] if end == -1 else text[start:end]).strip()
+        if line:
+            if line[0] not in "{[":
+                return False
+            try:
+                json.loads(line)
+            except ValueError:
+                return False
+            records += 1
+        if end == -1:
+            break
+        start = end + 1
+    return records >= 2
+
+
+def format_lines(chunk: str, first_line: int = 1) -> str:
+    """
+    Normalize every line of a chunk, dropping blank lines.
+
+    Args:
+        chunk: One or more NDJSON lines
+        first_line: Line number of the chunk's first line (for errors)
+
+    Returns:
+        Normalized lines, each terminated by a newline
+
+    Raises:
+        ValueError: A line is not valid JSON (message includes the line number)
+    """
+    out = []
+    for offset, line in enumerate(chunk.split("\n")):
+        if not line.strip():
+            continue
+        try:
+            out.append(_normalize_line(line))
+        except ValueError as e:
+            raise ValueError(f"line {first_line + offset}: {e}") from None
+    return "\n".join(out) + "\n" if out else ""
+
+
+def _format_chunk(args: Tuple[str, int]) -> str:
+    # Top-level so ProcessPoolExecutor can pickle it
+    return format_lines(*args)
+
+
+def iter_chunks(text: str, chunk_bytes: int = CHUNK_BYTES) -> Iterator[Tuple[str, int]]:
+    """
+    Split text into line-aligned chunks of roughly chunk_bytes characters.
+
+    Yields:
+        (chunk, line number of its first line)
+    """
+    line = 1
+    start = 0
+    n = len(text)
+    while start < n:
+        end = text.find("\n", min(start + chunk_bytes, n))
+        if end == -1:
+            end = n
+        chunk = text[start:end]
+        yield chunk, line
+        line += chunk.count("\n") + 1
+        start = end + 1
+
+
+def format_ndjson(text: str, max_workers: Optional[int] = None) -> str:
+    """
+    Validate and normalize NDJSON, one compact JSON value per line.
+
+    Large inputs are formatted in parallel; output order always matches
+    input order.
+
+    Args:
+        text: NDJSON document
+        max_workers: Process count for large inputs. None = CPU cores
+
+    Returns:
+        Normalized NDJSON (blank lines dropped, trailing newline)
+
+    Raises:
+        ValueError: A line is not valid JSON
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if len(text) < PARALLEL_THRESHOLD or workers < 2:
+        return format_lines(text)
+
+    chunks: List[Tuple[str, int]] = list(iter_chunks(text, CHUNK_BYTES))
+    if len(chunks) < 2:
+        return format_lines(text)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        # map() yields results in submission order
+        return "".join(executor.map(_format_chunk, chunks))
@@ -0,0 +1,228 @@
+"""
+Offline n-gram language classifier for eClipLint.
+A hashed token/bigram naive Bayes model stored as a flat int16 array,
+shipped with the package and loaded in well under a millisecond. It
+answers in microseconds and stands in for llm_classify whenever it is
+confident; the LLM is only consulted below the configured threshold.
+
+The model is trained by training/train_ngram_classifier.py.
+"""
+
+import math
+import re
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+MODEL_FILE = Path(__file__).parent / "models" / "ngram_lang.bin"
+
+_MAGIC = b"ECNG"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHIf")  # magic, version, classes, buckets, scale
+
+# Only this many leading characters are featurized
+SAMPLE_CHARS = 1024
+
+# Used when config/llm.yaml has no classifier.threshold
+DEFAULT_THRESHOLD = 0.8
+
+_TOKEN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+|[^\w\s]")
+_LINE_START = re.compile(r"^[ \t]*([^\w\s]+|[A-Za-z_]\w*)", re.MULTILINE)
+
+
+def features(text: str) -> List[str]:
+    """
+    Extract classifier features from the start of text.
+
+    Tokens, token bigrams (which capture operators such as `=>`, `::`
+    and `->` as punctuation pairs) and the first token of each line.
+    """
+    sample = text[:SAMPLE_CHARS]
+    tokens = _TOKEN.findall(sample)
+    feats = list(tokens)
+    feats.extend(a + " " + b for a, b in zip(tokens, tokens[1:]))
+    feats.extend("^" + t for t in _LINE_START.findall(sample))
+    return feats
+
+
+def bucket(feature: str, n_buckets: int) -> int:
+    """Stable feature hash (crc32; str.__hash__ is salted per process)."""
+    return zlib.crc32(feature.encode("utf-8")) % n_buckets
+
+
+@dataclass
+class NgramPrediction:
+    """Classifier answer."""
+    kind: str
+    confidence: float  # Tempered posterior probability of kind (0-1)
+
+
+class NgramClassifier:
+    """
+    Multinomial naive Bayes over hashed features.
+
+    Weights are log-probabilities scaled by `scale` and stored class-major
+    in one int16 array (classes x buckets).
+    """
+
+    def __init__(self, classes: List[str], priors: array, weights: array, n_buckets: int, scale: float):
+        self.classes = classes
+        self.priors = priors
+        self.weights = weights
+        self.n_buckets = n_buckets
+        self.scale = scale
+        self._row_views: Optional[List[memoryview]] = None
+
+    @classmethod
+    def load(cls, path: Path = MODEL_FILE) -> "NgramClassifier":
+        """
+        Load a model file.
+
+        Raises:
+            ValueError: Not a model file or unsupported version
+            OSError: File cannot be read
+        """
+        data = Path(path).read_bytes()
+        magic, version, n_classes, n_buckets, scale = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"{path}: not an ngram model (version {version})")
+
+        offset = _HEADER.size
+        (names_len,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        classes = data[offset:offset + names_len].decode("utf-8").split("\n")
+        offset += names_len
+
+        priors = array("h")
+        priors.frombytes(data[offset:offset + 2 * n_classes])
+        offset += 2 * n_classes
+        weights = array("h")
+        weights.frombytes(data[offset:offset + 2 * n_classes * n_buckets])
+        if sys.byteorder != "little":
+            priors.byteswap()
+            weights.byteswap()
+        if len(classes) != n_classes or len(weights) != n_classes * n_buckets:
+            raise ValueError(f"{path}: truncated ngram model")
+        return cls(classes, priors, weights, n_buckets, scale)
+
+    def save(self, path: Path = MODEL_FILE) -> None:
+        """Write the model file (little-endian)."""
+        names = "\n".join(self.classes).encode("utf-8")
+        priors, weights = array("h", self.priors), array("h", self.weights)
+        if sys.byteorder != "little":
+            priors.byteswap()
+            weights.byteswap()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(self.classes), self.n_buckets, self.scale))
+            f.write(struct.pack("<H", len(names)))
+            f.write(names)
+            f.write(priors.tobytes())
+            f.write(weights.tobytes())
+
+    @classmethod
+    def train(cls, samples: Iterable[tuple], n_buckets: int = 1 << 14,
+              alpha: float = 0.1, scale: float = 1000.0) -> "NgramClassifier":
+        """
+        Fit a model.
+
+        Args:
+            samples: (kind, text) pairs
+            n_buckets: Hash space size
+            alpha: Additive smoothing
+            scale: Multiplier applied to log-probabilities before rounding
+        """
+        counts: Dict[str, List[float]] = {}
+        for kind, text in samples:
+            row = counts.setdefault(kind, [0.0] * n_buckets)
+            for f in features(text):
+                row[bucket(f, n_buckets)] += 1
+
+        classes = sorted(counts)
+        # Uniform priors: the corpus mix says nothing about what gets pasted
+        priors = array("h", [round(math.log(1 / len(classes)) * scale)] * len(classes))
+        weights = array("h")
+        for c in classes:
+            row = counts[c]
+            denom = sum(row) + alpha * n_buckets
+            weights.extend(max(-32768, round(math.log((n + alpha) / denom) * scale)) for n in row)
+        return cls(classes, priors, weights, n_buckets, scale)
+
+    def _buckets(self, text: str) -> List[int]:
+        n = self.n_buckets
+        crc32 = zlib.crc32
+        return [crc32(f.encode("utf-8")) % n for f in features(text)]
+
+    def _score_buckets(self, buckets: List[int]) -> Dict[str, float]:
+        rows = self._rows()
+        return {
+            kind: (self.priors[ci] + sum(map(rows[ci].__getitem__, buckets))) / self.scale
+            for ci, kind in enumerate(self.classes)
+        }
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Unnormalized log-posterior per class."""
+        return self._score_buckets(self._buckets(text))
+
+    def predict(self, text: str) -> NgramPrediction:
+        """
+        Most likely language and a calibrated confidence.
+
+        Naive Bayes posteriors saturate at 1.0 even when wrong, so the
+        log-odds are tempered by sqrt(feature count) before normalizing.
+        """
+        buckets = self._buckets(text)
+        scores = self._score_buckets(buckets)
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        temperature = max(1.0, math.sqrt(len(buckets)))
+        norm = sum(math.exp((s - top) / temperature) for s in scores.values())
+        return NgramPrediction(best, 1.0 / norm)
+
+    def _rows(self) -> List[memoryview]:
+        # Zero-copy per-class views into the weight array
+        if self._row_views is None:
+            view = memoryview(self.weights)
+            n = self.n_buckets
+            self._row_views = [view[i * n:(i + 1) * n] for i in range(len(self.classes))]
+        return self._row_views
+
+
+# Global classifier instance (False when the model cannot be loaded)
+_classifier = None
+
+
+def get_ngram_classifier() -> Optional[NgramClassifier]:
+    """Get the shipped classifier, or None if its model file is unavailable."""
+    global _classifier
+    if _classifier is None:
+        try:
+            _classifier = NgramClassifier.load()
+        except Exception as e:
+            # Not critical - callers fall back to the LLM
+            print(f"N-gram classifier unavailable: {e}", file=sys.stderr)
+            _classifier = False
+    return _classifier or None
+
+
+def classifier_threshold() -> float:
+    """Confidence required to skip the LLM (classifier.threshold in llm.yaml)."""
+    try:
+        from .config_loader import load_llm_config
+        cfg = load_llm_config().get("classifier") or {}
+        return float(cfg.get("threshold", DEFAULT_THRESHOLD))
+    except Exception:
+        return DEFAULT_THRESHOLD
+
+
+def classify_ngram(text: str) -> Optional[NgramPrediction]:
+    """Classify text with the shipped model (None if unavailable)."""
+    classifier = get_ngram_classifier()
+    if classifier is None:
+        return None
+    return classifier.predict(text)
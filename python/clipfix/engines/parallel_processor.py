@@ -6,7 +6,8 @@ Provides 3-10x speed improvement for multi-segment processing.
 import multiprocessing
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import List, Tuple, Optional, Callable
+from typing import Any, List, Tuple, Optional, Callable
+import threading
 import time
 import sys
 import os
@@ -15,7 +16,8 @@ import os
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 from .segmenter import Segment
-from .detect_and_format import process_text
+from .cache import cache_put_many
+from .detect_and_format import SegmentPlan, format_segment, plan_segments, process_text, warm_formatters
 
 
 @dataclass
@@ -45,6 +47,20 @@ class ParallelProcessor:
                         None = number of CPU cores.
         """
         self.max_workers = max_workers or multiprocessing.cpu_count()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool shared by segment processing and speculative formatting."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="ecliplint",
+                    initializer=_mark_pool_thread
+                )
+            return self._executor
 
     def process_segments_parallel(
         self,
@@ -93,8 +109,10 @@ class ParallelProcessor:
         Process multiple segments in parallel.
 
         Strategy:
+        - Look every segment up in one cache pass; only misses are formatted
+        - Format identical misses once
         - Use ThreadPoolExecutor for formatter subprocess calls (I/O bound)
-        - Group segments by language for potential batching
+        - Write all new cache entries in one batch
         - Maintain original order in results
         """
         start_time = time.time()
@@ -102,33 +120,49 @@ class ParallelProcessor:
         # Group segments by language for better cache utilization
         language_groups = self._group_by_language(segments)
 
-        # Determine worker count based on segment count and CPU cores
-        worker_count = min(self.max_workers, len(segments))
-
-        results = []
-
-        # Use ThreadPoolExecutor for I/O-bound formatter calls
-        with ThreadPoolExecutor(max_workers=worker_count) as executor:
-            # Submit all segments for processing
-            future_to_index = {}
-
-            for i, segment in enumerate(segments):
-                future = executor.submit(
-                    self._process_segment_with_timing,
-                    segment,
-                    allow_llm,
-                    i
+        # Start warm formatter workers (if enabled) while threads spin up
+        warm_formatters(language_groups.keys())
+
+        # Cache hits are done here; misses are grouped by content
+        plans = plan_segments(list(segments))
+        results = [
+            ProcessResult(index=i, success=True, output=plan.output, mode=plan.mode or "formatted", duration=0.0)
+            for i, plan in enumerate(plans) if plan.output is not None
+        ]
+        misses: dict = {}
+        for i, plan in enumerate(plans):
+            if plan.output is None:
+                seg = plan.seg
+                misses.setdefault((seg.prefix, seg.text, seg.suffix, plan.kind, plan.identity), []).append(i)
+
+        # Use the shared ThreadPoolExecutor for I/O-bound formatter calls
+        executor = self.executor
+
+        # Submit one format per distinct miss; cache writes are collected
+        puts: list = []
+        future_to_indices = {}
+
+        for indices in misses.values():
+            future = executor.submit(
+                self._format_with_timing,
+                plans[indices[0]],
+                allow_llm,
+                puts
+            )
+            future_to_indices[future] = indices
+
+        # Collect results as they complete
+        for future in as_completed(future_to_indices):
+            indices = future_to_indices[future]
+            try:
+                success, output, mode, duration = future.result(timeout=10)  # 10 second timeout per segment
+                results.extend(
+                    ProcessResult(index=index, success=success, output=output, mode=mode, duration=duration)
+                    for index in indices
                 )
-                future_to_index[future] = i
-
-            # Collect results as they complete
-            for future in as_completed(future_to_index):
-                try:
-                    result = future.result(timeout=10)  # 10 second timeout per segment
-                    results.append(result)
-                except Exception as e:
-                    # If processing fails, return original segment
-                    index = future_to_index[future]
+            except Exception as e:
+                # If processing fails, return original segment
+                for index in indices:
                     segment = segments[index]
                     results.append(ProcessResult(
                         index=index,
@@ -138,6 +172,9 @@ class ParallelProcessor:
                         duration=0.0
                     ))
 
+        # New entries, written in one transaction
+        cache_put_many(puts)
+
         # Sort results by original index to maintain order
         results.sort(key=lambda r: r.index)
 
@@ -157,30 +194,22 @@ class ParallelProcessor:
         # Return results in original format
         return [(r.success, r.output, r.mode) for r in results]
 
-    def _process_segment_with_timing(
+    def _format_with_timing(
         self,
-        segment: Segment,
+        plan: SegmentPlan,
         allow_llm: bool,
-        index: int
-    ) -> ProcessResult:
-        """Process a segment and track timing."""
+        puts: list
+    ) -> Tuple[bool, str, str, float]:
+        """Format a segment the cache missed, returning (success, output, mode, duration)."""
         start_time = time.time()
 
-        # Reconstruct full text
-        full_text = segment.prefix + segment.text + segment.suffix
+        error = format_segment(plan, allow_llm, puts)
+        if error is not None:
+            success, output, mode = error
+        else:
+            success, output, mode = True, plan.output, plan.mode or "formatted"
 
-        # Process
-        success, output, mode = process_text(full_text, allow_llm=allow_llm)
-
-        duration = time.time() - start_time
-
-        return ProcessResult(
-            index=index,
-            success=success,
-            output=output,
-            mode=mode,
-            duration=duration
-        )
+        return success, output, mode, time.time() - start_time
 
     def _group_by_language(self, segments: List[Segment]) -> dict:
         """
@@ -281,6 +310,77 @@ class ParallelProcessor:
         return results
 
 
+# Set on threads owned by ParallelProcessor.executor
+_pool_thread = threading.local()
+
+
+def _mark_pool_thread() -> None:
+    _pool_thread.active = True
+
+
+def _in_pool_thread() -> bool:
+    return getattr(_pool_thread, "active", False)
+
+
+# Seconds to wait for one speculative candidate
+SPECULATION_TIMEOUT = 10
+
+
+def _attempt_quietly(attempt: Callable[[str], Any], kind: str) -> Any:
+    try:
+        return attempt(kind)
+    except Exception:
+        return None
+
+
+def speculate_format(
+    candidates: List[str],
+    attempt: Callable[[str], Any]
+) -> Optional[Tuple[str, Any]]:
+    """
+    Run attempt(kind) for every candidate kind concurrently.
+
+    Candidates are ranked best first. The best-ranked candidate whose
+    attempt returns a non-None result wins, so a lower-ranked success only
+    counts once every higher-ranked attempt has failed. Attempts that raise
+    count as failures.
+
+    Called from a segment already running on the shared pool, candidates
+    are tried in rank order on the calling thread instead: segment-level
+    parallelism already occupies the pool, and waiting on it from one of
+    its own threads could deadlock.
+
+    Args:
+        candidates: Kinds to try, best first
+        attempt: Formats as one kind; returns None (or raises) on failure
+
+    Returns:
+        (winning kind, attempt result), or None if every attempt failed
+    """
+    if len(candidates) < 2 or _in_pool_thread():
+        for kind in candidates:
+            result = _attempt_quietly(attempt, kind)
+            if result is not None:
+                return kind, result
+        return None
+
+    executor = get_parallel_processor().executor
+    futures = [(kind, executor.submit(_attempt_quietly, attempt, kind)) for kind in candidates]
+    try:
+        for kind, future in futures:
+            try:
+                result = future.result(timeout=SPECULATION_TIMEOUT)
+            except Exception:
+                result = None
+            if result is not None:
+                return kind, result
+        return None
+    finally:
+        # Lower-ranked attempts that have not started are no longer needed
+        for _, future in futures:
+            future.cancel()
+
+
 # Global instance for convenience
 _processor = None
 
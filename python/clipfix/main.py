@@ -2,16 +2,16 @@ from __future__ import annotations
 import argparse
 import difflib
 import os
-import subprocess
 import sys
 import time
+from pathlib import Path
 import pyperclip
 
 from clipfix.engines.history import push_history, undo_history
 from clipfix.engines.detect_and_format import process_text
 from clipfix.engines.segmenter import regex_segment
-from clipfix.engines.detect_and_format import _detect_kind
-from clipfix.engines.cache import cache_stats, clear_cache
+from clipfix.engines.language_detector import detect_language
+from clipfix.engines.cache import cache_gc, cache_stats, clear_cache
 
 
 def print_diff(before: str, after: str):
@@ -60,7 +60,7 @@ def detect_language_for_comments(text: str) -> str:
     segs = regex_segment(text)
     if segs:
         seg = segs[0]
-        detected = seg.inner_kind or _detect_kind(seg.text)
+        detected = seg.inner_kind or detect_language(seg.text).kind
         return detected.lower()
 
     return "python"  # Default fallback
@@ -92,12 +92,13 @@ def format_error_comment(error_msg: str, original_code: str, language: str = "py
         "rust": "//",
         "yaml": "#",
         "json": "",  # JSON doesn't support comments
+        "ndjson": "",
     }
 
     comment = comment_styles.get(language, "#")
 
     # Build error message
-    if language == "json":
+    if language in ("json", "ndjson"):
         # Special case: JSON (no comments allowed)
         lines = [
             "/* ❌ eClipLint: Repair failed */",
@@ -171,31 +172,57 @@ def main(argv=None):
     ap.add_argument("--max-history", type=int, default=25, help="Maximum undo history depth")
     ap.add_argument("--cache-stats", action="store_true", help="Show cache statistics")
     ap.add_argument("--clear-cache", action="store_true", help="Clear formatter cache")
+    ap.add_argument("--cache-gc", action="store_true", help="Remove expired cache entries now")
+    ap.add_argument("--cache-export", type=str, metavar="FILE", help="Write cached results to a shareable bundle")
+    ap.add_argument("--cache-import", type=str, metavar="FILE", help="Merge a cache bundle from another machine")
     ap.add_argument("--parallel", action="store_true", help="Enable parallel processing (experimental)")
     ap.add_argument("--benchmark", action="store_true", help="Show performance timing")
-    ap.add_argument("--lang", type=str, help="Force specific language (python, javascript, bash, sql, rust, json, yaml)")
+    ap.add_argument("--lang", type=str, help="Force specific language (python, javascript, bash, sql, rust, json, ndjson, yaml)")
     ap.add_argument("--health", action="store_true", help="Check formatter installation status")
+    ap.add_argument("--workers", action="store_true", help="Keep warm formatter worker processes (prettier, black, sqlfluff)")
     args = ap.parse_args(argv)
 
+    if args.workers:
+        os.environ["ECLIPLINT_WORKERS"] = "1"
+
     # Handle cache management commands
     if args.cache_stats:
         from clipfix.engines.cache import cache_detailed_stats
         stats = cache_detailed_stats()
         print("📊 eClipLint Cache Statistics:")
         print(f"  Entries: {stats['entries']}")
-        print(f"  Size: {stats['size_mb']:.2f} MB")
-        print(f"  Memory entries: {stats['memory_entries']}")
-        print(f"  Total hits: {stats['total_hits']}")
+        print(f"  Size: {stats['size_mb']:.2f} MB ({stats['codec']}, "
+              f"{stats['compression_ratio']:.1f}x from {stats['raw_size_mb']:.2f} MB)")
+        print(f"  Capacity: ~{stats['capacity_entries']} entries at the current average size")
+        print(f"  Memory entries: {stats['memory_entries']} ({stats['memory_mb']:.2f} MB, "
+              f"{stats['memory_evictions']} evicted)")
+        print(f"  Lookups: {stats['lookups']} ({stats['hits']} hits, {stats['misses']} misses)")
         print(f"  Hit rate: {stats['hit_rate']:.1%}")
-        print(f"  Time saved: ~{stats['time_saved_seconds']:.0f}s")
-        print(f"  TTL: {stats['ttl_hours']:.1f} hours")
+        print(f"  Time saved: {stats['time_saved_seconds']:.1f}s (measured formatter time)")
+        if stats['lookup_p50_ms'] is not None:
+            print(f"  Lookup latency: p50 < {stats['lookup_p50_ms']:.3f} ms, p99 < {stats['lookup_p99_ms']:.3f} ms")
+        print(f"  Evictions: {stats['evictions']} ({stats['eviction_rate']:.1%} of lookups), "
+              f"expirations: {stats['expirations']}")
+        print(f"  Average entry: {stats['avg_entry_kb']:.1f} KB")
+        if stats['remote'] or stats['remote_hits'] or stats['remote_errors']:
+            print(f"  Remote: {stats['remote'] or 'not configured'} ({stats['remote_hits']} hits, "
+                  f"{stats['remote_errors']} timeouts/errors)")
+        if stats['ttl_hours'] is None:
+            print("  TTL: none (entries are kept until evicted)")
+        else:
+            print(f"  TTL: {stats['ttl_hours']:.1f} hours")
         print(f"  Max entries: {stats['max_entries']}")
         print(f"  Max size: {stats['max_size_mb']} MB")
 
-        if stats['top_languages']:
-            print("\n  Top cached languages:")
-            for lang, count in stats['top_languages'][:5]:
-                print(f"    {lang}: {count} times")
+        for title, rows in (("language", stats['languages']), ("formatter", stats['formatters'])):
+            if not rows:
+                continue
+            print(f"\n  By {title}:")
+            for name, row in list(rows.items())[:5]:
+                lookups = row['hits'] + row['misses']
+                rate = row['hits'] / lookups if lookups else 0.0
+                print(f"    {name:12} {row['hits']:>6} hits {row['misses']:>6} misses "
+                      f"{rate:>6.1%}  {row['saved_seconds']:>7.1f}s saved  {row['evictions']:>5} evicted")
         return 0
 
     if args.clear_cache:
@@ -203,39 +230,46 @@ def main(argv=None):
         print("✓ Cache cleared")
         return 0
 
+    if args.cache_gc:
+        removed = cache_gc()
+        print(f"✓ Removed {removed} expired cache entries")
+        return 0
+
+    if args.cache_export:
+        from clipfix.engines.cache_bundle import export_cache
+        count = export_cache(Path(args.cache_export))
+        print(f"✓ Exported {count} cache entries to {args.cache_export}")
+        return 0
+
+    if args.cache_import:
+        from clipfix.engines.cache_bundle import import_cache
+        try:
+            imported, incompatible = import_cache(Path(args.cache_import))
+        except (OSError, ValueError) as e:
+            print(f"✖ Cache import failed: {e}", file=sys.stderr)
+            return 1
+        print(f"✓ Imported {imported} cache entries from {args.cache_import}")
+        if incompatible:
+            print(f"  Skipped {incompatible} made by formatter versions not installed here")
+        return 0
+
     # Handle health check
     if args.health:
-        from clipfix.engines.detect_and_format import _has_cmd
+        from clipfix.engines.formatter_registry import KNOWN_FORMATTERS, get_formatter_registry
         print("🏥 eClipLint Formatter Health Check:\n")
 
-        formatters = [
-            ("black", "Python", "pip install black"),
-            ("ruff", "Python", "pip install ruff"),
-            ("prettier", "JavaScript/TypeScript", "npm install -g prettier"),
-            ("shfmt", "Bash", "brew install shfmt"),
-            ("rustfmt", "Rust", "rustup component add rustfmt"),
-            ("sqlfluff", "SQL", "pip install sqlfluff"),
-        ]
-
+        registry = get_formatter_registry()
         installed = []
         missing = []
 
-        for cmd, lang, install_cmd in formatters:
-            if _has_cmd(cmd):
-                # Try to get version
-                try:
-                    result = subprocess.run(
-                        ["bash", "-lc", f"{cmd} --version"],
-                        capture_output=True,
-                        text=True,
-                        timeout=2
-                    )
-                    version = result.stdout.strip().split("\n")[0][:50]
-                    print(f"  ✓ {cmd:12} ({lang:20}) {version}")
-                    installed.append(cmd)
-                except Exception:
+        for cmd, lang, install_cmd in KNOWN_FORMATTERS:
+            if registry.available(cmd):
+                version = registry.version(cmd)
+                if version:
+                    print(f"  ✓ {cmd:12} ({lang:20}) {version[:50]}")
+                else:
                     print(f"  ✓ {cmd:12} ({lang:20}) installed")
-                    installed.append(cmd)
+                installed.append(cmd)
             else:
                 print(f"  ✗ {cmd:12} ({lang:20}) not found")
                 print(f"     Install: {install_cmd}")
@@ -0,0 +1,65 @@
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_backends import (
+    CacheEntry,
+    FileCacheBackend,
+    SQLiteCacheBackend,
+    migrate_file_cache,
+    open_backend,
+)
+
+
+def _entry(key, output="x = 1\n", hits=0, ts=1000.0):
+    return CacheEntry(key, "python", "black", True, output, "formatted", ts, hits)
+
+
+def test_sqlite_totals_follow_upserts_and_deletes(tmp_path):
+    db = SQLiteCacheBackend(tmp_path / "cache.db")
+    db.store(_entry("a", "12345"))
+    db.store(_entry("a", "123"))  # replace, not a second entry
+    db.store(_entry("b", "1"))
+    assert (db.count(), db.raw_size()) == (2, 4)
+    assert db.total_size() == 4 + 2 * 3  # short payloads: stored raw behind a 3-byte header
+
+    db.delete("a")
+    assert (db.count(), db.raw_size(), db.total_size()) == (1, 1, 4)
+    assert db.load("b").output == "1"
+
+
+def test_access_metadata_orders_eviction_candidates(tmp_path):
+    for db in (SQLiteCacheBackend(tmp_path / "cache.db"), FileCacheBackend(tmp_path / "files")):
+        for i in range(4):
+            db.store(_entry(f"k{i}", "x" * 100))
+        db.touch_many({"k0": (5, 2e9), "k1": (1, 1.5e9), "k2": (0, 1.6e9), "k3": (0, 1.7e9)})
+        db.content_record("h1", "k1")
+
+        assert [c[0] for c in db.coldest(3)] == ["k1", "k2", "k3"]
+        assert db.coldest(1)[0][2] == 1
+        assert db.load("k0").hit_count == 5  # persisted without a payload rewrite
+
+        db.delete_many(["k1", "k2"])
+        assert db.content_lookup("h1") is None  # dropped with its entry
+        assert db.count() == 2
+
+
+def test_file_cache_migrates_once_into_sqlite(tmp_path):
+    files = FileCacheBackend(tmp_path)
+    files.store(_entry("a"))
+    files.content_record("content-a", "a")
+
+    backend = open_backend(tmp_path, "sqlite")
+    assert backend.load("a").output == "x = 1\n"
+    assert backend.content_lookup("content-a") == "a"
+    assert not list(tmp_path.glob("*.json"))
+    assert migrate_file_cache(tmp_path, backend) == 0
+
+
+def test_formatter_cache_works_on_both_backends(tmp_path):
+    for name in ("sqlite", "file"):
+        cache = FormatterCache(cache_dir=tmp_path / name, backend=name, max_entries=2)
+        for i in range(3):
+            cache.put(f"x={i}", "python", "black", True, f"x = {i}\n", "formatted")
+        assert cache.stats()["entries"] == 2
+
+        reopened = FormatterCache(cache_dir=tmp_path / name, backend=name)
+        assert reopened.stats()["entries"] == 2
+        assert reopened.get("x=1", "python") or reopened.get("x=2", "python")
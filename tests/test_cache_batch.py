@@ -0,0 +1,69 @@
+"""Tests for the batched cache API and its use by the parallel path."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.segmenter import Segment
+
+
+def test_get_many_and_put_many_round_trip(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, memory_entries=0)
+    cache.put_many([
+        ("x=1", "python", "black", True, "x = 1\n", "formatted", "black 24", 0.0),
+        ("y=2", "python", "black", True, "y = 2\n", "formatted", "black 24", 0.0),
+        ("def f(:", "python", "black 24", False, "invalid syntax", "failed", None, 0.0),
+    ])
+
+    results = cache.get_many([
+        ("y=2", "python", "black 24"),
+        ("z=3", "python", "black 24"),
+        ("x = 1\n", "python", "black 24"),
+        ("x=1", "python", "black 24"),
+    ])
+    assert results == [
+        (True, "y = 2\n", "formatted:cached"),
+        None,
+        (True, "x = 1\n", "already formatted:cached"),
+        (True, "x = 1\n", "formatted:cached"),
+    ]
+    assert cache.get_failure("def f(:", "python", "black 24") == "invalid syntax"
+
+
+def test_put_many_writes_once_and_checks_limits_once(tmp_path, monkeypatch):
+    cache = FormatterCache(cache_dir=tmp_path, max_entries=3, policy="lru")
+    monkeypatch.setattr(cache.backend, "store", lambda entry: (_ for _ in ()).throw(AssertionError("per-entry write")))
+
+    cache.put_many([(f"v={i}", "python", "black", True, f"v = {i}\n", "formatted", None, 0.0) for i in range(5)])
+
+    assert cache.backend.count() == 3
+
+
+def test_parallel_segments_share_lookups_and_formats(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines import detect_and_format
+    from clipfix.engines.parallel_processor import ParallelProcessor
+
+    monkeypatch.setattr(cache_module, "_cache", FormatterCache(cache_dir=tmp_path))
+    calls = []
+    format_code = detect_and_format._format_code
+
+    def counting_format(kind, code):
+        calls.append(code)
+        return format_code(kind, code)
+
+    monkeypatch.setattr(detect_and_format, "_format_code", counting_format)
+
+    segments = [Segment(kind="markdown_fence", text='{"a":1}', prefix="```json\n", suffix="\n```", inner_kind="json")] * 3
+    segments.append(Segment(kind="markdown_fence", text='{"b":2}', prefix="```json\n", suffix="\n```", inner_kind="json"))
+    processor = ParallelProcessor(max_workers=2)
+
+    first = processor.process_segments_parallel(segments)
+    assert [ok for ok, _, _ in first] == [True] * 4
+    assert sorted(calls) == ['{"a":1}', '{"b":2}']
+
+    second = processor.process_segments_parallel(segments)
+    assert [out for _, out, _ in second] == [out for _, out, _ in first]
+    assert len(calls) == 2
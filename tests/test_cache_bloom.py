@@ -0,0 +1,90 @@
+"""Tests for the memory-mapped Bloom filter in front of cache storage."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_bloom import BloomFilter
+
+
+def test_filter_persists_and_rebuilds(tmp_path):
+    path = tmp_path / "keys.bloom"
+    bloom = BloomFilter(path, capacity=100)
+    assert bloom.created
+    for i in range(50):
+        bloom.add(f"k{i}")
+    assert all(f"k{i}" in bloom for i in range(50))
+    false_positives = sum(f"other{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+    # Another opener sees the same bits
+    again = BloomFilter(path, capacity=100)
+    assert not again.created and "k7" in again and again.inserted == 50
+
+    again.rebuild(["k1"])
+    assert "k1" in again and "k7" not in again and not again.saturated
+
+    # Different geometry: replaced by an empty filter
+    resized = BloomFilter(path, capacity=1000)
+    assert resized.created and "k1" not in resized
+
+
+def test_misses_do_not_touch_storage(tmp_path, monkeypatch):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+
+    def fail(*args):
+        raise AssertionError("storage queried on a definite miss")
+
+    monkeypatch.setattr(cache.backend, "load", fail)
+    monkeypatch.setattr(cache.backend, "content_lookup", fail)
+    assert cache.get("y=2", "python") is None
+    assert cache.get_by_content("y=2") is None
+
+
+def test_filter_built_from_existing_storage(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+    (tmp_path / "keys.bloom").unlink()
+
+    # Not rebuilt at startup: lookups go to storage meanwhile
+    reopened = FormatterCache(cache_dir=tmp_path)
+    assert reopened.bloom is None
+    assert not (tmp_path / "keys.bloom").exists()
+    assert reopened.get_by_content("x=1") is not None
+
+    # Built from storage on the next write
+    reopened.put("y=2", "python", "black", True, "y = 2\n", "formatted")
+    assert reopened.bloom.created
+    assert reopened.get_by_content("x=1") is not None
+    assert reopened.get("y=2", "python") is not None
+
+
+def test_saturated_filter_is_rebuilt(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    monkeypatch.setattr(cache_module, "BLOOM_KEYS_PER_ENTRY", 4)
+    cache = FormatterCache(cache_dir=tmp_path, max_entries=4, policy="lru")
+    for i in range(20):
+        cache.put(f"x={i}", "python", "black", True, f"x = {i}\n", "formatted")
+
+    # Rebuilt from the 4 live entries and their content keys (input and
+    # output), not the 60 keys ever added
+    assert cache.bloom.inserted <= cache.bloom.capacity
+    assert cache.get("x=19", "python") is not None
+
+
+def test_filter_rebuilt_by_another_process_is_remapped(tmp_path):
+    path = tmp_path / "keys.bloom"
+    mine = BloomFilter(path, capacity=100)
+    other = BloomFilter(path, capacity=100)
+
+    # The other process rebuilds: renames a new file over the mapped one
+    other.rebuild(["k1"])
+    other.add("k2")
+    assert "k1" in mine and "k2" in mine
+
+    # Bits go to the current file, not the unlinked one
+    mine.add("k3")
+    assert "k3" in other and "k3" in BloomFilter(path, capacity=100)
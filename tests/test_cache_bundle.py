@@ -0,0 +1,53 @@
+"""Tests for shareable cache bundles."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_bundle import identity_translator
+
+HERE = "ruff 0.4.1 /opt/bin/ruff 111 abc"
+THERE = "ruff 0.4.1 /usr/bin/ruff 222 abc"
+PORTABLE = "ruff 0.4.1 abc"
+
+
+def test_bundle_moves_results_between_machines(tmp_path):
+    source = FormatterCache(cache_dir=tmp_path / "a")
+    source.put("x=1", "python", "ruff", True, "x = 1\n", "formatted", HERE, 0.5)
+    source.put("y=1", "python", "ruff", True, "y = 1\n", "formatted", "ruff 0.3.0 /opt/bin/ruff 1 abc")
+    source.put("def f(:", "python", HERE, False, "invalid syntax", "failed")
+    bundle = tmp_path / "warm.eclb"
+    # Entries from the old ruff have no portable identity and stay behind
+    assert source.export_bundle(bundle, identity_translator({HERE: PORTABLE})) == 1
+
+    target = FormatterCache(cache_dir=tmp_path / "b")
+    assert target.import_bundle(bundle, identity_translator({PORTABLE: THERE})) == (1, 0)
+    assert target.get("x=1", "python", THERE) == (True, "x = 1\n", "formatted:cached")
+    assert target.get("x = 1\n", "python", THERE) == (True, "x = 1\n", "already formatted:cached")
+    assert target.get_by_content("x=1", lambda language: THERE) == ("python", (True, "x = 1\n", "formatted:cached"))
+    assert target.backend.entries().__next__().duration == pytest.approx(0.5)
+
+    # Merging again adds nothing
+    assert target.import_bundle(bundle, identity_translator({PORTABLE: THERE})) == (0, 0)
+
+
+def test_incompatible_entries_are_skipped(tmp_path):
+    source = FormatterCache(cache_dir=tmp_path / "a")
+    source.put("x=1", "python", "ruff", True, "x = 1\n", "formatted", HERE)
+    bundle = tmp_path / "warm.eclb"
+    source.export_bundle(bundle, identity_translator({HERE: PORTABLE}))
+
+    target = FormatterCache(cache_dir=tmp_path / "b")
+    assert target.import_bundle(bundle, identity_translator({"ruff 0.5.0 abc": THERE})) == (0, 1)
+    assert target.get("x=1", "python", THERE) is None
+
+
+def test_import_rejects_other_files(tmp_path):
+    bogus = tmp_path / "bogus.eclb"
+    bogus.write_bytes(b"not a bundle at all")
+    with pytest.raises(ValueError):
+        FormatterCache(cache_dir=tmp_path / "c").import_bundle(bogus, identity_translator({}))
@@ -0,0 +1,78 @@
+"""Tests for compressed cache payloads."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines import cache_codec
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_backends import SQLiteCacheBackend
+from clipfix.engines.cache_codec import PayloadCodec
+
+CODE = "def handler(event, context):\n    return {'statusCode': 200, 'body': event['body']}\n"
+SAMPLES = [CODE.replace("handler", f"handler_{i}") for i in range(50)]
+
+CODECS = [cache_codec.ZLIB]
+if cache_codec._zstd():
+    CODECS.append(cache_codec.ZSTD)
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_roundtrip_with_and_without_dictionary(tmp_path, codec):
+    c = PayloadCodec(tmp_path)
+    c.codec = codec
+    plain = c.encode(CODE * 3)
+    assert c.decode(plain) == CODE * 3
+    assert len(plain) < len(CODE * 3)
+    assert c.decode(c.encode("x = 1")) == "x = 1"  # short: stored raw
+
+    dict_id = c.train(SAMPLES)
+    assert dict_id == 1
+    packed = c.encode(CODE)
+    assert c.decode(packed) == CODE
+    assert c.decode(plain) == CODE * 3  # older payloads still decode
+
+    # A fresh codec finds the saved dictionary
+    again = PayloadCodec(tmp_path)
+    again.codec = codec
+    assert again.decode(packed) == CODE
+    assert not PayloadCodec(tmp_path / "elsewhere").dictionaries
+    with pytest.raises(ValueError):
+        PayloadCodec(tmp_path / "elsewhere").decode(packed)
+
+
+def test_version_1_database_is_upgraded(tmp_path):
+    db_path = tmp_path / "cache.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE entries (key TEXT PRIMARY KEY, language TEXT NOT NULL, formatter TEXT NOT NULL,
+            success INTEGER NOT NULL, output TEXT NOT NULL, mode TEXT NOT NULL, timestamp REAL NOT NULL,
+            last_access REAL NOT NULL, hit_count INTEGER NOT NULL DEFAULT 0, size INTEGER NOT NULL);
+        CREATE TABLE totals (id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL);
+        INSERT INTO totals VALUES (0, 1, 6);
+        INSERT INTO entries VALUES ('k', 'python', 'black', 1, 'x = 1\n', 'formatted', 1.0, 1.0, 0, 6);
+    """)
+    conn.commit()
+    conn.close()
+
+    db = SQLiteCacheBackend(db_path)
+    assert db.load("k").output == "x = 1\n"
+    assert (db.count(), db.total_size(), db.raw_size()) == (1, 6, 6)
+    db.delete("k")
+    assert (db.count(), db.total_size(), db.raw_size()) == (0, 0, 0)
+
+
+def test_stats_report_ratio_and_capacity(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, max_entries=100_000, max_size_mb=1)
+    for sample in SAMPLES:
+        cache.put(sample, "python", "black", True, sample * 4, "formatted")
+    stats = cache.stats()
+    assert stats["compression_ratio"] > 2
+    assert stats["capacity_entries"] > 1024 * 1024 // len(SAMPLES[0] * 4)
+
+    cache.memory_cache.clear()
+    assert cache.get(SAMPLES[7], "python")[1] == SAMPLES[7] * 4
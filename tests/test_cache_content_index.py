@@ -0,0 +1,65 @@
+"""Tests for the content-only index (repeated pastes skip detection)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+
+
+def test_content_index_returns_last_resolved_language(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+    assert cache.get_by_content("x=1") == ("python", (True, "x = 1\n", "formatted:cached"))
+    assert cache.get_by_content("y=2") is None
+
+    # Survives a restart, and the index file is not counted as an entry
+    reloaded = FormatterCache(cache_dir=tmp_path)
+    assert reloaded.get_by_content("x=1")[0] == "python"
+    assert reloaded.stats()["entries"] == 1
+
+
+def test_content_index_drops_evicted_entries(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, max_entries=1, policy="lru")
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+    cache.put("y=2", "python", "black", True, "y = 2\n", "formatted")
+
+    assert cache.get_by_content("x=1") is None
+    assert cache.get_by_content("y=2") == ("python", (True, "y = 2\n", "formatted:cached"))
+
+
+def test_content_index_is_emptied_by_clear(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+    cache.clear()
+    assert cache.get_by_content("x=1") is None
+
+
+def test_repeated_paste_skips_detection_and_classification(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines import detect_and_format
+    from clipfix.engines.detect_and_format import process_text
+
+    monkeypatch.setattr(cache_module, "_cache", FormatterCache(cache_dir=tmp_path))
+    calls = []
+    detect = detect_and_format.detect_language
+
+    def spy_detect(text):
+        calls.append("detect_language")
+        return detect(text)
+
+    def spy_classify(text):
+        calls.append("llm_classify")
+        return {"kind": "unknown"}
+
+    monkeypatch.setattr(detect_and_format, "detect_language", spy_detect)
+    monkeypatch.setattr(detect_and_format, "llm_classify", spy_classify)
+
+    ok, formatted, mode = process_text('{"a":1,"b":[1,2]}', allow_llm=True)
+    assert ok and mode == "formatted"
+    assert "detect_language" in calls
+
+    calls.clear()
+    assert process_text('{"a":1,"b":[1,2]}', allow_llm=True) == (True, formatted, "formatted:cached")
+    assert calls == []
@@ -0,0 +1,51 @@
+"""Tests for recognising already-formatted code (formatter fixed points)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+
+
+def test_formatted_output_hits_by_content_and_language(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+
+    assert cache.get_by_content("x = 1\n") == ("python", (True, "x = 1\n", "already formatted:cached"))
+    assert cache.get("x = 1\n", "python") == (True, "x = 1\n", "already formatted:cached")
+    assert cache.get("x = 1\n", "javascript") is None
+    assert cache.stats()["fixed_point_hits"] == 2
+
+    # The original input still maps to its own entry
+    assert cache.get_by_content("x=1") == ("python", (True, "x = 1\n", "formatted:cached"))
+
+
+def test_fixed_point_goes_with_its_entry(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, max_entries=1, policy="lru")
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+    cache.put("y=2", "python", "black", True, "y = 2\n", "formatted")
+
+    assert cache.get_by_content("x = 1\n") is None
+    assert cache.get_by_content("y = 2\n") is not None
+
+
+def test_unchanged_input_is_not_double_indexed(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x = 1\n", "python", "black", True, "x = 1\n", "formatted")
+
+    assert len(cache.backend.content_items()) == 1
+    assert cache.get_by_content("x = 1\n") == ("python", (True, "x = 1\n", "formatted:cached"))
+
+
+def test_reformatting_formatted_json_is_a_cache_hit(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines.detect_and_format import process_text
+
+    monkeypatch.setattr(cache_module, "_cache", FormatterCache(cache_dir=tmp_path))
+    ok, formatted, mode = process_text('{"a":1,"b":[1,2]}', allow_llm=False)
+    assert ok and mode == "formatted"
+
+    ok, again, mode = process_text(formatted, allow_llm=False)
+    assert ok and again == formatted
+    assert mode == "already formatted:cached"
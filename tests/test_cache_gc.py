@@ -0,0 +1,68 @@
+"""Tests for lazy expiry and the rate-limited expiry sweep."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines import cache as cache_module
+from clipfix.engines.cache import FormatterCache
+
+
+def _age_all(cache, seconds):
+    """Backdate every stored entry."""
+    for entry in list(cache.backend.entries()):
+        entry.timestamp -= seconds
+        cache.backend.store(entry)
+    cache.memory_cache.clear()
+
+
+def test_startup_does_not_sweep(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, ttl_seconds=60)
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+    _age_all(cache, 120)
+
+    reopened = FormatterCache(cache_dir=tmp_path, ttl_seconds=60)
+    assert reopened.stats()["entries"] == 1
+
+    # Expired on read, and removed then
+    assert reopened.get("x=1", "python") is None
+    assert reopened.stats()["entries"] == 0
+
+
+def test_sweep_is_rate_limited_and_batched(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "GC_BATCH", 2)
+    cache = FormatterCache(cache_dir=tmp_path, ttl_seconds=60)
+    for i in range(5):
+        cache.put(f"x={i}", "python", "black", True, f"x = {i}\n", "formatted")
+    # The first put swept an empty cache and marked the sweep done
+    assert cache.gc_marker.exists()
+    _age_all(cache, 120)
+
+    # Sweep not due yet
+    cache.put("y=1", "python", "black", True, "y = 1\n", "formatted")
+    assert cache.stats()["entries"] == 6
+
+    # Due: one batch per write until a short batch completes the sweep
+    old = time.time() - cache_module.GC_INTERVAL_SECONDS - 1
+    os.utime(cache.gc_marker, (old, old))
+    cache.put("y=2", "python", "black", True, "y = 2\n", "formatted")
+    assert cache.stats()["entries"] == 5
+    cache.put("y=3", "python", "black", True, "y = 3\n", "formatted")
+    cache.put("y=4", "python", "black", True, "y = 4\n", "formatted")
+    assert cache.stats()["entries"] == 4
+    assert time.time() - cache.gc_marker.stat().st_mtime < 60
+
+
+def test_gc_removes_everything_expired(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, ttl_seconds=60)
+    for i in range(3):
+        cache.put(f"x={i}", "python", "black", True, f"x = {i}\n", "formatted")
+    _age_all(cache, 120)
+    cache.put("y=1", "python", "black", True, "y = 1\n", "formatted")
+
+    assert cache.gc() == 3
+    assert cache.stats()["entries"] == 1
+    assert cache.get("y=1", "python") is not None
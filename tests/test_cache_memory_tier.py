@@ -0,0 +1,65 @@
+"""Tests for the bounded in-memory LRU tier of the formatter cache."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache, MemoryLRU, _entry_size
+from clipfix.engines.cache_backends import CacheEntry
+
+
+def _entry(key, output="x = 1\n"):
+    return CacheEntry(key, "python", "black", True, output, "formatted", 0.0)
+
+
+def test_lru_entry_budget_evicts_least_recently_used():
+    lru = MemoryLRU(max_entries=2, max_bytes=1 << 20)
+    lru.put("a", _entry("a"))
+    lru.put("b", _entry("b"))
+    assert lru.get("a") is not None  # a is now most recent
+    lru.put("c", _entry("c"))
+
+    assert "b" not in lru
+    assert "a" in lru and "c" in lru
+    assert lru.evictions == 1
+    assert (lru.hits, lru.misses) == (1, 0)
+
+
+def test_lru_byte_budget():
+    big = _entry("big", "x" * 10_000)
+    lru = MemoryLRU(max_entries=100, max_bytes=_entry_size(big) + _entry_size(_entry("s")))
+    lru.put("s", _entry("s"))
+    lru.put("big", big)
+    assert len(lru) == 2
+    lru.put("t", _entry("t"))
+    assert "s" not in lru and "big" in lru and "t" in lru
+    assert lru.bytes <= lru.max_bytes
+
+    # Larger than the whole budget: not held at all
+    lru.put("huge", _entry("huge", "x" * 100_000))
+    assert "huge" not in lru
+    assert lru.pop("t") is not None and lru.pop("t") is None
+    assert lru.bytes == _entry_size(big)
+
+
+def test_cache_promotes_disk_hits(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, memory_entries=2)
+    for i in range(5):
+        cache.put(f"x={i}", "python", "black", True, f"x = {i}\n", "formatted")
+    assert cache.stats()["memory_entries"] == 2
+    assert cache.stats()["entries"] == 5
+
+    # Evicted from memory, still on disk; a hit promotes it again
+    assert cache.get("x=0", "python") is not None
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2
+    assert stats["memory_misses"] == 1
+    assert cache.get("x=0", "python") is not None
+    assert cache.stats()["memory_hits"] == 1
+
+    # A fresh instance starts empty and fills on demand
+    reopened = FormatterCache(cache_dir=tmp_path, memory_entries=2)
+    assert reopened.stats()["memory_entries"] == 0
+    assert reopened.get_by_content("x=3") is not None
+    assert reopened.stats()["memory_entries"] == 1
@@ -0,0 +1,86 @@
+"""Tests for caching deterministic formatter failures."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+
+
+def test_failure_is_cached_per_formatter_identity(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("def f(:", "python", "ruff 0.4.1 /usr/bin/ruff 1.0", False, "invalid syntax", "failed")
+
+    assert cache.get_failure("def f(:", "python", "ruff 0.4.1 /usr/bin/ruff 1.0") == "invalid syntax"
+    # Upgraded formatter, or a normal lookup: not a failure
+    assert cache.get_failure("def f(:", "python", "ruff 0.5.0 /usr/bin/ruff 2.0") is None
+    assert cache.get("def f(:", "python") is None
+    assert cache.get_by_content("def f(:") is None
+    assert cache.stats()["failure_hits"] == 1
+
+
+def test_failures_expire_on_their_own_ttl(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, failure_ttl_seconds=-1)
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+    cache.put("def f(:", "python", "black", False, "invalid syntax", "failed")
+
+    assert cache.get_failure("def f(:", "python", "black") is None
+    assert cache.get("x=1", "python") == (True, "x = 1\n", "formatted:cached")
+
+
+def test_repeated_failing_paste_skips_the_formatter(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines import detect_and_format
+
+    monkeypatch.setattr(cache_module, "_cache", FormatterCache(cache_dir=tmp_path))
+    calls = []
+    format_code = detect_and_format._format_code
+
+    def counting_format(kind, code):
+        calls.append(kind)
+        return format_code(kind, code)
+
+    monkeypatch.setattr(detect_and_format, "_format_code", counting_format)
+
+    first = detect_and_format.process_text('{"a": 1,', allow_llm=False, lang_override="json")
+    second = detect_and_format.process_text('{"a": 1,', allow_llm=False, lang_override="json")
+
+    assert first[0] is False and first == second
+    assert calls == ["json"]
+
+
+def test_repeated_ambiguous_failure_skips_speculation(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines import detect_and_format
+
+    cache = FormatterCache(cache_dir=tmp_path)
+    monkeypatch.setattr(cache_module, "_cache", cache)
+    calls = []
+
+    def failing_format(kind, code):
+        calls.append(kind)
+        raise RuntimeError(f"not {kind}")
+
+    monkeypatch.setattr(detect_and_format, "_format_code", failing_format)
+
+    # Ambiguous (sql or python): every candidate's rejection is cached
+    first = detect_and_format.process_text("foo(bar)", allow_llm=False)
+    assert sorted(calls) == ["python", "sql"]
+    assert cache.get_failure("foo(bar)", "python", detect_and_format.formatter_identity("python")) == "not python"
+
+    calls.clear()
+    assert detect_and_format.process_text("foo(bar)", allow_llm=False) == first
+    assert calls == []
+
+
+def test_gc_sweeps_expired_failures_without_a_ttl(tmp_path):
+    for backend in ("sqlite", "file"):
+        cache = FormatterCache(cache_dir=tmp_path / backend, backend=backend, failure_ttl_seconds=-1)
+        cache.put("x=1", "python", "black", True, "x = 1\n", "formatted")
+        for i in range(5):
+            cache.put(f"def f{i}(:", "python", "black", False, "invalid syntax", "failed")
+
+        assert cache.gc() == 5, backend
+        assert cache.backend.count() == 1
+        assert cache.get("x=1", "python") == (True, "x = 1\n", "formatted:cached")
@@ -0,0 +1,90 @@
+"""Tests for cache admission/eviction policies and access write-back."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines import cache as cache_module
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_policy import FrequencySketch, LFUPolicy, TinyLFUPolicy
+
+
+def _put(cache, i):
+    cache.put(f"x={i}", "python", "black", True, f"x = {i}\n", "formatted")
+
+
+def test_sketch_counts_and_ages():
+    sketch = FrequencySketch(width=64, sample_size=100)
+    for _ in range(10):
+        sketch.increment("hot")
+    sketch.increment("cold")
+    assert sketch.estimate("hot") >= 10
+    assert sketch.estimate("cold") >= 1
+    assert sketch.estimate("never") <= sketch.estimate("cold")
+
+    for i in range(100):
+        sketch.increment(f"k{i}")
+    assert sketch.estimate("hot") < 10  # halved once sample_size was reached
+
+
+def test_policies_order_candidates():
+    candidates = [("a", 10, 5), ("b", 10, 0), ("c", 10, 1)]
+    assert [c[0] for c in LFUPolicy().order(candidates)] == ["b", "c", "a"]
+
+    tiny = TinyLFUPolicy(capacity=16)
+    for _ in range(3):
+        tiny.record("a")
+    tiny.record("c")
+    assert [c[0] for c in tiny.order(candidates)] == ["b", "c", "a"]
+    assert not tiny.admit("new", ("a", 10, 5))
+    assert tiny.admit("new", ("b", 10, 0))
+
+
+def test_hit_counts_written_back_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "ACCESS_FLUSH_BATCH", 2)
+    cache = FormatterCache(cache_dir=tmp_path)
+    _put(cache, 1)
+    _put(cache, 2)
+
+    cache.get("x=1", "python")
+    cache.get("x=1", "python")
+    key = cache._compute_hash("x=1", "python")
+    assert cache.backend.load(key).hit_count == 0  # still buffered (one key pending)
+    cache.get("x=2", "python")
+    assert cache.backend.load(key).hit_count == 2
+
+    cache.get("x=1", "python")
+    cache.flush()
+    assert FormatterCache(cache_dir=tmp_path).backend.load(key).hit_count == 3
+
+
+def test_tinylfu_keeps_hot_entries_over_one_off_pastes(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, max_entries=4, policy="tinylfu")
+    for i in range(4):
+        _put(cache, i)
+    for _ in range(3):
+        assert cache.get("x=0", "python") is not None
+
+    # A stream of one-off pastes, each looked up once before being stored
+    for i in range(10, 30):
+        assert cache.get(f"x={i}", "python") is None
+        _put(cache, i)
+        cache.memory_cache.clear()
+
+    assert cache.stats()["entries"] == 4
+    assert cache.get("x=0", "python") is not None
+
+
+def test_lru_policy_admits_everything(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, max_entries=4, policy="lru")
+    for i in range(4):
+        _put(cache, i)
+    cache.get("x=0", "python")
+    for i in range(10, 30):
+        _put(cache, i)
+    cache.memory_cache.clear()
+
+    assert cache.stats()["admission_rejects"] == 0
+    assert cache.get("x=0", "python") is None
+    assert cache.get("x=29", "python") is not None
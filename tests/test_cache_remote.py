@@ -0,0 +1,135 @@
+"""Tests for the remote cache tier and its reference server (on localhost)."""
+
+import hashlib
+import http.client
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_bundle import identity_translator
+from clipfix.engines.cache_remote import RemoteCache
+from clipfix.engines.cache_server import make_server
+
+HERE = "ruff 0.4.1 /opt/bin/ruff 111 abc"
+THERE = "ruff 0.4.1 /usr/bin/ruff 222 abc"
+PORTABLE = "ruff 0.4.1 abc"
+TOKEN = "s3cret"
+
+
+@pytest.fixture
+def server_url():
+    server = make_server("127.0.0.1", 0, token=TOKEN)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_results_are_shared_between_machines(tmp_path, server_url):
+    a = FormatterCache(cache_dir=tmp_path / "a",
+                       remote=RemoteCache(server_url, identity_translator({HERE: PORTABLE}), budget_ms=2000, token=TOKEN))
+    b = FormatterCache(cache_dir=tmp_path / "b",
+                       remote=RemoteCache(server_url, identity_translator({THERE: PORTABLE}), budget_ms=2000, token=TOKEN))
+
+    assert b.get("x=1", "python", THERE) is None
+    a.put("x=1", "python", "ruff", True, "x = 1\n", "formatted", HERE, 0.4)
+    a.remote.flush()
+
+    # Read through, then served locally
+    assert b.get_many([("x=1", "python", THERE), ("y=2", "python", THERE)]) == [
+        (True, "x = 1\n", "formatted:cached"), None]
+    assert b.get("x=1", "python", THERE) == (True, "x = 1\n", "formatted:cached")
+    assert b.remote.hits == 1
+
+    stats = b.stats()
+    assert stats["remote_hits"] == 1
+    assert stats["time_saved_seconds"] == pytest.approx(0.8)
+
+    # Another formatter version never sees it
+    c = FormatterCache(cache_dir=tmp_path / "c",
+                       remote=RemoteCache(server_url, identity_translator({"ruff 0.5.0 /x 1 abc": "ruff 0.5.0 abc"}),
+                                         token=TOKEN))
+    assert c.get("x=1", "python", "ruff 0.5.0 /x 1 abc") is None
+
+
+def test_slow_server_falls_back_within_budget(tmp_path):
+    # Accepts connections (the kernel completes the handshake) but never answers
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+    url = f"http://127.0.0.1:{listener.getsockname()[1]}"
+    try:
+        remote = RemoteCache(url, identity_translator({HERE: PORTABLE}), budget_ms=50, state_dir=tmp_path)
+        cache = FormatterCache(cache_dir=tmp_path / "cache", remote=remote)
+
+        start = time.perf_counter()
+        assert cache.get("x=1", "python", HERE) is None
+        assert time.perf_counter() - start < 0.5
+        assert remote.errors == 1
+        assert (tmp_path / "remote_down").exists()
+
+        # Backing off: not even tried again, also in a new process
+        other = RemoteCache(url, identity_translator({HERE: PORTABLE}), budget_ms=50, state_dir=tmp_path)
+        assert other.get_many([("x=1", "python", HERE)]) == [None]
+        assert (other.errors, other.hits, other.misses) == (0, 0, 0)
+    finally:
+        listener.close()
+
+
+def test_connections_are_kept_alive(server_url):
+    remote = RemoteCache(server_url, identity_translator({HERE: PORTABLE}), budget_ms=2000, token=TOKEN)
+    remote.get_many([("x=1", "python", HERE)])
+    conn = remote.pool._idle[0]
+    remote.get_many([("y=2", "python", HERE)])
+    assert remote.pool._idle == [conn]
+
+
+def test_server_rejects_malformed_requests(server_url):
+    host, port = server_url[len("http://"):].split(":")
+    conn = http.client.HTTPConnection(host, int(port), timeout=5)
+    auth = {"Authorization": f"Bearer {TOKEN}"}
+    conn.request("POST", "/v1/store", body=json.dumps({"entries": {"k": {"output": "no other fields"}}}),
+                 headers=auth)
+    response = conn.getresponse()
+    assert response.status == 204
+    response.read()
+    conn.request("POST", "/v1/lookup", body=b"not json", headers=auth)
+    response = conn.getresponse()
+    assert response.status == 400
+    response.read()
+    conn.request("GET", "/v1/health")
+    assert json.loads(conn.getresponse().read()) == {"entries": 0}
+
+
+def test_server_requires_the_token(server_url):
+    key = hashlib.sha256(f"python:{PORTABLE}:x=1".encode("utf-8")).hexdigest()
+    entry = {"language": "python", "formatter": PORTABLE, "mode": "formatted", "output": "x = 1\n", "duration": 0}
+    host, port = server_url[len("http://"):].split(":")
+    for headers in ({}, {"Authorization": "Bearer wrong"}):
+        conn = http.client.HTTPConnection(host, int(port), timeout=5)
+        conn.request("POST", "/v1/store", body=json.dumps({"entries": {key: entry}}), headers=headers)
+        response = conn.getresponse()
+        assert response.status == 401
+        response.read()
+        conn.close()
+
+    # A client without it stores nothing and finds nothing
+    anonymous = RemoteCache(server_url, identity_translator({HERE: PORTABLE}), budget_ms=2000)
+    anonymous.put_many([("x=1", "python", HERE, "x = 1\n", "formatted", 0.1)])
+    anonymous.flush()
+    assert anonymous.errors == 1
+    remote = RemoteCache(server_url, identity_translator({HERE: PORTABLE}), budget_ms=2000, token=TOKEN)
+    assert remote.get_many([("x=1", "python", HERE)]) == [None]
+    assert RemoteCache(server_url, identity_translator({HERE: PORTABLE}), budget_ms=2000).get_many(
+        [("x=1", "python", HERE)]) == [None]
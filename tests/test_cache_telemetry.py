@@ -0,0 +1,80 @@
+"""Tests for measured cache telemetry."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+from clipfix.engines.cache_telemetry import LATENCY_BUCKETS, latency_percentile
+
+
+def test_hits_misses_and_time_saved_persist_across_processes(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted", "black 24.1 /usr/bin/black", 0.75)
+    assert cache.get("x=1", "python", "black 24.1 /usr/bin/black") is not None
+    assert cache.get("y=2", "python", "black 24.1 /usr/bin/black") is None
+    cache.flush()
+
+    # A later process adds to the same counters
+    cache = FormatterCache(cache_dir=tmp_path)
+    assert cache.get("x=1", "python", "black 24.1 /usr/bin/black") is not None
+    assert cache.get("{}", "json", None) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    assert stats["time_saved_seconds"] == pytest.approx(1.5)
+    assert stats["languages"]["python"]["hits"] == 2
+    assert stats["languages"]["json"]["misses"] == 1
+    assert stats["formatters"]["black"]["saved_seconds"] == pytest.approx(1.5)
+    assert stats["formatters"]["unknown"]["misses"] == 1
+    assert stats["lookup_p50_ms"] is not None
+
+
+def test_evictions_are_counted_per_language(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, max_entries=2, memory_entries=0, policy="lru")
+    cache.put("a=1", "python", "black", True, "a = 1\n", "formatted")
+    cache.put("b: 1", "yaml", "prettier", True, "b: 1\n", "formatted")
+    cache.put("c=1", "python", "black", True, "c = 1\n", "formatted")
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["languages"]["python"]["evictions"] == 1
+
+
+def test_duration_round_trips_through_sqlite(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, memory_entries=0)
+    cache.put("x=1", "python", "black", True, "x = 1\n", "formatted", None, 0.25)
+    entry = next(cache.backend.entries())
+    assert entry.duration == pytest.approx(0.25)
+
+
+def test_latency_percentile_reports_bucket_upper_bound():
+    histogram = [0] * LATENCY_BUCKETS
+    assert latency_percentile(histogram, 0.5) is None
+    histogram[4] = 99   # < 16 us
+    histogram[10] = 1   # < 1024 us
+    assert latency_percentile(histogram, 0.5) == 16 / 1_000_000
+    assert latency_percentile(histogram, 0.999) == 1024 / 1_000_000
+
+
+def test_file_backend_keeps_telemetry_out_of_its_entries(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path, backend="file", max_entries=2, memory_entries=0, policy="lru")
+    cache.put("a=1", "python", "black", True, "a = 1\n", "formatted")
+    assert cache.get("a=1", "python") is not None
+    cache.flush()
+    assert (tmp_path / "telemetry.json").exists()
+    assert cache.backend.keys() == [cache._compute_hash("a=1", "python")]
+
+    # Evicting, expiring and clearing entries leave the counts alone
+    for code in ("b=1", "c=1", "d=1"):
+        cache.put(code, "python", "black", True, code + "\n", "formatted")
+    cache.ttl_seconds = -1
+    assert cache.gc() == 2
+    cache.clear()
+    cache.flush()
+
+    stats = FormatterCache(cache_dir=tmp_path, backend="file").stats()
+    assert (stats["entries"], stats["hits"], stats["evictions"]) == (0, 1, 2)
@@ -0,0 +1,66 @@
+"""Tests for formatter-identity cache keys."""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.cache import FormatterCache
+
+
+def test_entries_are_keyed_by_formatter_identity(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x=1", "python", "ruff", True, "x = 1\n", "formatted", identity="ruff 0.4.1")
+
+    assert cache.get("x=1", "python", "ruff 0.4.1") == (True, "x = 1\n", "formatted:cached")
+    assert cache.get("x=1", "python", "ruff 0.5.0") is None
+    # Fixed points only count for the same formatter too
+    assert cache.get("x = 1\n", "python", "ruff 0.4.1") == (True, "x = 1\n", "already formatted:cached")
+    assert cache.get("x = 1\n", "python", "ruff 0.5.0") is None
+
+
+def test_content_lookup_ignores_other_formatter_versions(tmp_path):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x=1", "python", "ruff", True, "x = 1\n", "formatted", identity="ruff 0.4.1")
+
+    assert cache.get_by_content("x=1", lambda language: "ruff 0.4.1") is not None
+    assert cache.get_by_content("x=1", lambda language: "ruff 0.5.0") is None
+
+
+def test_entries_do_not_expire_by_default(tmp_path, monkeypatch):
+    cache = FormatterCache(cache_dir=tmp_path)
+    cache.put("x=1", "python", "ruff", True, "x = 1\n", "formatted", identity="ruff 0.4.1")
+
+    a_year_later = time.time() + 365 * 86400
+    monkeypatch.setattr(time, "time", lambda: a_year_later)
+
+    assert cache.get("x=1", "python", "ruff 0.4.1") == (True, "x = 1\n", "formatted:cached")
+    assert cache.gc() == 0
+
+
+def test_identity_follows_user_config(tmp_path, monkeypatch):
+    from clipfix.engines import detect_and_format
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    before = detect_and_format._settings_digest("sqlfluff", "sql")
+    (tmp_path / ".sqlfluff").write_text("[sqlfluff]\nmax_line_length = 100\n")
+
+    assert detect_and_format._settings_digest("sqlfluff", "sql") != before
+    assert detect_and_format._settings_digest("prettier", "js") != detect_and_format._settings_digest("prettier", "ts")
+
+
+def test_yaml_without_ruamel_is_passed_through(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines import detect_and_format
+
+    # As if ruamel.yaml were not installed (it is not a dependency)
+    monkeypatch.setitem(sys.modules, "ruamel", None)
+    monkeypatch.setitem(sys.modules, "ruamel.yaml", None)
+    monkeypatch.setattr(detect_and_format, "_IDENTITIES", {})
+    monkeypatch.setattr(cache_module, "_cache", FormatterCache(cache_dir=tmp_path))
+
+    assert detect_and_format.formatter_identity("yaml") == "ruamel.yaml unavailable"
+    assert detect_and_format.portable_identity("yaml") is None
+    assert detect_and_format.process_text("a: 1\n", False, "yaml") == (True, "a: 1\n", "formatted")
+    assert detect_and_format.process_text("```yaml\na: 1\n```", False)[:2] == (True, "```yaml\na: 1\n```")
@@ -0,0 +1,17 @@
+import pytest
+
+from clipfix.engines.formatter_invoke import run_in_file, run_stdio
+
+
+def test_stdio_roundtrip():
+    assert run_stdio(["tr", "a-z", "A-Z"], "select 1\n") == "SELECT 1\n"
+
+
+def test_stdio_error_uses_stderr():
+    with pytest.raises(RuntimeError, match="bad input"):
+        run_stdio(["sh", "-c", "echo 'bad input' >&2; exit 3"], "x")
+
+
+def test_file_fallback_rewrites_in_place_and_cleans_up():
+    out = run_in_file(["sh", "-c", 'sed "s/x/y/" "$0" > "$0.tmp" && mv "$0.tmp" "$0"'], "x = 1\n", "py")
+    assert out == "y = 1\n"
@@ -0,0 +1,40 @@
+import shutil
+
+import pytest
+
+from clipfix.engines.formatter_pool import FormatterPool
+
+
+@pytest.mark.skipif(shutil.which("black") is None, reason="black not installed")
+def test_black_worker_survives_crash():
+    pool = FormatterPool(max_requests=2)
+    try:
+        assert pool.format("black", "x=1\n") == "x = 1\n"
+
+        with pytest.raises(RuntimeError):
+            pool.format("black", "def (:\n")
+
+        # Killed worker is restarted transparently
+        pool._workers["black"].proc.kill()
+        assert pool.format("black", "y=2\n") == "y = 2\n"
+    finally:
+        pool.close()
+
+
+def test_unsupported_formatter_falls_back():
+    pool = FormatterPool()
+    assert not pool.supports("rustfmt")
+    assert pool.format("rustfmt", "fn main() {}") is None
+
+
+@pytest.mark.skipif(shutil.which("sqlfluff") is None, reason="sqlfluff not installed")
+def test_sqlfluff_worker_rejects_unparsable_sql():
+    pool = FormatterPool()
+    try:
+        assert pool.format("sqlfluff", "select a,b from t\n", {"dialect": "postgres"}) == "select\n    a,\n    b\nfrom t\n"
+
+        # Like `sqlfluff fix`, which exits non-zero instead of half-fixing it
+        with pytest.raises(RuntimeError):
+            pool.format("sqlfluff", "SELECT FROM WHERE ((( x\n", {"dialect": "postgres"})
+    finally:
+        pool.close()
@@ -0,0 +1,69 @@
+import os
+
+from clipfix.engines.formatter_registry import FormatterRegistry
+
+
+def _make_tool(bin_dir, name, version):
+    tool = bin_dir / name
+    tool.write_text(f"#!/bin/sh\necho '{name} {version}'\n")
+    tool.chmod(0o755)
+    return tool
+
+
+def test_resolves_and_persists_snapshot(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    tool = _make_tool(bin_dir, "fakefmt", "1.0")
+    monkeypatch.setenv("PATH", str(bin_dir))
+    snapshot = tmp_path / "formatters.json"
+
+    reg = FormatterRegistry(snapshot_file=snapshot)
+    assert reg.path("fakefmt") == str(tool)
+    assert reg.version("fakefmt") == "fakefmt 1.0"
+    assert not reg.available("missingfmt")
+
+    # A fresh registry answers from the snapshot without re-running --version
+    tool.write_text("#!/bin/sh\nexit 1\n")
+    os.utime(tool, (reg.lookup("fakefmt").mtime,) * 2)
+    reg2 = FormatterRegistry(snapshot_file=snapshot)
+    assert reg2.version("fakefmt") == "fakefmt 1.0"
+
+
+def test_binary_change_invalidates_version(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    tool = _make_tool(bin_dir, "fakefmt", "1.0")
+    monkeypatch.setenv("PATH", str(bin_dir))
+    snapshot = tmp_path / "formatters.json"
+
+    assert FormatterRegistry(snapshot_file=snapshot).version("fakefmt") == "fakefmt 1.0"
+
+    _make_tool(bin_dir, "fakefmt", "2.0")
+    mtime = os.stat(tool).st_mtime + 10
+    os.utime(tool, (mtime, mtime))
+    assert FormatterRegistry(snapshot_file=snapshot).version("fakefmt") == "fakefmt 2.0"
+
+
+def test_version_is_rechecked_behind_a_shim(tmp_path, monkeypatch):
+    from clipfix.engines import formatter_registry
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    tool = _make_tool(bin_dir, "fakefmt", "1.0")
+    monkeypatch.setenv("PATH", str(bin_dir))
+    snapshot = tmp_path / "formatters.json"
+
+    reg = FormatterRegistry(snapshot_file=snapshot)
+    assert reg.version("fakefmt") == "fakefmt 1.0"
+    before = reg.identity("fakefmt")
+
+    # The toolchain behind a shim is upgraded: same path, same mtime
+    mtime = reg.lookup("fakefmt").mtime
+    _make_tool(bin_dir, "fakefmt", "2.0")
+    os.utime(tool, (mtime, mtime))
+    assert FormatterRegistry(snapshot_file=snapshot).version("fakefmt") == "fakefmt 1.0"
+
+    monkeypatch.setattr(formatter_registry, "VERSION_RECHECK_SECONDS", 0)
+    reg = FormatterRegistry(snapshot_file=snapshot)
+    assert reg.version("fakefmt") == "fakefmt 2.0"
+    assert reg.identity("fakefmt") != before
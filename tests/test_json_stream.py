@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from clipfix.engines.json_stream import format_json, iter_reindent, reindent_json
+
+
+def test_stream_matches_stdlib():
+    doc = '{"a": [1, -0, 2.50, 1e400, {}, []], "b": {"c": "caf\\u00e9 \\"q\\"", "d": null}, "e": true}'
+    expected = json.dumps(json.loads(doc), indent=2, ensure_ascii=False) + "\n"
+    assert reindent_json(doc) == expected
+    assert format_json(doc) == expected
+
+
+def test_stream_yields_bounded_chunks():
+    doc = "[" + ",".join(["1"] * 20000) + "]"
+    chunks = list(iter_reindent(doc))
+    assert len(chunks) > 1
+    assert "".join(chunks) + "\n" == json.dumps(json.loads(doc), indent=2) + "\n"
+
+
+@pytest.mark.parametrize("doc", ['{"a": 1,}', '[1 2]', '{"a" 1}', '[1]]', '"unterminated'])
+def test_stream_rejects_invalid_json(doc):
+    with pytest.raises(ValueError):
+        reindent_json(doc)
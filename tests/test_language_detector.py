@@ -0,0 +1,48 @@
+from clipfix.engines.language_detector import SAMPLE_CHARS, detect_language
+
+
+def test_detects_common_languages():
+    cases = {
+        "import os\nprint(os.getcwd())\n": "python",
+        "const add = (a, b) => a + b;\nconsole.log(add(1, 2));\n": "javascript",
+        "interface User { name: string }\nconst u: User = { name: 'x' };\n": "typescript",
+        "#!/bin/bash\nset -e\necho hi\n": "bash",
+        "use std::io;\nfn main() {\n    let mut x = 1;\n}\n": "rust",
+        "SELECT id, name FROM users WHERE active = 1 ORDER BY name;": "sql",
+        '{"a": [1, 2]}': "json",
+        '{"a": 1}\n{"a": 2}\n': "ndjson",
+    }
+    for text, kind in cases.items():
+        detection = detect_language(text)
+        assert detection.kind == kind, text
+        assert detection.confident, text
+
+
+def test_ambiguous_input_has_low_confidence():
+    detection = detect_language("x=1\ny=2")
+    assert detection.kind == "python"
+    assert not detection.confident
+
+
+def test_only_sample_is_scanned():
+    text = "x = 1\n" * (SAMPLE_CHARS // 6) + "SELECT a FROM b WHERE c JOIN d;\n" * 100
+    assert detect_language(text).scores["sql"] == 0
+
+
+def test_unsure_raw_text_does_not_load_the_llm(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines import detect_and_format
+    from clipfix.engines.cache import FormatterCache
+
+    monkeypatch.setattr(cache_module, "_cache", FormatterCache(cache_dir=tmp_path))
+    classified = []
+    monkeypatch.setattr(detect_and_format, "llm_classify", lambda text: classified.append(text) or {})
+    monkeypatch.setattr(detect_and_format, "llm_repair", lambda kind, text: text)
+
+    for text in ("hello world", "x := 5"):
+        detect_and_format.process_text(text, allow_llm=True)
+    assert classified == []
+
+    # An unrecognised fence label still asks it
+    detect_and_format.process_text("```zig\nx := 5\n```", allow_llm=True)
+    assert classified == ["x := 5"]
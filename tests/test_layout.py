@@ -0,0 +1,47 @@
+"""Tests for layout-normalized lookups (indentation, line endings, trailing spaces)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.layout import Layout, apply_layout, split_layout
+
+
+def test_split_layout_removes_indent_crlf_and_trailing_spaces():
+    text, layout = split_layout("    if x:  \r\n        y = 1\r\n\r\n    z = 2\t\r\n")
+    assert text == "if x:\n    y = 1\n\nz = 2\n"
+    assert layout == Layout("    ", "\r\n")
+
+
+def test_variants_normalize_to_the_same_text():
+    base = "def f(a):\n    return a\n"
+    variants = [
+        base,
+        "        def f(a):\n            return a\n",
+        base.replace("\n", "\r\n"),
+        "def f(a):   \n    return a \n",
+    ]
+    assert {split_layout(v)[0] for v in variants} == {base}
+
+
+def test_apply_layout_restores_indent_and_line_endings():
+    layout = Layout("  ", "\r\n")
+    assert apply_layout("a:\n  b: 1\n\nc: 2\n", layout) == "  a:\r\n    b: 1\r\n\r\n  c: 2\r\n"
+    assert apply_layout("x = 1\n", Layout()) == "x = 1\n"
+
+
+def test_indented_copy_hits_the_cache(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines import detect_and_format
+    from clipfix.engines.cache import FormatterCache
+
+    monkeypatch.setattr(cache_module, "_cache", FormatterCache(cache_dir=tmp_path))
+    monkeypatch.setattr(detect_and_format, "normalize_layout_enabled", lambda: True)
+
+    ok, formatted, mode = detect_and_format.process_text('{"a":1,"b":[1,2]}\n', allow_llm=False)
+    assert ok and mode == "formatted"
+
+    ok, indented, mode = detect_and_format.process_text('    {"a":1,"b":[1,2]}  \r\n', allow_llm=False)
+    assert ok and mode.endswith(":cached")
+    assert indented == apply_layout(formatted, Layout("    ", "\r\n"))
@@ -0,0 +1,108 @@
+"""Tests for advisory locks and single-flight de-duplication."""
+
+import fcntl
+import multiprocessing
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.locking import InterProcessLock, SingleFlight
+
+
+def test_lock_is_reentrant_and_held_on_the_file(tmp_path):
+    lock = InterProcessLock(tmp_path / "cache.lock")
+    with lock:
+        with lock:
+            pass
+        # Still held after the inner release
+        with open(tmp_path / "cache.lock", "a+b") as other:
+            try:
+                fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                held = False
+            except BlockingIOError:
+                held = True
+    assert held
+
+    with open(tmp_path / "cache.lock", "a+b") as other:
+        fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def test_concurrent_threads_share_one_call(tmp_path):
+    flight = SingleFlight(tmp_path)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "formatted"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["formatted"] * 4
+    assert len(calls) == 1
+
+
+def _run_once(lock_dir, log):
+    def slow():
+        with open(log, "a") as f:
+            f.write("ran\n")
+        time.sleep(1.0)
+        return [True, "formatted", "formatted"]
+    return SingleFlight(lock_dir).do("k", slow)
+
+
+def test_second_process_takes_the_first_result(tmp_path):
+    log = tmp_path / "log"
+    first = multiprocessing.get_context("fork").Process(target=_run_once, args=(tmp_path, log))
+    first.start()
+    while not log.exists():
+        time.sleep(0.01)
+
+    result = _run_once(tmp_path, log)
+    first.join()
+
+    assert result == [True, "formatted", "formatted"]
+    assert log.read_text() == "ran\n"
+    assert not list(tmp_path.glob("k.*"))
+
+
+def _hold(lock_dir, key, log, seconds):
+    def slow():
+        with open(log, "a") as f:
+            f.write(key + "\n")
+        time.sleep(seconds)
+        return key
+    return SingleFlight(lock_dir).do(key, slow)
+
+
+def test_other_keys_and_slow_leaders_do_not_block(tmp_path, monkeypatch):
+    from clipfix.engines import locking
+
+    log = tmp_path / "log"
+    first = multiprocessing.get_context("fork").Process(target=_hold, args=(tmp_path, "key-a", log, 3.0))
+    first.start()
+    try:
+        while not log.exists():
+            time.sleep(0.01)
+
+        # An unrelated clip runs at once
+        start = time.perf_counter()
+        assert SingleFlight(tmp_path).do("key-30", lambda: "own") == "own"
+        assert time.perf_counter() - start < 0.5
+
+        # The same clip waits, but only so long
+        monkeypatch.setattr(locking, "SINGLE_FLIGHT_WAIT_SECONDS", 0.2)
+        start = time.perf_counter()
+        assert SingleFlight(tmp_path).do("key-a", lambda: "own") == "own"
+        assert time.perf_counter() - start < 1.0
+    finally:
+        first.join()
+    assert not list(tmp_path.glob("*.lock"))
@@ -0,0 +1,26 @@
+import pytest
+
+from clipfix.engines.ndjson import format_lines, format_ndjson, iter_chunks, looks_like_ndjson
+
+
+def test_detects_json_lines():
+    assert looks_like_ndjson('{"a": 1}\n{"a": 2}\n')
+    assert not looks_like_ndjson('{"a": 1}')
+    assert not looks_like_ndjson('{"a": 1}\nprint("x")\n')
+
+
+def test_normalizes_each_line_and_reports_bad_line():
+    assert format_lines('{"a":1,  "b":[1,2]}\n\n["x"]') == '{"a": 1, "b": [1, 2]}\n["x"]\n'
+    with pytest.raises(ValueError, match="line 3"):
+        format_lines('{"a": 1}\n{"a": 2}\n{"a": }\n')
+
+
+def test_parallel_chunks_keep_order(monkeypatch):
+    import clipfix.engines.ndjson as ndjson
+
+    text = "".join(f'{{"n":{i}}}\n' for i in range(2000))
+    assert sum(c.count("\n") + 1 for c, _ in iter_chunks(text, 1000)) >= 2000
+
+    monkeypatch.setattr(ndjson, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr(ndjson, "CHUNK_BYTES", 1000)
+    assert format_ndjson(text, max_workers=2) == format_lines(text)
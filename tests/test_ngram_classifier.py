@@ -0,0 +1,20 @@
+from clipfix.engines.ngram_classifier import NgramClassifier, classify_ngram
+
+
+def test_shipped_model_classifies():
+    guess = classify_ngram("fn main() {\n    let mut v = Vec::new();\n    println!(\"{:?}\", v);\n}\n")
+    assert guess is not None
+    assert guess.kind == "rust"
+    assert 0.0 < guess.confidence <= 1.0
+
+
+def test_train_save_load_roundtrip(tmp_path):
+    samples = [("python", "def f(x):\n    return x"), ("sql", "SELECT a FROM b WHERE c = 1")]
+    model = NgramClassifier.train(samples, n_buckets=256)
+    path = tmp_path / "model.bin"
+    model.save(path)
+
+    loaded = NgramClassifier.load(path)
+    assert loaded.classes == ["python", "sql"]
+    assert loaded.scores("select x from y") == model.scores("select x from y")
+    assert loaded.predict("def g(y):\n    return y").kind == "python"
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+from clipfix.engines import detect_and_format
+from clipfix.engines.detect_and_format import _format_code, _formatter_name
+
+
+def _installed(monkeypatch, *commands):
+    monkeypatch.setattr(detect_and_format, "_has_cmd", lambda name: name in commands)
+
+
+def _black_cli(monkeypatch, home, version):
+    """A `black` CLI of this version on PATH, and a home without user config."""
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setattr(detect_and_format, "_BLACK_INPROCESS", None)
+    registry = SimpleNamespace(version=lambda name: f"black, {version} (compiled: yes)")
+    monkeypatch.setattr(detect_and_format, "get_formatter_registry", lambda: registry)
+
+
+def test_black_runs_inprocess_in_place_of_its_cli(monkeypatch, tmp_path):
+    black = pytest.importorskip("black")
+    _installed(monkeypatch, "black")
+    _black_cli(monkeypatch, tmp_path, black.__version__)
+    out, formatter_used = _format_code("python", "x  =  [1,\n2]")
+    assert out == "x = [1, 2]\n"
+    assert formatter_used == _formatter_name("python") == "black:inprocess"
+
+
+def test_black_cli_is_used_for_other_versions_or_user_config(monkeypatch, tmp_path):
+    black = pytest.importorskip("black")
+    _installed(monkeypatch, "black")
+
+    # The CLI is another release than the importable library
+    _black_cli(monkeypatch, tmp_path, "0.0.1")
+    assert _formatter_name("python") == "black"
+
+    # Same release, but the user configured black (the library ignores it)
+    _black_cli(monkeypatch, tmp_path, black.__version__)
+    (tmp_path / ".config").mkdir()
+    (tmp_path / ".config" / "black").write_text("[tool.black]\nline-length = 20\n")
+    assert _formatter_name("python") == "black"
+
+
+def test_ruff_still_comes_first(monkeypatch, tmp_path):
+    black = pytest.importorskip("black")
+    _installed(monkeypatch, "ruff", "black")
+    _black_cli(monkeypatch, tmp_path, black.__version__)
+    assert _formatter_name("python") == "ruff"
+
+    # No formatter on PATH: importable black is not picked up either
+    _installed(monkeypatch)
+    assert _format_code("python", "  x  =  1\n") == ("x  =  1\n", "dedent")
+    assert _formatter_name("python") == "dedent"
@@ -0,0 +1,71 @@
+import time
+
+from clipfix.engines.parallel_processor import get_parallel_processor, speculate_format
+from clipfix.engines.segmenter import regex_segment
+
+
+def _attempt(kind):
+    if kind == "a":
+        raise RuntimeError("parse error")
+    if kind == "b":
+        time.sleep(0.05)  # slower than "c", but ranked higher
+    return f"formatted as {kind}"
+
+
+def test_best_ranked_success_wins():
+    assert speculate_format(["a", "b", "c"], _attempt) == ("b", "formatted as b")
+    assert speculate_format(["a"], _attempt) is None
+
+
+def test_nested_speculation_runs_inline():
+    executor = get_parallel_processor().executor
+    futures = [executor.submit(speculate_format, ["a", "c"], _attempt) for _ in range(32)]
+    assert all(f.result(timeout=5) == ("c", "formatted as c") for f in futures)
+
+
+def test_speculative_result_is_cached_as_the_winning_kind(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines import detect_and_format
+    from clipfix.engines.cache import FormatterCache
+
+    cache = FormatterCache(cache_dir=tmp_path)
+    monkeypatch.setattr(cache_module, "_cache", cache)
+    calls = []
+
+    def fake_format(kind, code):
+        calls.append(kind)
+        if kind != "sql":
+            raise RuntimeError("parse error")
+        return "FOO(BAR)\n", "sqlfluff"
+
+    monkeypatch.setattr(detect_and_format, "_format_code", fake_format)
+
+    # Detected as python, unsure; sql wins the speculation
+    assert detect_and_format._segment_kind(regex_segment("foo(bar)")[0]) == ("python", ["sql", "python"])
+    first = detect_and_format.process_text("foo(bar)", allow_llm=False)
+    assert first == (True, "FOO(BAR)\n", "formatted as sql (speculative)")
+    assert cache.get("foo(bar)", "sql", detect_and_format.formatter_identity("sql")) is not None
+
+    # The next paste is answered by the content index, without formatting
+    calls.clear()
+    assert detect_and_format.process_text("foo(bar)", allow_llm=False)[1] == "FOO(BAR)\n"
+    assert calls == []
+
+
+def test_failed_speculation_is_not_formatted_again(tmp_path, monkeypatch):
+    from clipfix.engines import cache as cache_module
+    from clipfix.engines import detect_and_format
+    from clipfix.engines.cache import FormatterCache
+
+    monkeypatch.setattr(cache_module, "_cache", FormatterCache(cache_dir=tmp_path))
+    calls = []
+
+    def fake_format(kind, code):
+        calls.append(kind)
+        raise RuntimeError(f"not {kind}")
+
+    monkeypatch.setattr(detect_and_format, "_format_code", fake_format)
+
+    # The top candidate's own error is reported, without a third run
+    assert detect_and_format.process_text("foo(bar)", allow_llm=False) == (False, "", "format error (sql): not sql")
+    assert sorted(calls) == ["python", "sql"]
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Train the n-gram language classifier shipped with eClipLint.
+
+Reads training/corpus/<language>.txt (samples separated by a line
+containing only %%), adds every window of up to WINDOW consecutive lines
+so short clipboard fragments are represented, and writes
+python/clipfix/engines/models/ngram_lang.bin.
+
+Usage:
+    python training/train_ngram_classifier.py [--buckets 16384]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "python"))
+
+from clipfix.engines.ngram_classifier import MODEL_FILE, NgramClassifier
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+SEPARATOR = "\n%%\n"
+WINDOW = 4
+
+
+def load_corpus(corpus_dir: Path = CORPUS_DIR):
+    """Yield (language, sample) pairs from the corpus files."""
+    for path in sorted(corpus_dir.glob("*.txt")):
+        for sample in path.read_text(encoding="utf-8").split(SEPARATOR):
+            if sample.strip():
+                yield path.stem, sample.strip("\n")
+
+
+def augment(samples, window: int = WINDOW):
+    """Each sample plus its windows of 1..window consecutive non-blank lines."""
+    for kind, text in samples:
+        yield kind, text
+        lines = [l for l in text.splitlines() if l.strip()]
+        for size in range(1, min(window, len(lines) - 1) + 1):
+            for i in range(len(lines) - size + 1):
+                yield kind, "\n".join(lines[i:i + size])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Train the n-gram language classifier")
+    ap.add_argument("--buckets", type=int, default=1 << 14, help="Hash space size")
+    ap.add_argument("--output", type=Path, default=MODEL_FILE, help="Model file to write")
+    args = ap.parse_args(argv)
+
+    samples = list(load_corpus())
+    model = NgramClassifier.train(augment(samples), n_buckets=args.buckets)
+    model.save(args.output)
+
+    correct = sum(model.predict(text).kind == kind for kind, text in samples)
+    print(f"Trained on {len(samples)} samples ({', '.join(model.classes)})")
+    print(f"Training accuracy: {correct}/{len(samples)}")
+    print(f"Wrote {args.output} ({args.output.stat().st_size / 1024:.0f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())